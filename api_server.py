@@ -0,0 +1,430 @@
+"""Headless JSON HTTP API over the workout database for local tools and dashboards."""
+
+import argparse
+import asyncio
+import datetime
+import gzip
+import hashlib
+import json
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from common.db_helper import DBHelper
+
+
+DEFAULT_PORT = 8765
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+GZIP_MIN_BYTES = 512
+RESPONSE_CACHE_SIZE = 256
+MAX_HEADER_BYTES = 16 * 1024
+MAX_BODY_BYTES = 1024 * 1024
+KEEP_ALIVE_SECONDS = 15
+
+STATUS_TEXT = {
+    200: "OK", 201: "Created", 204: "No Content", 304: "Not Modified", 400: "Bad Request",
+    404: "Not Found", 405: "Method Not Allowed", 413: "Payload Too Large", 500: "Internal Server Error",
+}
+
+
+class ApiError(Exception):
+    """An error that is reported to the client as a JSON body with an HTTP status."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class ConnectionPool:
+    """Run reads on a pool of read-only connections and writes on one writer connection.
+
+    Each worker thread opens its own DBHelper once and keeps it, so requests never pay for a connect
+    and writes are serialized instead of contending for the database lock.
+    """
+
+    def __init__(self, db_path, readers=4):
+        self.db_path = db_path
+        self.local = threading.local()
+        #Open once up front so the schema exists before read-only connections attach to it
+        DBHelper(db_path).close()
+        self.writer = ThreadPoolExecutor(1, "api-writer", initializer=self._open, initargs=(False,))
+        self.readers = ThreadPoolExecutor(readers, "api-reader", initializer=self._open, initargs=(True,))
+
+    def _open(self, read_only):
+        self.local.db = DBHelper(self.db_path, read_only=read_only)
+        self.local.db.conn.execute("PRAGMA busy_timeout = 5000")
+
+    def _call(self, handler, args):
+        return handler(self.local.db, *args)
+
+    async def read(self, handler, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.readers, self._call, handler, args)
+
+    async def write(self, handler, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.writer, self._call, handler, args)
+
+    def close(self):
+        self.readers.shutdown()
+        self.writer.shutdown()
+
+
+def page_params(query):
+    """Read limit and offset query parameters, clamped to the allowed page size."""
+    try:
+        limit = int(query.get("limit", DEFAULT_PAGE_SIZE))
+        offset = int(query.get("offset", 0))
+    except ValueError:
+        raise ApiError(400, "limit and offset must be integers.")
+    return max(1, min(limit, MAX_PAGE_SIZE)), max(0, offset)
+
+
+def page(items, total, limit, offset):
+    """Wrap one page of items with the information needed to fetch the next one."""
+    next_offset = offset + limit if offset + limit < total else None
+    return {"items": items, "total": total, "limit": limit, "offset": offset, "next_offset": next_offset}
+
+
+def workout_json(row):
+    return {"id": row[0], "name": row[1], "date": row[2]}
+
+
+def exercise_json(row):
+    return {"name": row[0], "sets": row[1], "reps": row[2], "weight": row[3]}
+
+
+def exercise_rows(body):
+    """Validate the exercises list of a workout body into (name, sets, reps, weight) rows."""
+    rows = []
+    for exercise in body.get("exercises", []):
+        try:
+            name = str(exercise["name"]).strip()
+            sets = int(exercise["sets"])
+            reps = ",".join(str(int(value)) for value in exercise["reps"])
+            weight = ",".join(f"{float(value):g}" for value in exercise["weight"])
+        except (KeyError, TypeError, ValueError):
+            raise ApiError(400, "Each exercise needs name, sets, and reps and weight lists.")
+        if not name or len(exercise["reps"]) != sets or len(exercise["weight"]) != sets:
+            raise ApiError(400, f"Exercise '{name}' needs a name and one rep and weight value per set.")
+        rows.append((name, sets, reps, weight))
+    return rows
+
+
+def workout_fields(body):
+    name = str(body.get("name", "")).strip()
+    date = str(body.get("date", "")).strip()
+    try:
+        if not name or not re.fullmatch(r"\d{4}-\d{2}-\d{2}", date):
+            raise ValueError(date)
+        #The pattern alone lets through dates that do not exist, such as 2025-13-45
+        datetime.date.fromisoformat(date)
+    except ValueError:
+        raise ApiError(400, "A workout needs a name and a valid yyyy-MM-dd date.")
+    return name, date
+
+
+def note_text(body):
+    """Return the note of a note body, which must be a string."""
+    note = body.get("note", "")
+    if not isinstance(note, str):
+        raise ApiError(400, "The note must be a string.")
+    return note
+
+
+#Read handlers, run on a reader connection
+def list_workouts(db, query):
+    limit, offset = page_params(query)
+    search = query.get("search", "").strip()
+    if search:
+        ids = db.search(search, limit=None)
+        rows = db.get_workouts_by_ids(ids[offset:offset + limit])
+        return page([workout_json(row) for row in rows], len(ids), limit, offset)
+    rows, total = db.get_workouts_page(limit, offset)
+    return page([workout_json(row) for row in rows], total, limit, offset)
+
+
+def get_workout(db, query, workout_id):
+    workout = db.get_workout_by_id(int(workout_id))
+    if not workout:
+        raise ApiError(404, "Workout not found.")
+    result = workout_json(workout)
+    result["exercises"] = [exercise_json(row) for row in db.get_exercises_for_workout(workout[0])]
+    result["note"] = db.get_workout_note(workout[1])
+    return result
+
+
+def list_catalog(db, query):
+    limit, offset = page_params(query)
+    rows = db.get_all_catalog_exercises()
+    items = [{"id": row[0], "name": row[1], "goal": row[2]} for row in rows[offset:offset + limit]]
+    return page(items, len(rows), limit, offset)
+
+
+def list_goals(db, query):
+    limit, offset = page_params(query)
+    goals = db.get_all_goals()
+    #Statistics come from the last batch recompute, exercises without one only report their goal
+    stats = {row[0]: row for row in db.get_exercise_stats()}
+    items = []
+    for exercise_id, name, goal in goals[offset:offset + limit]:
+        item = {"id": exercise_id, "name": name, "goal": goal}
+        row = stats.get(exercise_id)
+        if row:
+            item.update({
+                "sessions": row[3], "best_weight": row[4], "best_weight_reps": row[5], "best_e1rm": row[6],
+                "last_day": row[7], "goal_percent": row[8], "stats_current": bool(row[9]),
+            })
+        items.append(item)
+    return page(items, len(goals), limit, offset)
+
+
+def get_workout_note(db, query, name):
+    return {"workout_name": name, "note": db.get_workout_note(name)}
+
+
+def get_exercise_note(db, query, name):
+    return {"exercise_name": name, "note": db.get_exercise_note(name)}
+
+
+def exercise_history(db, query, name):
+    history = db.get_exercise_history(name)
+    limit, offset = page_params(query)
+    sessions = [
+        {"date": session.date, "reps": list(session.reps), "weights": list(session.weights)}
+        for session in (history[index] for index in range(offset, min(offset + limit, len(history))))
+    ]
+    return page(sessions, len(history), limit, offset)
+
+
+def exercise_rollups(db, query, name):
+    try:
+        rows = db.get_rollups(name, query.get("period", "week"), query.get("start"), query.get("end"))
+    except ValueError as exc:
+        raise ApiError(400, str(exc))
+    columns = ("period_start", "sessions", "sets", "reps", "tonnage", "top_weight", "top_reps", "best_e1rm")
+    return {"exercise": name, "rollups": [dict(zip(columns, row)) for row in rows]}
+
+
+def exercise_metrics(db, query, name):
+    return {"exercise": name, "metrics": db.get_rolling_metrics(name)}
+
+
+#Write handlers, run on the writer connection
+def create_workout(db, query, body):
+    name, date = workout_fields(body)
+    exercises = exercise_rows(body)
+    workout_id = db.add_workout(name, date)
+    db.update_workout_exercises(workout_id, exercises)
+    return get_workout(db, query, workout_id)
+
+
+def update_workout(db, query, body, workout_id):
+    workout = db.get_workout_by_id(int(workout_id))
+    if not workout:
+        raise ApiError(404, "Workout not found.")
+    name, date = workout_fields(body)
+    if workout[1:] != (name, date):
+        db.update_workout(workout[0], name, date)
+    if "exercises" in body:
+        db.update_workout_exercises(workout[0], exercise_rows(body))
+    return get_workout(db, query, workout[0])
+
+
+def delete_workout(db, query, body, workout_id):
+    if not db.get_workout_by_id(int(workout_id)):
+        raise ApiError(404, "Workout not found.")
+    db.delete_workout(int(workout_id))
+    return None
+
+
+def update_goals(db, query, body):
+    try:
+        goals = {int(exercise_id): None if goal is None else float(goal) for exercise_id, goal in body.items()}
+    except (AttributeError, TypeError, ValueError):
+        raise ApiError(400, "Send an object mapping exercise IDs to a goal number or null.")
+    return {"updated": db.update_goals(goals)}
+
+
+def set_workout_note(db, query, body, name):
+    try:
+        db.set_workout_note(name, note_text(body))
+    except ValueError as exc:
+        raise ApiError(400, str(exc))
+    return get_workout_note(db, query, name)
+
+
+def set_exercise_note(db, query, body, name):
+    try:
+        db.set_exercise_note(name, note_text(body))
+    except ValueError as exc:
+        raise ApiError(400, str(exc))
+    return get_exercise_note(db, query, name)
+
+
+ROUTES = [
+    ("GET", r"/workouts", list_workouts),
+    ("POST", r"/workouts", create_workout),
+    ("GET", r"/workouts/(\d+)", get_workout),
+    ("PUT", r"/workouts/(\d+)", update_workout),
+    ("DELETE", r"/workouts/(\d+)", delete_workout),
+    ("GET", r"/catalog", list_catalog),
+    ("GET", r"/goals", list_goals),
+    ("PUT", r"/goals", update_goals),
+    ("GET", r"/notes/workouts/([^/]+)", get_workout_note),
+    ("PUT", r"/notes/workouts/([^/]+)", set_workout_note),
+    ("GET", r"/notes/exercises/([^/]+)", get_exercise_note),
+    ("PUT", r"/notes/exercises/([^/]+)", set_exercise_note),
+    ("GET", r"/exercises/([^/]+)/history", exercise_history),
+    ("GET", r"/exercises/([^/]+)/rollups", exercise_rollups),
+    ("GET", r"/exercises/([^/]+)/metrics", exercise_metrics),
+]
+ROUTES = [(method, re.compile(pattern + r"/?"), handler) for method, pattern, handler in ROUTES]
+
+
+class ApiServer:
+    """Serve the routes over HTTP/1.1 with keep-alive, ETags and gzip."""
+
+    def __init__(self, db_path="data/workouts.db", readers=4):
+        self.pool = ConnectionPool(db_path, readers)
+        #Encoded GET responses keyed by data generation and URL, shared by every client
+        self.cache = OrderedDict()
+
+    def route(self, method, path):
+        allowed = False
+        for route_method, pattern, handler in ROUTES:
+            match = pattern.fullmatch(path)
+            if match:
+                if route_method == method:
+                    return handler, [unquote(group) for group in match.groups()]
+                allowed = True
+        raise ApiError(405 if allowed else 404, "Method not allowed." if allowed else "Not found.")
+
+    async def handle(self, method, target, headers, body):
+        """Return (status, extra headers, body bytes) for one request."""
+        url = urlsplit(target)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        handler, args = self.route(method, url.path)
+
+        if method != "GET":
+            try:
+                data = json.loads(body or b"{}")
+            except ValueError:
+                raise ApiError(400, "Request body must be JSON.")
+            if not isinstance(data, dict):
+                raise ApiError(400, "Request body must be a JSON object.")
+            result = await self.pool.write(handler, query, data, *args)
+            if result is None:
+                return 204, {}, b""
+            return (201 if method == "POST" else 200), {}, json.dumps(result).encode("utf-8")
+
+        #Every edit bumps the generation, so an unchanged generation means an unchanged response
+        generation = await self.pool.read(DBHelper.get_data_generation)
+        key = (generation, target)
+        cached = self.cache.get(key)
+        if cached is None:
+            payload = json.dumps(await self.pool.read(handler, query, *args)).encode("utf-8")
+            digest = hashlib.blake2b(payload, digest_size=8).hexdigest()
+            cached = (f'"{generation}-{digest}"', payload, None)
+            self.cache[key] = cached
+            if len(self.cache) > RESPONSE_CACHE_SIZE:
+                self.cache.popitem(last=False)
+        else:
+            self.cache.move_to_end(key)
+
+        etag, payload, compressed = cached
+        if etag in [tag.strip() for tag in headers.get("if-none-match", "").split(",")]:
+            return 304, {"ETag": etag}, b""
+
+        response_headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+        if len(payload) >= GZIP_MIN_BYTES and "gzip" in headers.get("accept-encoding", ""):
+            if compressed is None:
+                compressed = gzip.compress(payload, compresslevel=5)
+                self.cache[key] = (etag, payload, compressed)
+            response_headers["Content-Encoding"] = "gzip"
+            return 200, response_headers, compressed
+        return 200, response_headers, payload
+
+    async def serve_client(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), KEEP_ALIVE_SECONDS)
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+                    return
+
+                lines = head.decode("latin-1").split("\r\n")
+                try:
+                    method, target, version = lines[0].split(" ", 2)
+                except ValueError:
+                    return
+                headers = {}
+                for line in lines[1:]:
+                    name, _, value = line.partition(":")
+                    if name:
+                        headers[name.strip().lower()] = value.strip()
+
+                keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+                body = None
+                try:
+                    try:
+                        length = int(headers.get("content-length", 0) or 0)
+                    except ValueError:
+                        length = -1
+                    if length < 0:
+                        raise ApiError(400, "Content-Length must be a non-negative integer.")
+                    if length > MAX_BODY_BYTES:
+                        raise ApiError(413, "Request body is too large.")
+                    body = await reader.readexactly(length) if length else b""
+                    status, response_headers, payload = await self.handle(method.upper(), target, headers, body)
+                except ApiError as exc:
+                    status, response_headers = exc.status, {}
+                    payload = json.dumps({"error": exc.message}).encode("utf-8")
+                    #An unread body would be taken for the next request
+                    keep_alive = keep_alive and body is not None
+                except Exception as exc:
+                    status, response_headers = 500, {}
+                    payload = json.dumps({"error": str(exc)}).encode("utf-8")
+
+                response_headers.setdefault("Content-Type", "application/json")
+                response_headers["Content-Length"] = str(len(payload))
+                response_headers["Connection"] = "keep-alive" if keep_alive else "close"
+                head_lines = [f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}"]
+                head_lines += [f"{name}: {value}" for name, value in response_headers.items()]
+                writer.write(("\r\n".join(head_lines) + "\r\n\r\n").encode("latin-1") + payload)
+                await writer.drain()
+                if not keep_alive:
+                    return
+        except ConnectionError:
+            return
+        finally:
+            writer.close()
+
+    async def serve(self, host="127.0.0.1", port=DEFAULT_PORT):
+        server = await asyncio.start_server(self.serve_client, host, port, limit=MAX_HEADER_BYTES)
+        print(f"Workout Tracker API listening on http://{host}:{port}")
+        async with server:
+            await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Workout Tracker JSON API")
+    parser.add_argument("--db", default="data/workouts.db")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--readers", type=int, default=4, help="pooled read-only connections")
+    args = parser.parse_args()
+
+    api = ApiServer(args.db, args.readers)
+    try:
+        asyncio.run(api.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        api.pool.close()
+
+
+if __name__ == "__main__":
+    main()
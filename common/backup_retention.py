@@ -0,0 +1,236 @@
+"""Versioned, content-addressed database backups with a thinning retention policy."""
+
+import gzip
+import hashlib
+import os
+import shutil
+import sqlite3
+import tempfile
+from datetime import datetime, timedelta, timezone
+
+
+BLOB_PREFIX = "blob-"
+BLOB_SUFFIX = ".db.gz"
+VERSION_PREFIX = "version-"
+VERSION_SUFFIX = ".ref"
+TIMESTAMP_FORMAT = "%Y%m%dT%H%M%SZ"
+
+#Keep one version per bucket while it is younger than the age limit, None keeps it forever
+DEFAULT_POLICY = (
+    ("hourly", timedelta(days=1)),
+    ("daily", timedelta(days=31)),
+    ("monthly", None),
+)
+
+BUCKET_FORMATS = {
+    "hourly": "%Y-%m-%dT%H",
+    "daily": "%Y-%m-%d",
+    "weekly": "%G-W%V",
+    "monthly": "%Y-%m",
+    "yearly": "%Y",
+}
+
+
+def blob_name(digest):
+    return f"{BLOB_PREFIX}{digest}{BLOB_SUFFIX}"
+
+
+def version_name(created, digest):
+    return f"{VERSION_PREFIX}{created.strftime(TIMESTAMP_FORMAT)}-{digest}{VERSION_SUFFIX}"
+
+
+def parse_version_name(name):
+    """Return (created, digest) for a version marker name, or None."""
+    if not (name.startswith(VERSION_PREFIX) and name.endswith(VERSION_SUFFIX)):
+        return None
+    stamp, _, digest = name[len(VERSION_PREFIX):-len(VERSION_SUFFIX)].partition("-")
+    try:
+        created = datetime.strptime(stamp, TIMESTAMP_FORMAT).replace(tzinfo=timezone.utc)
+    except ValueError:
+        return None
+    return (created, digest) if digest else None
+
+
+def snapshot_database(db_path, destination_path):
+    """Write a consistent, compressed copy of a live database and return the SHA-256 of its pages.
+
+    The online backup API copies a committed state even while the app has the database open. An
+    unchanged database produces the same bytes and therefore the same digest.
+    """
+    temp_dir = tempfile.mkdtemp(prefix="workout-backup-")
+    try:
+        copy_path = os.path.join(temp_dir, "snapshot.db")
+        source = sqlite3.connect(db_path)
+        target = sqlite3.connect(copy_path)
+        try:
+            source.backup(target)
+        finally:
+            target.close()
+            source.close()
+
+        digest = hashlib.sha256()
+        with open(copy_path, "rb") as raw, open(destination_path, "wb") as handle:
+            #A fixed mtime keeps the compressed file identical for identical content
+            with gzip.GzipFile(filename="", mode="wb", fileobj=handle, mtime=0) as compressed:
+                for chunk in iter(lambda: raw.read(1024 * 1024), b""):
+                    digest.update(chunk)
+                    compressed.write(chunk)
+        return digest.hexdigest()
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def versions_to_keep(versions, now, policy=DEFAULT_POLICY):
+    """Return the set of (created, digest) versions that the retention policy keeps.
+
+    Each tier keeps the newest version in every bucket younger than its age limit. The newest
+    version overall is always kept.
+    """
+    keep = set()
+    ordered = sorted(versions, reverse=True)
+    if ordered:
+        keep.add(ordered[0])
+    for bucket, max_age in policy:
+        bucket_format = BUCKET_FORMATS[bucket]
+        seen = set()
+        for version in ordered:
+            if max_age is not None and now - version[0] > max_age:
+                break
+            key = version[0].strftime(bucket_format)
+            if key not in seen:
+                seen.add(key)
+                keep.add(version)
+    return keep
+
+
+class FolderBackupStore:
+    """Keep backup blobs and version markers in a local or network-shared folder."""
+
+    def __init__(self, folder):
+        self.folder = folder
+        os.makedirs(folder, exist_ok=True)
+
+    def list_names(self):
+        return os.listdir(self.folder)
+
+    def upload(self, name, path):
+        target = os.path.join(self.folder, name)
+        shutil.copyfile(path, target + ".tmp")
+        os.replace(target + ".tmp", target)
+
+    def download(self, name, destination_path):
+        shutil.copyfile(os.path.join(self.folder, name), destination_path)
+
+    def delete_many(self, names):
+        for name in names:
+            try:
+                os.remove(os.path.join(self.folder, name))
+            except FileNotFoundError:
+                pass
+
+
+class DriveBackupStore:
+    """Keep backup blobs and version markers in a Google Drive folder."""
+
+    def __init__(self, drive_helper, folder_name="Workout Tracker Backups"):
+        self.drive_helper = drive_helper
+        self.folder_name = folder_name
+        self.file_ids = {}
+
+    def list_names(self):
+        self.file_ids = {}
+        for item in self.drive_helper.list_folder(self.folder_name):
+            if item["name"].startswith((BLOB_PREFIX, VERSION_PREFIX)):
+                self.file_ids[item["name"]] = item["id"]
+        return list(self.file_ids)
+
+    def upload(self, name, path):
+        self.file_ids[name] = self.drive_helper.create_in_folder(
+            path, name, folder_name=self.folder_name, mime_type="application/gzip"
+        )
+
+    def download(self, name, destination_path):
+        self.drive_helper.download_file(self.file_ids[name], destination_path)
+
+    def delete_many(self, names):
+        self.drive_helper.delete_files([self.file_ids.pop(name) for name in names if name in self.file_ids])
+
+
+class BackupManager:
+    """Take deduplicated backups, restore any kept point in time and prune by a retention policy.
+
+    Every distinct database state is uploaded once as a blob named by its SHA-256. Each backup adds
+    an empty version marker whose name holds the time and the blob digest, so one listing shows
+    every restorable version and restoring needs one download.
+    """
+
+    def __init__(self, store, policy=DEFAULT_POLICY):
+        self.store = store
+        self.policy = policy
+
+    def list_versions(self):
+        """Return (created, digest) for every version, newest first, and the set of stored blob names."""
+        names = self.store.list_names()
+        versions = sorted(filter(None, map(parse_version_name, names)), reverse=True)
+        blobs = {name for name in names if name.startswith(BLOB_PREFIX) and name.endswith(BLOB_SUFFIX)}
+        return versions, blobs
+
+    def backup(self, db_path, now=None):
+        """Back up a database and return a summary of what was uploaded."""
+        now = (now or datetime.now(timezone.utc)).replace(microsecond=0)
+        versions, blobs = self.list_versions()
+        temp_dir = tempfile.mkdtemp(prefix="workout-backup-")
+        try:
+            snapshot_path = os.path.join(temp_dir, "snapshot.db.gz")
+            digest = snapshot_database(db_path, snapshot_path)
+            if versions and versions[0][1] == digest:
+                return {"digest": digest, "uploaded": False, "version": None}
+
+            uploaded = blob_name(digest) not in blobs
+            if uploaded:
+                self.store.upload(blob_name(digest), snapshot_path)
+            marker_path = os.path.join(temp_dir, "marker")
+            open(marker_path, "wb").close()
+            version = version_name(now, digest)
+            self.store.upload(version, marker_path)
+            return {"digest": digest, "uploaded": uploaded, "version": version}
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    def restore(self, destination_path, at=None):
+        """Restore the newest version taken at or before ``at`` (default now) and return its (created, digest)."""
+        versions, blobs = self.list_versions()
+        candidates = [version for version in versions if at is None or version[0] <= at]
+        candidates = [version for version in candidates if blob_name(version[1]) in blobs]
+        if not candidates:
+            raise FileNotFoundError("No backup exists for that point in time.")
+
+        created, digest = candidates[0]
+        temp_path = destination_path + ".restore"
+        compressed_path = temp_path + ".gz"
+        try:
+            self.store.download(blob_name(digest), compressed_path)
+            check = hashlib.sha256()
+            with gzip.open(compressed_path, "rb") as source, open(temp_path, "wb") as target:
+                for chunk in iter(lambda: source.read(1024 * 1024), b""):
+                    check.update(chunk)
+                    target.write(chunk)
+            if check.hexdigest() != digest:
+                raise ValueError(f"Backup {digest[:12]} is corrupt, its contents do not match its hash.")
+            os.replace(temp_path, destination_path)
+        finally:
+            for path in (temp_path, compressed_path):
+                if os.path.exists(path):
+                    os.remove(path)
+        return created, digest
+
+    def prune(self, now=None):
+        """Delete versions the policy no longer keeps and blobs no version refers to, in one bulk pass."""
+        now = now or datetime.now(timezone.utc)
+        versions, blobs = self.list_versions()
+        keep = versions_to_keep(versions, now, self.policy)
+        drop_versions = [version_name(*version) for version in versions if version not in keep]
+        kept_blobs = {blob_name(digest) for _created, digest in keep}
+        drop_blobs = sorted(blobs - kept_blobs)
+        self.store.delete_many(drop_versions + drop_blobs)
+        return {"versions_deleted": len(drop_versions), "blobs_deleted": len(drop_blobs), "versions_kept": len(keep)}
@@ -0,0 +1,114 @@
+"""Recompute rollups and per-exercise statistics for every exercise across worker processes."""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from common.db_helper import EPOCH_DAY_DATE_SQL, DBHelper
+
+#Exercises per task, small enough to balance work across processes
+SHARD_SIZE = 8
+
+
+def compute_exercise(conn, name_key):
+    """Return one exercise's daily rollups, statistics row (or None) and the data version they match."""
+    version_row = conn.execute(
+        "SELECT version FROM exercise_versions WHERE name_key = ?", (name_key,)
+    ).fetchone()
+    rows = conn.execute(
+        f"""
+        SELECT e.name_key, {EPOCH_DAY_DATE_SQL.format(day="w.day")}, e.reps, e.weight
+        FROM exercises e JOIN workouts w ON w.id = e.workout_id
+        WHERE e.name_key = ? AND w.day IS NOT NULL
+        """,
+        (name_key,),
+    ).fetchall()
+    version = version_row[0] if version_row else 0
+
+    exercise_rollups = DBHelper._aggregate_rollups(rows)
+    if not exercise_rollups:
+        return exercise_rollups, None, version
+
+    #Rollup values are [tonnage, sets, reps, top weight, top reps, best e1RM], ties on weight go to more reps
+    days = sorted(exercise_rollups)
+    top_day = max(days, key=lambda key: (exercise_rollups[key][3], exercise_rollups[key][4]))
+    stat = (
+        name_key,
+        len(days),
+        exercise_rollups[top_day][3],
+        exercise_rollups[top_day][4],
+        max(values[5] for values in exercise_rollups.values()),
+        days[-1][1],
+        version,
+    )
+    return exercise_rollups, stat, version
+
+
+def compute_shard(db_path, name_keys):
+    """Compute daily rollups and statistics for some exercises on a read-only connection."""
+    db = DBHelper(db_path, read_only=True)
+    try:
+        rollups = {}
+        stats = []
+        versions = {}
+        for name_key in name_keys:
+            #Read each exercise's rows and version together so the version matches the data
+            db.conn.execute("BEGIN")
+            exercise_rollups, stat, versions[name_key] = compute_exercise(db.conn, name_key)
+            db.conn.execute("COMMIT")
+            rollups.update(exercise_rollups)
+            if stat:
+                stats.append(stat)
+        return rollups, stats, versions
+    finally:
+        db.close()
+
+
+def recompute_all(db_path="data/workouts.db", workers=None):
+    """Shard exercises across processes, then write every result back in one transaction."""
+    db = DBHelper(db_path)
+    try:
+        name_keys = [
+            row[0] for row in db.conn.execute(
+                "SELECT DISTINCT name_key FROM exercises WHERE name_key <> '' ORDER BY name_key"
+            )
+        ]
+        shards = [name_keys[i:i + SHARD_SIZE] for i in range(0, len(name_keys), SHARD_SIZE)]
+        workers = workers or os.cpu_count() or 1
+
+        if workers == 1 or len(shards) <= 1:
+            results = [compute_shard(db_path, shard) for shard in shards]
+        else:
+            with ProcessPoolExecutor(max_workers=min(workers, len(shards))) as pool:
+                results = list(pool.map(compute_shard, [db_path] * len(shards), shards))
+
+        rollups = {}
+        stats = {}
+        versions = {}
+        for shard_rollups, shard_stats, shard_versions in results:
+            rollups.update(shard_rollups)
+            stats.update((stat[0], stat) for stat in shard_stats)
+            versions.update(shard_versions)
+
+        #Hold the write lock while checking for edits made during the recompute, then redo only those
+        db.conn.execute("BEGIN IMMEDIATE")
+        try:
+            current = dict(db.conn.execute("SELECT name_key, version FROM exercise_versions"))
+            live_keys = {
+                row[0] for row in db.conn.execute("SELECT DISTINCT name_key FROM exercises WHERE name_key <> ''")
+            }
+            stale = {key for key in live_keys | set(versions) if current.get(key, 0) != versions.get(key)}
+            if stale:
+                rollups = {key: values for key, values in rollups.items() if key[0] not in stale}
+                for name_key in stale:
+                    exercise_rollups, stat, _version = compute_exercise(db.conn, name_key)
+                    rollups.update(exercise_rollups)
+                    stats.pop(name_key, None)
+                    if stat:
+                        stats[name_key] = stat
+            db.replace_computed_stats(rollups, list(stats.values()))
+        except Exception:
+            db.conn.rollback()
+            raise
+        return len(stats)
+    finally:
+        db.close()
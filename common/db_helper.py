@@ -1,14 +1,96 @@
 # db_helper.py
+import json
+import re
 import sqlite3
+import uuid
+from difflib import SequenceMatcher
+from pathlib import Path
+
+from common.exercise_history import ExerciseHistory, parse_sets, to_epoch_day
+from common.query_cache import DEFAULT_MAX_BYTES, QueryCache, cached_query, invalidates
+from common.sync_engine import local_device_id, scoped_device_id
+
+#Row IDs in the search index encode the source table in the low bits
+SEARCH_KIND_WORKOUT = 0
+SEARCH_KIND_EXERCISE = 1
+SEARCH_KIND_WORKOUT_NOTE = 2
+SEARCH_KIND_EXERCISE_NOTE = 3
+SEARCH_KIND_COUNT = 4
+
+#Series returned by the rolling metric queries, in column order
+ROLLING_METRIC_COLUMNS = (
+    "days", "tonnage", "volume_7d", "volume_28d", "acute_chronic_ratio",
+    "best_e1rm", "rolling_best_e1rm", "e1rm_delta", "tonnage_delta",
+)
+
+#Epoch day of a yyyy-MM-dd text date, matching LocalDate.toEpochDay() in the Android app, NULL if unreadable
+EPOCH_DAY_SQL = (
+    "CASE WHEN date(TRIM({date})) = TRIM({date}) "
+    "THEN CAST(julianday(TRIM({date})) - 2440587.5 AS INTEGER) END"
+)
+
+#yyyy-MM-dd text of an epoch day, the form rollups are keyed by whatever the workout's date text looks like
+EPOCH_DAY_DATE_SQL = "date({day} * 86400, 'unixepoch')"
+
+#Change log triggers only record local edits, not changes being applied from a sync
+CAPTURE_CHANGES = "(SELECT value FROM sync_state WHERE key = 'applying') = 0"
+
+#Bump the logical clock and append one entry to the change log
+LOG_CHANGE = """
+    UPDATE sync_state SET value = value + 1 WHERE key = 'clock' AND {when};
+    INSERT INTO change_log (device_id, clock, entity, entity_key, op, payload)
+    SELECT d.value, k.value, '{entity}', {key}, '{op}', {payload}
+    FROM sync_state d, sync_state k WHERE d.key = 'device_id' AND k.key = 'clock' AND {when};
+"""
+
+#Synced tables: entity name, stable key column, columns that count as an edit, and the logged payload
+CHANGE_LOG_SOURCES = [
+    (
+        "workouts", "workout", "uid", "name, date, uid",
+        "json_object('name', {row}.name, 'date', {row}.date)",
+    ),
+    (
+        "exercises", "exercise", "uid", "workout_id, name, sets, reps, weight, uid",
+        "json_object('workout', (SELECT uid FROM workouts WHERE id = {row}.workout_id), 'name', {row}.name, "
+        "'sets', {row}.sets, 'reps', {row}.reps, 'weight', {row}.weight)",
+    ),
+    (
+        "exercises_catalog", "catalog", "name_key", "name, name_key, goal, note",
+        "json_object('name', {row}.name, 'goal', {row}.goal, 'note', {row}.note)",
+    ),
+    (
+        "workout_notes", "workout_note", "workout_name_key", "workout_name, workout_name_key, note",
+        "json_object('workout_name', {row}.workout_name, 'note', {row}.note)",
+    ),
+]
+
+
+#Normalize an exercise or workout name into its lookup key (trimmed and case-folded)
+def normalize_name(name):
+    return (name or "").strip().casefold()
+
 
 #Class for managing the database
 class DBHelper:
-    #Initialize the database connection
-    def __init__(self, db_path="data/workouts.db"):
+    #Initialize the database connection, read-only helpers skip schema setup for background workers
+    #A sync scope, such as a profile ID, keeps this database's change log apart from other databases on the machine
+    def __init__(self, db_path="data/workouts.db", read_only=False, sync_scope=None):
         self.db_path = db_path
-        self.conn = sqlite3.connect(db_path)
+        self.read_only = read_only
+        self.sync_scope = sync_scope
+        self.query_cache = None
+        if read_only:
+            self.conn = sqlite3.connect(f"{Path(db_path).resolve().as_uri()}?mode=ro", uri=True)
+        else:
+            self.conn = sqlite3.connect(db_path)
         self.conn.execute("PRAGMA foreign_keys = ON")
-        self.init_db()
+        self.conn.create_function("name_key", 1, normalize_name, deterministic=True)
+
+        if read_only:
+            c = self.conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'search_index'")
+            self.search_available = c.fetchone() is not None
+        else:
+            self.init_db()
     
     #Initialize the database schema
     def init_db(self):
@@ -52,44 +134,716 @@ class DBHelper:
             )
         """)
 
+        #Index the workout link used by per-workout lookups and the delete cascade
+        c.execute("CREATE INDEX IF NOT EXISTS idx_exercises_workout_id ON exercises (workout_id)")
+
         c.execute("PRAGMA table_info(exercises_catalog)")
         catalog_columns = [row[1] for row in c.fetchall()]
         if "note" not in catalog_columns:
             c.execute("ALTER TABLE exercises_catalog ADD COLUMN note TEXT")
 
+        self.init_name_keys()
+        self.init_epoch_days()
+        self.init_search_index()
+        self.init_data_versions()
+        self.init_daily_rollups()
+        self.init_exercise_stats()
+        self.init_change_log()
+
         #Commit the changes
         self.conn.commit()
-        self.sync_exercise_catalog()
+
+    #Add normalized name keys, their indexes and the catalog link on exercises
+    def init_name_keys(self):
+        c = self.conn.cursor()
+        key_columns = [
+            ("exercises_catalog", "name_key", "name"),
+            ("exercises", "name_key", "name"),
+            ("workout_notes", "workout_name_key", "workout_name"),
+        ]
+        for table, key_column, source_column in key_columns:
+            c.execute(f"PRAGMA table_info({table})")
+            if key_column not in [row[1] for row in c.fetchall()]:
+                c.execute(f"ALTER TABLE {table} ADD COLUMN {key_column} TEXT")
+            c.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_{key_column} ON {table} ({key_column})")
+
+            #Fill in keys for rows written before the column existed
+            c.execute(
+                f"UPDATE {table} SET {key_column} = name_key({source_column}) WHERE {key_column} IS NULL"
+            )
+
+        c.execute("PRAGMA table_info(exercises)")
+        if "catalog_id" not in [row[1] for row in c.fetchall()]:
+            c.execute("ALTER TABLE exercises ADD COLUMN catalog_id INTEGER REFERENCES exercises_catalog(id)")
+        c.execute("CREATE INDEX IF NOT EXISTS idx_exercises_catalog_id ON exercises (catalog_id)")
+
+        #Link new or renamed exercises to the catalog as they are written, adding missing entries
+        c.execute("SELECT 1 FROM sqlite_master WHERE name = 'exercises_catalog_link_insert'")
+        triggers_exist = c.fetchone() is not None
+        link = """
+            INSERT INTO exercises_catalog (name, name_key)
+            SELECT TRIM(NEW.name), NEW.name_key
+            WHERE NOT EXISTS (SELECT 1 FROM exercises_catalog WHERE name_key = NEW.name_key);
+            UPDATE exercises SET catalog_id = (SELECT id FROM exercises_catalog WHERE name_key = NEW.name_key)
+            WHERE id = NEW.id;
+        """
+        c.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS exercises_catalog_link_insert AFTER INSERT ON exercises
+            WHEN NEW.catalog_id IS NULL AND NEW.name_key <> ''
+            BEGIN {link} END
+            """
+        )
+        c.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS exercises_catalog_link_update AFTER UPDATE OF name_key ON exercises
+            WHEN NEW.catalog_id IS NULL AND NEW.name_key <> ''
+            BEGIN {link} END
+            """
+        )
+
+        #Rows written before the triggers existed are linked by one full pass
+        if not triggers_exist:
+            self.sync_exercise_catalog()
+
+    #Add the integer epoch day column on workouts, kept in sync with the text date by triggers
+    def init_epoch_days(self):
+        c = self.conn.cursor()
+        c.execute("PRAGMA table_info(workouts)")
+        if "day" not in [row[1] for row in c.fetchall()]:
+            c.execute("ALTER TABLE workouts ADD COLUMN day INTEGER")
+            c.execute(f"UPDATE workouts SET day = {EPOCH_DAY_SQL.format(date='date')}")
+        c.execute("CREATE INDEX IF NOT EXISTS idx_workouts_day ON workouts (day)")
+
+        epoch_day = EPOCH_DAY_SQL.format(date="NEW.date")
+        set_day = f"UPDATE workouts SET day = {epoch_day} WHERE id = NEW.id;"
+        c.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS workouts_epoch_day_insert AFTER INSERT ON workouts
+            WHEN NEW.day IS NOT ({epoch_day})
+            BEGIN {set_day} END
+            """
+        )
+        c.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS workouts_epoch_day_update AFTER UPDATE OF date, day ON workouts
+            WHEN NEW.day IS NOT ({epoch_day})
+            BEGIN {set_day} END
+            """
+        )
+
+    #Convert a range bound given as an epoch day, date or yyyy-MM-dd string to an epoch day
+    @staticmethod
+    def _epoch_day_bound(value, default):
+        if value is None:
+            return default
+        if isinstance(value, int):
+            return value
+        day = to_epoch_day(value.isoformat() if hasattr(value, "isoformat") else value)
+        if day is None:
+            raise ValueError(f"Invalid date {value!r}, expected yyyy-MM-dd.")
+        return day
+
+    #Create the FTS5 search index and the triggers that keep it in sync
+    def init_search_index(self):
+        c = self.conn.cursor()
+        c.execute("CREATE INDEX IF NOT EXISTS idx_workouts_name ON workouts (name COLLATE NOCASE)")
+
+        c.execute("SELECT 1 FROM sqlite_master WHERE name = 'search_index'")
+        index_exists = c.fetchone() is not None
+        try:
+            c.execute(
+                """
+                CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(
+                    body,
+                    tokenize = 'unicode61 remove_diacritics 2',
+                    prefix = '2 3'
+                )
+                """
+            )
+        except sqlite3.OperationalError:
+            #SQLite was built without FTS5, search falls back to LIKE queries
+            self.search_available = False
+            return
+        self.search_available = True
+
+        #Each source row maps to search rowid = source id * SEARCH_KIND_COUNT + kind
+        sources = [
+            ("workouts", SEARCH_KIND_WORKOUT, "name", "name", None),
+            ("exercises", SEARCH_KIND_EXERCISE, "name", "name", None),
+            ("workout_notes", SEARCH_KIND_WORKOUT_NOTE, "note", "workout_name, note", None),
+            ("exercises_catalog", SEARCH_KIND_EXERCISE_NOTE, "note", "note", "NEW.note IS NOT NULL"),
+        ]
+        for table, kind, body_column, watched_columns, condition in sources:
+            rowid = f"{{row}}.id * {SEARCH_KIND_COUNT} + {kind}"
+            when = f"WHEN {condition}" if condition else ""
+            c.execute(
+                f"""
+                CREATE TRIGGER IF NOT EXISTS {table}_search_insert AFTER INSERT ON {table} {when}
+                BEGIN
+                    INSERT INTO search_index (rowid, body) VALUES ({rowid.format(row="NEW")}, NEW.{body_column});
+                END
+                """
+            )
+            c.execute(
+                f"""
+                CREATE TRIGGER IF NOT EXISTS {table}_search_delete AFTER DELETE ON {table}
+                BEGIN
+                    DELETE FROM search_index WHERE rowid = {rowid.format(row="OLD")};
+                END
+                """
+            )
+            c.execute(
+                f"""
+                CREATE TRIGGER IF NOT EXISTS {table}_search_update AFTER UPDATE OF {watched_columns} ON {table}
+                BEGIN
+                    DELETE FROM search_index WHERE rowid = {rowid.format(row="OLD")};
+                    INSERT INTO search_index (rowid, body)
+                    SELECT {rowid.format(row="NEW")}, NEW.{body_column} WHERE NEW.{body_column} IS NOT NULL;
+                END
+                """
+            )
+
+        if not index_exists:
+            self.rebuild_search_index()
+
+    #Repopulate the search index from the source tables
+    def rebuild_search_index(self):
+        if not self.search_available:
+            return
+
+        c = self.conn.cursor()
+        c.execute("DELETE FROM search_index")
+        c.execute(
+            f"""
+            INSERT INTO search_index (rowid, body)
+            SELECT id * {SEARCH_KIND_COUNT} + {SEARCH_KIND_WORKOUT}, name FROM workouts
+            UNION ALL
+            SELECT id * {SEARCH_KIND_COUNT} + {SEARCH_KIND_EXERCISE}, name FROM exercises
+            UNION ALL
+            SELECT id * {SEARCH_KIND_COUNT} + {SEARCH_KIND_WORKOUT_NOTE}, note FROM workout_notes
+            UNION ALL
+            SELECT id * {SEARCH_KIND_COUNT} + {SEARCH_KIND_EXERCISE_NOTE}, note FROM exercises_catalog
+            WHERE note IS NOT NULL
+            """
+        )
+        c.execute("INSERT INTO search_index (search_index) VALUES ('optimize')")
+        self.conn.commit()
+
+    #Track a version per exercise that triggers bump whenever its history changes
+    def init_data_versions(self):
+        c = self.conn.cursor()
+        c.execute(
+            """
+            CREATE TABLE IF NOT EXISTS exercise_versions (
+                name_key TEXT PRIMARY KEY,
+                version INTEGER NOT NULL
+            ) WITHOUT ROWID
+            """
+        )
+
+        bump = """
+            INSERT INTO exercise_versions (name_key, version) VALUES ({key}, 1)
+            ON CONFLICT(name_key) DO UPDATE SET version = version + 1;
+        """
+        c.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS exercises_version_insert AFTER INSERT ON exercises
+            WHEN NEW.name_key IS NOT NULL
+            BEGIN {bump.format(key="NEW.name_key")} END
+            """
+        )
+        c.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS exercises_version_delete AFTER DELETE ON exercises
+            WHEN OLD.name_key IS NOT NULL
+            BEGIN {bump.format(key="OLD.name_key")} END
+            """
+        )
+        c.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS exercises_version_update AFTER UPDATE ON exercises
+            WHEN NEW.name_key IS NOT NULL
+            BEGIN
+                {bump.format(key="NEW.name_key")}
+                INSERT INTO exercise_versions (name_key, version)
+                SELECT OLD.name_key, 1 WHERE OLD.name_key IS NOT NULL AND OLD.name_key <> NEW.name_key
+                ON CONFLICT(name_key) DO UPDATE SET version = version + 1;
+            END
+            """
+        )
+
+        #Moving a workout to another date changes the history of every exercise in it
+        c.execute(
+            """
+            CREATE TRIGGER IF NOT EXISTS workouts_version_update AFTER UPDATE OF date ON workouts
+            WHEN NEW.date IS NOT OLD.date
+            BEGIN
+                INSERT INTO exercise_versions (name_key, version)
+                SELECT DISTINCT name_key, 1 FROM exercises WHERE workout_id = NEW.id AND name_key IS NOT NULL
+                ON CONFLICT(name_key) DO UPDATE SET version = version + 1;
+            END
+            """
+        )
+
+    #Get the token that changes whenever an exercise's history changes
+    def get_exercise_data_version(self, exercise_name):
+        c = self.conn.cursor()
+        c.execute("SELECT version FROM exercise_versions WHERE name_key = ?", (normalize_name(exercise_name),))
+        row = c.fetchone()
+        return row[0] if row else 0
+
+    #Create the per-day, per-exercise rollup table, filling it the first time
+    def init_daily_rollups(self):
+        c = self.conn.cursor()
+        c.execute("SELECT 1 FROM sqlite_master WHERE name = 'daily_exercise_rollups'")
+        rollups_exist = c.fetchone() is not None
+        c.execute(
+            """
+            CREATE TABLE IF NOT EXISTS daily_exercise_rollups (
+                name_key TEXT NOT NULL,
+                day TEXT NOT NULL,
+                tonnage REAL NOT NULL,
+                set_count INTEGER NOT NULL,
+                rep_count INTEGER NOT NULL,
+                top_weight REAL NOT NULL,
+                top_reps INTEGER NOT NULL,
+                best_e1rm REAL NOT NULL,
+                PRIMARY KEY (name_key, day)
+            ) WITHOUT ROWID
+            """
+        )
+        c.execute("CREATE INDEX IF NOT EXISTS idx_daily_exercise_rollups_day ON daily_exercise_rollups (day)")
+        #Rollups used to be keyed by the raw date text, rebuild them once if any day is not yyyy-MM-dd
+        if rollups_exist:
+            c.execute("SELECT 1 FROM daily_exercise_rollups WHERE date(day) IS NOT day LIMIT 1")
+            rollups_exist = c.fetchone() is None
+        #The change log and its data generation do not exist yet on a first run
+        if not rollups_exist:
+            self._rebuild_rollup_rows()
+
+    #Sum (name_key, day, reps, weight) rows into one rollup per exercise and day
+    @staticmethod
+    def _aggregate_rollups(rows):
+        rollups = {}
+        for name_key, day, reps_str, weights_str in rows:
+            for reps, weight in parse_sets(reps_str, weights_str):
+                rollup = rollups.setdefault((name_key, day), [0.0, 0, 0, 0.0, 0, 0.0])
+                rollup[0] += weight * reps
+                rollup[1] += 1
+                rollup[2] += reps
+                if (weight, reps) > (rollup[3], rollup[4]):
+                    rollup[3] = weight
+                    rollup[4] = reps
+                rollup[5] = max(rollup[5], weight * (1 + reps / 30))
+        return rollups
+
+    def _write_rollups(self, rollups):
+        self.conn.executemany(
+            """
+            INSERT OR REPLACE INTO daily_exercise_rollups
+                (name_key, day, tonnage, set_count, rep_count, top_weight, top_reps, best_e1rm)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            [(name_key, day, *values) for (name_key, day), values in rollups.items()],
+        )
+
+    #Recompute every rollup and change the data generation so cached API responses are dropped
+    def rebuild_daily_rollups(self):
+        self._rebuild_rollup_rows()
+        self._bump_derived_version()
+        self.conn.commit()
+
+    #Recompute every rollup from the raw exercise rows
+    def _rebuild_rollup_rows(self):
+        c = self.conn.cursor()
+        c.execute("DELETE FROM daily_exercise_rollups")
+        rows = c.execute(
+            f"""
+            SELECT e.name_key, {EPOCH_DAY_DATE_SQL.format(day="w.day")}, e.reps, e.weight
+            FROM exercises e JOIN workouts w ON w.id = e.workout_id
+            WHERE e.name_key <> '' AND w.day IS NOT NULL
+            """
+        )
+        self._write_rollups(self._aggregate_rollups(rows))
+
+    #Get the (name_key, day) groups touched by a workout
+    def _workout_rollup_groups(self, workout_id):
+        c = self.conn.cursor()
+        c.execute(
+            f"""
+            SELECT DISTINCT e.name_key, {EPOCH_DAY_DATE_SQL.format(day="w.day")}
+            FROM exercises e JOIN workouts w ON w.id = e.workout_id
+            WHERE e.workout_id = ? AND e.name_key <> '' AND w.day IS NOT NULL
+            """,
+            (workout_id,),
+        )
+        return set(c.fetchall())
+
+    #Recompute the rollups for specific (name_key, day) groups after a write
+    def _refresh_rollups(self, groups):
+        c = self.conn.cursor()
+        for name_key, day in groups:
+            c.execute("DELETE FROM daily_exercise_rollups WHERE name_key = ? AND day = ?", (name_key, day))
+            rows = c.execute(
+                f"""
+                SELECT e.name_key, {EPOCH_DAY_DATE_SQL.format(day="w.day")}, e.reps, e.weight
+                FROM exercises e JOIN workouts w ON w.id = e.workout_id
+                WHERE e.name_key = ? AND w.day = ?
+                """,
+                (name_key, to_epoch_day(day)),
+            ).fetchall()
+            self._write_rollups(self._aggregate_rollups(rows))
+
+    #Recompute every day's rollup for whole exercises, used after renames and merges
+    def _refresh_rollups_for_keys(self, name_keys):
+        c = self.conn.cursor()
+        for name_key in name_keys:
+            c.execute("DELETE FROM daily_exercise_rollups WHERE name_key = ?", (name_key,))
+            rows = c.execute(
+                f"""
+                SELECT e.name_key, {EPOCH_DAY_DATE_SQL.format(day="w.day")}, e.reps, e.weight
+                FROM exercises e JOIN workouts w ON w.id = e.workout_id
+                WHERE e.name_key = ? AND w.day IS NOT NULL
+                """,
+                (name_key,),
+            ).fetchall()
+            self._write_rollups(self._aggregate_rollups(rows))
+
+    #Get rollups for an exercise grouped by day, week (starting Monday) or month
+    def get_rollups(self, exercise_name, period="day", start_date=None, end_date=None):
+        period_starts = {
+            "day": "day",
+            "week": "date(day, 'weekday 0', '-6 days')",
+            "month": "strftime('%Y-%m-01', day)",
+        }
+        if period not in period_starts:
+            raise ValueError(f"Unknown rollup period: {period}")
+
+        #The period's top set is the heaviest day's top set, ties going to more reps
+        query = f"""
+            SELECT period_start,
+                   COUNT(*) AS sessions,
+                   SUM(set_count), SUM(rep_count), SUM(tonnage),
+                   MAX(top_weight), MAX(CASE WHEN top_rank = 1 THEN top_reps END), MAX(best_e1rm)
+            FROM (
+                SELECT {period_starts[period]} AS period_start, set_count, rep_count, tonnage,
+                       top_weight, top_reps, best_e1rm,
+                       ROW_NUMBER() OVER (
+                           PARTITION BY {period_starts[period]} ORDER BY top_weight DESC, top_reps DESC
+                       ) AS top_rank
+                FROM daily_exercise_rollups
+                WHERE name_key = ? AND day >= ? AND day <= ?
+            )
+            GROUP BY period_start
+            ORDER BY period_start
+        """
+        params = (normalize_name(exercise_name), start_date or "", end_date or "\uffff")
+        return self.conn.execute(query, params).fetchall()
+
+    def get_weekly_rollups(self, exercise_name, start_date=None, end_date=None):
+        return self.get_rollups(exercise_name, "week", start_date, end_date)
+
+    def get_monthly_rollups(self, exercise_name, start_date=None, end_date=None):
+        return self.get_rollups(exercise_name, "month", start_date, end_date)
+
+    #Create the table of per-exercise statistics written by batch recomputes
+    def init_exercise_stats(self):
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS exercise_stats (
+                name_key TEXT PRIMARY KEY,
+                session_count INTEGER NOT NULL,
+                best_weight REAL NOT NULL,
+                best_weight_reps INTEGER NOT NULL,
+                best_e1rm REAL NOT NULL,
+                last_day TEXT,
+                data_version INTEGER NOT NULL
+            ) WITHOUT ROWID
+            """
+        )
+
+    #Replace all rollups and exercise statistics from a batch recompute in one transaction
+    def replace_computed_stats(self, rollups, stats):
+        with self.conn:
+            self.conn.execute("DELETE FROM daily_exercise_rollups")
+            self._write_rollups(rollups)
+            self.conn.execute("DELETE FROM exercise_stats")
+            self.conn.executemany(
+                """
+                INSERT INTO exercise_stats
+                    (name_key, session_count, best_weight, best_weight_reps, best_e1rm, last_day, data_version)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                stats,
+            )
+            self._bump_derived_version()
+
+    #Get recomputed statistics with each catalog goal, flagging rows computed before later edits
+    def get_exercise_stats(self):
+        query = """
+            SELECT
+                c.id, c.name, c.goal,
+                s.session_count, s.best_weight, s.best_weight_reps, s.best_e1rm, s.last_day,
+                CASE WHEN c.goal > 0 THEN s.best_weight / c.goal * 100 END AS goal_percent,
+                s.data_version = COALESCE(v.version, 0) AS is_current
+            FROM exercise_stats s
+            JOIN exercises_catalog c ON c.name_key = s.name_key
+            LEFT JOIN exercise_versions v ON v.name_key = s.name_key
+            ORDER BY c.name COLLATE NOCASE
+        """
+        return self.conn.execute(query).fetchall()
+
+    #Rolling training metrics per exercise from the daily rollups, computed with window functions
+    def _query_rolling_metrics(self, name_key=None):
+        where = "AND name_key = ?" if name_key is not None else ""
+        query = f"""
+            WITH days AS (
+                SELECT name_key, day, julianday(day) AS day_number, tonnage, best_e1rm
+                FROM daily_exercise_rollups
+                WHERE julianday(day) IS NOT NULL {where}
+            ),
+            windows AS (
+                SELECT
+                    name_key, day, tonnage, best_e1rm,
+                    SUM(tonnage) OVER (
+                        PARTITION BY name_key ORDER BY day_number
+                        RANGE BETWEEN 6 PRECEDING AND CURRENT ROW
+                    ) AS volume_7d,
+                    SUM(tonnage) OVER (
+                        PARTITION BY name_key ORDER BY day_number
+                        RANGE BETWEEN 27 PRECEDING AND CURRENT ROW
+                    ) AS volume_28d,
+                    MAX(best_e1rm) OVER (
+                        PARTITION BY name_key ORDER BY day_number
+                        ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW
+                    ) AS rolling_best_e1rm,
+                    best_e1rm - LAG(best_e1rm) OVER (PARTITION BY name_key ORDER BY day_number) AS e1rm_delta,
+                    tonnage - LAG(tonnage) OVER (PARTITION BY name_key ORDER BY day_number) AS tonnage_delta
+                FROM days
+            )
+            SELECT
+                name_key, day, tonnage, volume_7d, volume_28d,
+                volume_7d / NULLIF(volume_28d / 4.0, 0) AS acute_chronic_ratio,
+                best_e1rm, rolling_best_e1rm, e1rm_delta, tonnage_delta
+            FROM windows
+            ORDER BY name_key, day
+        """
+        params = (name_key,) if name_key is not None else ()
+        return self.conn.execute(query, params)
+
+    #Get ready-to-plot rolling metric series for one exercise, as lists keyed by metric name
+    def get_rolling_metrics(self, exercise_name):
+        name_key = normalize_name(exercise_name)
+        empty = {column: [] for column in ROLLING_METRIC_COLUMNS}
+        return self.get_all_rolling_metrics(name_key).get(name_key, empty)
+
+    #Get rolling metric series for every exercise (or one name key), keyed by exercise name key
+    def get_all_rolling_metrics(self, name_key=None):
+        metrics = {}
+        for row in self._query_rolling_metrics(name_key):
+            series = metrics.get(row[0])
+            if series is None:
+                series = metrics[row[0]] = {column: [] for column in ROLLING_METRIC_COLUMNS}
+            for column, value in zip(ROLLING_METRIC_COLUMNS, row[1:]):
+                series[column].append(value)
+        return metrics
+
+    #Create the append-only change log, stable row IDs for syncing, and the triggers that record every edit
+    def init_change_log(self):
+        c = self.conn.cursor()
+        c.execute("CREATE TABLE IF NOT EXISTS sync_state (key TEXT PRIMARY KEY, value) WITHOUT ROWID")
+        c.execute("SELECT 1 FROM sqlite_master WHERE name = 'change_log'")
+        log_exists = c.fetchone() is not None
+        c.execute(
+            """
+            CREATE TABLE IF NOT EXISTS change_log (
+                seq INTEGER PRIMARY KEY,
+                device_id TEXT NOT NULL,
+                clock INTEGER NOT NULL,
+                entity TEXT NOT NULL,
+                entity_key TEXT NOT NULL,
+                op TEXT NOT NULL,
+                payload TEXT,
+                UNIQUE (device_id, clock)
+            )
+            """
+        )
+        c.execute("CREATE INDEX IF NOT EXISTS idx_change_log_entity ON change_log (entity, entity_key, clock)")
+
+        #The device ID lives outside the database file so a copied database still logs as this device
+        c.execute("INSERT OR IGNORE INTO sync_state (key, value) VALUES ('clock', 0), ('applying', 0)")
+        #The scope is stored so every tool opening the file logs under the same scoped device ID
+        if self.sync_scope:
+            c.execute("INSERT OR REPLACE INTO sync_state (key, value) VALUES ('sync_scope', ?)", (self.sync_scope,))
+        c.execute("SELECT key, value FROM sync_state WHERE key IN ('sync_scope', 'device_id')")
+        state = dict(c.fetchall())
+        machine_id = local_device_id()
+        device_id = scoped_device_id(machine_id, state.get("sync_scope"))
+        #A profile database logged before it had a scope keeps its own edits, now under the scoped ID
+        if state.get("device_id") == machine_id and device_id != machine_id:
+            c.execute("UPDATE change_log SET device_id = ? WHERE device_id = ?", (device_id, machine_id))
+            c.execute("UPDATE sync_state SET key = ? WHERE key = ?", (f"pushed:{device_id}", f"pushed:{machine_id}"))
+        c.execute("INSERT OR REPLACE INTO sync_state (key, value) VALUES ('device_id', ?)", (device_id,))
+        c.execute("UPDATE sync_state SET value = 0 WHERE key = 'applying'")
+
+        #Rows written before syncing get IDs derived from their local ID, so identical copies agree
+        for table, prefix, extra in (("workouts", "w", "date"), ("exercises", "e", "workout_id")):
+            c.execute(f"PRAGMA table_info({table})")
+            if "uid" not in [row[1] for row in c.fetchall()]:
+                c.execute(f"ALTER TABLE {table} ADD COLUMN uid TEXT")
+            c.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS idx_{table}_uid ON {table} (uid)")
+            c.execute(f"UPDATE {table} SET uid = printf('legacy-{prefix}%d-%s', id, {extra}) WHERE uid IS NULL")
+
+        #Seed the log with the existing data so a new device can be built from the log alone
+        if not log_exists:
+            sources = " UNION ALL ".join(
+                f"SELECT '{entity}' AS entity, {key} AS entity_key, {payload.format(row=table)} AS payload, "
+                f"{i} AS source, id FROM {table} WHERE {key} IS NOT NULL"
+                for i, (table, entity, key, _columns, payload) in enumerate(CHANGE_LOG_SOURCES)
+            )
+            c.execute(
+                f"""
+                INSERT INTO change_log (device_id, clock, entity, entity_key, op, payload)
+                SELECT ?, ROW_NUMBER() OVER (ORDER BY source, id), entity, entity_key, 'upsert', payload
+                FROM ({sources})
+                """,
+                (device_id,),
+            )
+            c.execute("UPDATE sync_state SET value = (SELECT COUNT(*) FROM change_log) WHERE key = 'clock'")
+
+        #Inserts made without a stable ID get a random one, which the update trigger then logs
+        for table in ("workouts", "exercises"):
+            c.execute(
+                f"""
+                CREATE TRIGGER IF NOT EXISTS {table}_assign_uid AFTER INSERT ON {table}
+                WHEN NEW.uid IS NULL
+                BEGIN
+                    UPDATE {table} SET uid = lower(hex(randomblob(16))) WHERE id = NEW.id;
+                END
+                """
+            )
+
+        for table, entity, key, columns, payload in CHANGE_LOG_SOURCES:
+            upsert = LOG_CHANGE.format(
+                entity=entity, key=f"NEW.{key}", op="upsert", payload=payload.format(row="NEW"), when="1"
+            )
+            delete = LOG_CHANGE.format(entity=entity, key=f"OLD.{key}", op="delete", payload="NULL", when="1")
+            c.execute(
+                f"""
+                CREATE TRIGGER IF NOT EXISTS {table}_log_insert AFTER INSERT ON {table}
+                WHEN {CAPTURE_CHANGES} AND NEW.{key} IS NOT NULL
+                BEGIN {upsert} END
+                """
+            )
+            c.execute(
+                f"""
+                CREATE TRIGGER IF NOT EXISTS {table}_log_delete AFTER DELETE ON {table}
+                WHEN {CAPTURE_CHANGES} AND OLD.{key} IS NOT NULL
+                BEGIN {delete} END
+                """
+            )
+
+            #Changing the key (a rename) deletes the old entity before writing the new one
+            rekey = LOG_CHANGE.format(
+                entity=entity, key=f"OLD.{key}", op="delete", payload="NULL",
+                when=f"OLD.{key} IS NOT NULL AND OLD.{key} IS NOT NEW.{key}",
+            )
+            c.execute(
+                f"""
+                CREATE TRIGGER IF NOT EXISTS {table}_log_update AFTER UPDATE OF {columns} ON {table}
+                WHEN {CAPTURE_CHANGES} AND NEW.{key} IS NOT NULL
+                BEGIN {rekey} {upsert} END
+                """
+            )
+
+    #Find the catalog ID for a name, creating the catalog entry if needed
+    def get_or_create_catalog_id(self, name):
+        cleaned_name = (name or "").strip()
+        if not cleaned_name:
+            return None
+
+        c = self.conn.cursor()
+        key = normalize_name(cleaned_name)
+        c.execute("SELECT id FROM exercises_catalog WHERE name_key = ?", (key,))
+        row = c.fetchone()
+        if row:
+            return row[0]
+
+        c.execute("INSERT INTO exercises_catalog (name, name_key) VALUES (?, ?)", (cleaned_name, key))
+        return c.lastrowid
 
     #Add a new workout to the database
+    @invalidates("workouts")
     def add_workout(self, name, date):
         c = self.conn.cursor()
-        c.execute("INSERT INTO workouts (name, date) VALUES (?, ?)", (name, date))
+        c.execute("INSERT INTO workouts (name, date, uid) VALUES (?, ?, ?)", (name, date, uuid.uuid4().hex))
         self.conn.commit()
         return c.lastrowid
 
     #Add a new exercise to a workout
+    @invalidates("exercises", "exercises_catalog")
     def add_exercise(self, workout_id, name, sets, reps, weight):
         c = self.conn.cursor()
+        catalog_id = self.get_or_create_catalog_id(name)
         c.execute(
-            "INSERT INTO exercises (workout_id, name, sets, reps, weight) VALUES (?, ?, ?, ?, ?)",
-            (workout_id, name, sets, reps, weight)
+            """
+            INSERT INTO exercises (workout_id, name, sets, reps, weight, name_key, catalog_id, uid)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (workout_id, name, sets, reps, weight, normalize_name(name), catalog_id, uuid.uuid4().hex)
         )
+        c.execute(f"SELECT {EPOCH_DAY_DATE_SQL.format(day='day')} FROM workouts WHERE id = ?", (workout_id,))
+        workout = c.fetchone()
+        if workout and workout[0] is not None:
+            self._refresh_rollups({(normalize_name(name), workout[0])})
         self.conn.commit()
 
     #Get all goals from the exercises catalog
+    @cached_query("exercises_catalog")
     def get_all_goals(self):
         c = self.conn.cursor()
         c.execute("SELECT id, name, goal FROM exercises_catalog ORDER BY name COLLATE NOCASE ASC")
         return c.fetchall()
     
     #Get all workouts from the database
+    @cached_query("workouts")
     def get_all_workouts(self):
         c = self.conn.cursor()
         c.execute("SELECT id, name, date FROM workouts ORDER BY date DESC, id DESC")
         return c.fetchall()
 
+    #Get one page of workouts, newest first, with the total workout count
+    def get_workouts_page(self, limit, offset=0):
+        c = self.conn.cursor()
+        c.execute(
+            "SELECT id, name, date FROM workouts ORDER BY date DESC, id DESC LIMIT ? OFFSET ?",
+            (limit, offset),
+        )
+        rows = c.fetchall()
+        c.execute("SELECT COUNT(*) FROM workouts")
+        return rows, c.fetchone()[0]
+
+    #Token that changes with every logged edit or derived-data rebuild, from this or any other connection
+    def get_data_generation(self):
+        return self.conn.execute(
+            """
+            SELECT (SELECT COALESCE(MAX(seq), 0) FROM change_log) || '.' ||
+                   (SELECT COALESCE(MAX(value), 0) FROM sync_state WHERE key = 'derived_version')
+            """
+        ).fetchone()[0]
+
+    #Mark rollups or stats rebuilt outside the change log, so generation-keyed caches refresh
+    def _bump_derived_version(self):
+        self.conn.execute(
+            """
+            INSERT INTO sync_state (key, value) VALUES ('derived_version', 1)
+            ON CONFLICT(key) DO UPDATE SET value = value + 1
+            """
+        )
+
     #Get workout summaries with exercise counts for browse screens
+    @cached_query("workouts", "exercises")
     def get_workout_summaries(self):
         query = """
             SELECT
@@ -105,7 +859,92 @@ class DBHelper:
         """
         return self.conn.execute(query).fetchall()
 
+    #Get workouts by ID, keeping the order of the given IDs
+    def get_workouts_by_ids(self, workout_ids):
+        workout_ids = list(workout_ids)
+        if not workout_ids:
+            return []
+
+        placeholders = ", ".join("?" for _ in workout_ids)
+        c = self.conn.cursor()
+        c.execute(f"SELECT id, name, date FROM workouts WHERE id IN ({placeholders})", workout_ids)
+        rows = {row[0]: row for row in c.fetchall()}
+        return [rows[workout_id] for workout_id in workout_ids if workout_id in rows]
+
+    #Search workout names, exercise names and notes, returning ranked workout IDs, every match when limit is None
+    def search(self, query, limit=50):
+        terms = re.findall(r"\w+", query or "")
+        if not terms:
+            return []
+        #SQLite treats a negative LIMIT as no limit
+        limit = -1 if limit is None else limit
+
+        if not self.search_available:
+            return self._search_like(terms, limit)
+
+        #Quote each term and match it as a prefix so partial words still find results
+        match = " ".join(f'"{term}"*' for term in terms)
+        sql = f"""
+            WITH hits AS (
+                SELECT rowid % {SEARCH_KIND_COUNT} AS kind,
+                       rowid / {SEARCH_KIND_COUNT} AS source_id,
+                       bm25(search_index) AS score
+                FROM search_index
+                WHERE search_index MATCH ?
+            ),
+            matches AS (
+                SELECT source_id AS workout_id, score FROM hits WHERE kind = {SEARCH_KIND_WORKOUT}
+                UNION ALL
+                SELECT e.workout_id, h.score
+                FROM hits h JOIN exercises e ON e.id = h.source_id
+                WHERE h.kind = {SEARCH_KIND_EXERCISE}
+                UNION ALL
+                SELECT w.id, h.score
+                FROM hits h
+                JOIN workout_notes n ON n.id = h.source_id
+                JOIN workouts w ON w.name = n.workout_name COLLATE NOCASE
+                WHERE h.kind = {SEARCH_KIND_WORKOUT_NOTE}
+                UNION ALL
+                SELECT e.workout_id, h.score
+                FROM hits h JOIN exercises e ON e.catalog_id = h.source_id
+                WHERE h.kind = {SEARCH_KIND_EXERCISE_NOTE}
+            )
+            SELECT m.workout_id
+            FROM matches m
+            JOIN workouts w ON w.id = m.workout_id
+            GROUP BY m.workout_id
+            ORDER BY MIN(m.score), w.date DESC, w.id DESC
+            LIMIT ?
+        """
+        return [row[0] for row in self.conn.execute(sql, (match, limit)).fetchall()]
+
+    #Substring search used when SQLite has no FTS5 support
+    def _search_like(self, terms, limit):
+        conditions = []
+        params = []
+        for term in terms:
+            conditions.append(
+                """
+                (w.name LIKE ?
+                 OR EXISTS (SELECT 1 FROM exercises e WHERE e.workout_id = w.id AND e.name LIKE ?)
+                 OR EXISTS (SELECT 1 FROM workout_notes n
+                            WHERE n.workout_name = w.name COLLATE NOCASE AND n.note LIKE ?)
+                 OR EXISTS (SELECT 1 FROM exercises e JOIN exercises_catalog c ON c.id = e.catalog_id
+                            WHERE e.workout_id = w.id AND c.note LIKE ?))
+                """
+            )
+            params.extend([f"%{term}%"] * 4)
+
+        sql = f"""
+            SELECT w.id FROM workouts w
+            WHERE {" AND ".join(conditions)}
+            ORDER BY w.date DESC, w.id DESC
+            LIMIT ?
+        """
+        return [row[0] for row in self.conn.execute(sql, (*params, limit)).fetchall()]
+
     #Get all exercises for a specific workout
+    @cached_query("exercises")
     def get_exercises_for_workout(self, workout_id):
         c = self.conn.cursor()
         c.execute(
@@ -114,44 +953,99 @@ class DBHelper:
         )
         return c.fetchall()
 
+    #Get the exercises for many workouts in one query, as {workout_id: [(name, sets, reps, weight), ...]}
+    def get_exercises_for_workouts(self, workout_ids):
+        workout_ids = list(dict.fromkeys(workout_ids))
+        exercises = {workout_id: [] for workout_id in workout_ids}
+
+        #Stay well under SQLite's bound-parameter limit
+        for start in range(0, len(workout_ids), 500):
+            chunk = workout_ids[start:start + 500]
+            placeholders = ", ".join("?" for _ in chunk)
+            rows = self.conn.execute(
+                f"""
+                SELECT workout_id, name, sets, reps, weight
+                FROM exercises
+                WHERE workout_id IN ({placeholders})
+                ORDER BY workout_id, id
+                """,
+                chunk,
+            )
+            for workout_id, name, sets, reps, weight in rows:
+                exercises[workout_id].append((name, sets, reps, weight))
+        return exercises
+
+    #Token that changes after any write, on this connection or committed by another one
+    def get_change_token(self):
+        data_version = self.conn.execute("PRAGMA data_version").fetchone()[0]
+        return self.conn.total_changes, data_version
+
+    #Serve repeated reads from memory until the tables they read are written, off by default
+    def enable_query_cache(self, max_bytes=DEFAULT_MAX_BYTES):
+        if self.query_cache is None:
+            self.query_cache = QueryCache(self.get_change_token, max_bytes)
+        return self.query_cache
+
+    #Hit, miss and memory counts of the query cache, or None when it is off
+    def query_cache_stats(self):
+        return self.query_cache.stats() if self.query_cache else None
+
     #Delete a workout by ID
+    @invalidates("workouts", "exercises")
     def delete_workout(self, workout_id):
         c = self.conn.cursor()
+        groups = self._workout_rollup_groups(workout_id)
         c.execute("DELETE FROM workouts WHERE id = ?", (workout_id,))
+        self._refresh_rollups(groups)
         self.conn.commit()
 
     #Get all exercise names from the catalog
+    @cached_query("exercises_catalog")
     def get_all_exercise_names(self):
         c = self.conn.cursor()
         c.execute("SELECT name FROM exercises_catalog ORDER BY name COLLATE NOCASE ASC")
         return [row[0] for row in c.fetchall()]
 
+    @cached_query("exercises_catalog")
     def get_all_catalog_exercises(self):
         c = self.conn.cursor()
         c.execute("SELECT id, name, goal FROM exercises_catalog ORDER BY name COLLATE NOCASE ASC")
         return c.fetchall()
 
+    #Repair the catalog with a full scan, adding entries and links the triggers missed
+    @invalidates("exercises", "exercises_catalog")
     def sync_exercise_catalog(self):
         c = self.conn.cursor()
         c.execute(
             """
-            INSERT OR IGNORE INTO exercises_catalog (name)
-            SELECT DISTINCT TRIM(name)
-            FROM exercises
-            WHERE TRIM(COALESCE(name, '')) <> ''
+            INSERT INTO exercises_catalog (name, name_key)
+            SELECT TRIM(MIN(e.name)), e.name_key
+            FROM exercises e
+            WHERE e.name_key <> ''
+              AND NOT EXISTS (SELECT 1 FROM exercises_catalog c WHERE c.name_key = e.name_key)
+            GROUP BY e.name_key
+            """
+        )
+        c.execute(
+            """
+            UPDATE exercises
+            SET catalog_id = (SELECT c.id FROM exercises_catalog c WHERE c.name_key = exercises.name_key)
+            WHERE catalog_id IS NULL AND name_key <> ''
             """
         )
         self.conn.commit()
 
+    @cached_query("exercises_catalog")
     def get_catalog_exercise_by_name(self, name):
         c = self.conn.cursor()
         c.execute(
-            "SELECT id, name, goal, note FROM exercises_catalog WHERE LOWER(name) = LOWER(?)",
-            (name,),
+            "SELECT id, name, goal, note FROM exercises_catalog WHERE name_key = ?",
+            (normalize_name(name),),
         )
         return c.fetchone()
 
     #Add a new exercise to the catalog
+    @invalidates("exercises_catalog")
     def add_exercise_to_catalog(self, name):
         cleaned_name = (name or "").strip()
         if not cleaned_name:
@@ -161,10 +1055,14 @@ class DBHelper:
             raise ValueError("That exercise already exists.")
 
         c = self.conn.cursor()
-        c.execute("INSERT INTO exercises_catalog (name) VALUES (?)", (cleaned_name,))
+        c.execute(
+            "INSERT INTO exercises_catalog (name, name_key) VALUES (?, ?)",
+            (cleaned_name, normalize_name(cleaned_name)),
+        )
         self.conn.commit()
         return c.lastrowid
 
+    @invalidates("exercises", "exercises_catalog")
     def rename_exercise_in_catalog(self, exercise_id, new_name, combine_existing=False):
         cleaned_name = (new_name or "").strip()
         if not cleaned_name:
@@ -193,38 +1091,68 @@ class DBHelper:
             current_note = self.get_exercise_note(current_name)
             merged_note = target_note or current_note
 
-            c.execute(
-                "UPDATE exercises SET name = ? WHERE LOWER(name) = LOWER(?)",
-                (target_name, current_name),
-            )
+            self._rename_exercise_rows(c, exercise_id, current_name, target_name, target_id)
             c.execute("UPDATE exercises_catalog SET goal = ?, note = ? WHERE id = ?", (merged_goal, merged_note, target_id))
             c.execute("DELETE FROM exercises_catalog WHERE id = ?", (exercise_id,))
+            self._refresh_rollups_for_keys({normalize_name(current_name), normalize_name(target_name)})
             self.conn.commit()
             return {"combined": True, "name": target_name}
 
-        c.execute("UPDATE exercises SET name = ? WHERE LOWER(name) = LOWER(?)", (cleaned_name, current_name))
-        c.execute("UPDATE exercises_catalog SET name = ? WHERE id = ?", (cleaned_name, exercise_id))
+        cleaned_key = normalize_name(cleaned_name)
+        self._rename_exercise_rows(c, exercise_id, current_name, cleaned_name, exercise_id)
+        c.execute(
+            "UPDATE exercises_catalog SET name = ?, name_key = ? WHERE id = ?",
+            (cleaned_name, cleaned_key, exercise_id),
+        )
+        self._refresh_rollups_for_keys({normalize_name(current_name), cleaned_key})
         self.conn.commit()
         return {"combined": False, "name": cleaned_name}
 
+    #Move every logged exercise of a catalog entry to a new name, syncing it as one catalog-level change
+    def _rename_exercise_rows(self, c, catalog_id, old_name, new_name, new_catalog_id):
+        #Other devices apply the rename themselves instead of receiving one change per historical row
+        c.execute("UPDATE sync_state SET value = 1 WHERE key = 'applying'")
+        try:
+            c.execute(
+                "UPDATE exercises SET name = ?, name_key = ?, catalog_id = ? WHERE catalog_id = ?",
+                (new_name, normalize_name(new_name), new_catalog_id, catalog_id),
+            )
+        finally:
+            c.execute("UPDATE sync_state SET value = 0 WHERE key = 'applying'")
+        self._log_change(c, "catalog_rename", normalize_name(old_name), "upsert", {"name": new_name})
+
     #Update the goal for an exercise in the catalog
+    @invalidates("exercises_catalog")
     def update_goal(self, exercise_id, new_goal):
         c = self.conn.cursor()
         c.execute("UPDATE exercises_catalog SET goal = ? WHERE id = ?", (new_goal, exercise_id))
         self.conn.commit()
 
+    #Update many goals in one transaction from a {exercise_id: goal} mapping
+    @invalidates("exercises_catalog")
+    def update_goals(self, goals):
+        c = self.conn.cursor()
+        c.executemany(
+            "UPDATE exercises_catalog SET goal = ? WHERE id = ?",
+            [(goal, exercise_id) for exercise_id, goal in goals.items()],
+        )
+        self.conn.commit()
+        return c.rowcount
+
+    @cached_query("workout_notes")
     def get_workout_note(self, workout_name):
         cleaned_name = (workout_name or "").strip()
         if not cleaned_name:
             return ""
         c = self.conn.cursor()
         c.execute(
-            "SELECT note FROM workout_notes WHERE LOWER(workout_name) = LOWER(?)",
-            (cleaned_name,),
+            "SELECT note FROM workout_notes WHERE workout_name_key = ?",
+            (normalize_name(cleaned_name),),
         )
         row = c.fetchone()
         return row[0] if row and row[0] else ""
 
+    @invalidates("workout_notes")
     def set_workout_note(self, workout_name, note):
         cleaned_name = (workout_name or "").strip()
         cleaned_note = (note or "").strip()
@@ -232,38 +1160,38 @@ class DBHelper:
             raise ValueError("Workout name is required before saving a note.")
 
         c = self.conn.cursor()
-        c.execute(
-            "SELECT id FROM workout_notes WHERE LOWER(workout_name) = LOWER(?)",
-            (cleaned_name,),
-        )
+        key = normalize_name(cleaned_name)
+        c.execute("SELECT id FROM workout_notes WHERE workout_name_key = ?", (key,))
         existing = c.fetchone()
         if cleaned_note:
             if existing:
                 c.execute(
-                    "UPDATE workout_notes SET workout_name = ?, note = ? WHERE LOWER(workout_name) = LOWER(?)",
-                    (cleaned_name, cleaned_note, cleaned_name),
+                    "UPDATE workout_notes SET workout_name = ?, note = ? WHERE id = ?",
+                    (cleaned_name, cleaned_note, existing[0]),
                 )
             else:
                 c.execute(
-                    "INSERT INTO workout_notes (workout_name, note) VALUES (?, ?)",
-                    (cleaned_name, cleaned_note),
+                    "INSERT INTO workout_notes (workout_name, workout_name_key, note) VALUES (?, ?, ?)",
+                    (cleaned_name, key, cleaned_note),
                 )
         else:
-            c.execute("DELETE FROM workout_notes WHERE LOWER(workout_name) = LOWER(?)", (cleaned_name,))
+            c.execute("DELETE FROM workout_notes WHERE workout_name_key = ?", (key,))
         self.conn.commit()
 
+    @cached_query("exercises_catalog")
     def get_exercise_note(self, exercise_name):
         cleaned_name = (exercise_name or "").strip()
         if not cleaned_name:
             return ""
         c = self.conn.cursor()
         c.execute(
-            "SELECT note FROM exercises_catalog WHERE LOWER(name) = LOWER(?)",
-            (cleaned_name,),
+            "SELECT note FROM exercises_catalog WHERE name_key = ?",
+            (normalize_name(cleaned_name),),
         )
         row = c.fetchone()
         return row[0] if row and row[0] else ""
 
+    @invalidates("exercises_catalog")
     def set_exercise_note(self, exercise_name, note):
         cleaned_name = (exercise_name or "").strip()
         cleaned_note = (note or "").strip()
@@ -271,73 +1199,413 @@ class DBHelper:
             raise ValueError("Exercise name is required before saving a note.")
 
         c = self.conn.cursor()
-        c.execute("INSERT OR IGNORE INTO exercises_catalog (name) VALUES (?)", (cleaned_name,))
+        catalog_id = self.get_or_create_catalog_id(cleaned_name)
         c.execute(
-            "UPDATE exercises_catalog SET note = ? WHERE LOWER(name) = LOWER(?)",
-            (cleaned_note or None, cleaned_name),
+            "UPDATE exercises_catalog SET note = ? WHERE id = ?",
+            (cleaned_note or None, catalog_id),
         )
         self.conn.commit()
 
-    #Get the best set per exercise
+    #Get the (weight, reps) of an exercise's heaviest set, more reps breaking ties
+    @cached_query("exercises")
     def get_highest_weight_for_exercise(self, exercise_name):
         c = self.conn.cursor()
-
         c.execute(
-            "SELECT weight, reps FROM exercises WHERE name = ?",
-            (exercise_name,),
+            "SELECT reps, weight FROM exercises WHERE name_key = ?",
+            (normalize_name(exercise_name),),
         )
-        rows = c.fetchall()  # [(weight_str, reps_str), ...]
-
-        max_weight = 0.0
-        max_reps = 0
-
-        for weight_str, reps_str in rows:
-            if not weight_str or not reps_str:
-                continue
-
-            weights = [float(w.strip()) for w in weight_str.split(",") if w.strip()]
-            reps = [int(r.strip()) for r in reps_str.split(",") if r.strip()]
-
-            # Ensure alignment safety
-            for w, r in zip(weights, reps):
-                if w > max_weight:
-                    max_weight = w
-                    max_reps = r
-
-        return max_weight, max_reps
+        sets = (
+            (weight, reps)
+            for reps_str, weights_str in c.fetchall()
+            for reps, weight in parse_sets(reps_str, weights_str)
+        )
+        return max(sets, default=(0.0, 0))
  
     #List all weights for a specific exercise
     def list_exercise_weights(self, exercise_name):
         c = self.conn.cursor()
-        c.execute("SELECT weight FROM exercises WHERE name = ?", (exercise_name,))
+        c.execute("SELECT weight FROM exercises WHERE name_key = ?", (normalize_name(exercise_name),))
         return c.fetchall()
 
     #Get a workout by ID
+    @cached_query("workouts")
     def get_workout_by_id(self, workout_id):
         c = self.conn.cursor()
         c.execute("SELECT id, name, date FROM workouts WHERE id = ?", (workout_id,))
         return c.fetchone()
 
     #Update a workout in the database
+    @invalidates("workouts")
     def update_workout(self, workout_id, name, date):
+        groups = self._workout_rollup_groups(workout_id)
         self.conn.execute("UPDATE workouts SET name=?, date=? WHERE id=?", (name, date, workout_id))
+        self._refresh_rollups(groups | self._workout_rollup_groups(workout_id))
         self.conn.commit()
 
     #Delete exercises for a specific workout
+    @invalidates("exercises")
     def delete_exercises_for_workout(self, workout_id):
+        groups = self._workout_rollup_groups(workout_id)
         self.conn.execute("DELETE FROM exercises WHERE workout_id=?", (workout_id,))
+        self._refresh_rollups(groups)
+        self.conn.commit()
+
+    #Compare exercise rows by value, so 100 and 100.0 or "8,8" and "8, 8" count as unchanged
+    @staticmethod
+    def _exercise_signature(name, sets, reps, weight):
+        return (name, int(sets or 0), tuple(parse_sets(reps, weight)) or (str(reps), str(weight)))
+
+    #Replace a workout's exercises with new (name, sets, reps, weight) rows, writing only what changed
+    @invalidates("exercises", "exercises_catalog")
+    def update_workout_exercises(self, workout_id, new_exercises):
+        c = self.conn.cursor()
+        c.execute(
+            "SELECT id, name, sets, reps, weight, name_key FROM exercises WHERE workout_id = ? ORDER BY id",
+            (workout_id,),
+        )
+        old_rows = c.fetchall()
+        new_rows = [tuple(exercise) for exercise in new_exercises]
+
+        #Match unchanged rows in order, exercises are listed by row ID so new rows can only go at the end
+        matcher = SequenceMatcher(
+            None,
+            [self._exercise_signature(*row[1:5]) for row in old_rows],
+            [self._exercise_signature(*row) for row in new_rows],
+            autojunk=False,
+        )
+        updates, deletes, inserts = [], [], []
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if tag == "equal":
+                continue
+            if j2 - j1 > i2 - i1 and i2 < len(old_rows):
+                updates, deletes, inserts = None, None, None
+                break
+            paired = min(i2 - i1, j2 - j1)
+            updates.extend(zip(old_rows[i1:i1 + paired], new_rows[j1:j1 + paired]))
+            deletes.extend(old_rows[i1 + paired:i2])
+            inserts.extend(new_rows[j1 + paired:j2])
+
+        #A reorder or an insert in the middle rewrites the rows by position instead
+        if updates is None:
+            paired = min(len(old_rows), len(new_rows))
+            updates = [
+                (old, new) for old, new in zip(old_rows, new_rows)
+                if self._exercise_signature(*old[1:5]) != self._exercise_signature(*new)
+            ]
+            deletes = old_rows[paired:]
+            inserts = new_rows[paired:]
+
+        changes = {"inserted": [], "updated": [], "deleted": [], "name_keys": set()}
+        for old, (name, sets, reps, weight) in updates:
+            key = normalize_name(name)
+            c.execute(
+                """
+                UPDATE exercises SET name = ?, sets = ?, reps = ?, weight = ?, name_key = ?, catalog_id = ?
+                WHERE id = ?
+                """,
+                (name, sets, reps, weight, key, self.get_or_create_catalog_id(name), old[0]),
+            )
+            changes["updated"].append(old[0])
+            changes["name_keys"].update((old[5], key))
+
+        if deletes:
+            c.executemany("DELETE FROM exercises WHERE id = ?", [(row[0],) for row in deletes])
+            changes["deleted"] = [row[0] for row in deletes]
+            changes["name_keys"].update(row[5] for row in deletes)
+
+        for name, sets, reps, weight in inserts:
+            key = normalize_name(name)
+            c.execute(
+                """
+                INSERT INTO exercises (workout_id, name, sets, reps, weight, name_key, catalog_id, uid)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (workout_id, name, sets, reps, weight, key, self.get_or_create_catalog_id(name), uuid.uuid4().hex),
+            )
+            changes["inserted"].append(c.lastrowid)
+            changes["name_keys"].add(key)
+
+        changes["name_keys"].discard(None)
+        c.execute(f"SELECT {EPOCH_DAY_DATE_SQL.format(day='day')} FROM workouts WHERE id = ?", (workout_id,))
+        workout = c.fetchone()
+        if workout and workout[0] is not None:
+            self._refresh_rollups({(key, workout[0]) for key in changes["name_keys"] if key})
         self.conn.commit()
+        return changes
 
-    #Get the exercise history for a specific exercise
+    #Get the exercise history for a specific exercise as a columnar ExerciseHistory
     def get_exercise_history(self, exercise_name):
+        return self.history_between(exercise_name)
+
+    #Get an exercise's history between two dates (inclusive, open-ended when None) through the day index
+    def history_between(self, exercise_name, start=None, end=None):
+        low = self._epoch_day_bound(start, -2**31)
+        high = self._epoch_day_bound(end, 2**31 - 1)
         query = """
-            SELECT w.date, e.reps, e.weight
+            SELECT w.date, e.reps, e.weight, w.day
             FROM exercises e
             JOIN workouts w ON e.workout_id = w.id
-            WHERE e.name = ?
-            ORDER BY w.date
+            WHERE e.name_key = ? AND (w.day BETWEEN ? AND ? OR w.day IS NULL)
+            ORDER BY w.day
         """
-        return self.conn.execute(query, (exercise_name,)).fetchall()
+        rows = self.conn.execute(query, (normalize_name(exercise_name), low, high))
+        rows = [row for row in self._fill_missing_days(rows, 0, 3) if row[3] is not None and low <= row[3] <= high]
+        rows.sort(key=lambda row: row[3])
+        return ExerciseHistory.from_rows(rows)
+
+    #Get (id, name, date, epoch day) for workouts between two dates (inclusive), oldest first
+    def workouts_between(self, start=None, end=None):
+        low = self._epoch_day_bound(start, -2**31)
+        high = self._epoch_day_bound(end, 2**31 - 1)
+        c = self.conn.cursor()
+        c.execute(
+            "SELECT id, name, date, day FROM workouts WHERE day BETWEEN ? AND ? OR day IS NULL ORDER BY day, id",
+            (low, high),
+        )
+        rows = [
+            row for row in self._fill_missing_days(c.fetchall(), 2, 3)
+            if row[3] is not None and low <= row[3] <= high
+        ]
+        rows.sort(key=lambda row: (row[3], row[0]))
+        return rows
+
+    #Get every catalog exercise with its goal and full history in one grouped query, dated by epoch day
+    def get_all_exercise_histories(self):
+        query = """
+            SELECT c.id, c.name, c.goal, w.day, e.reps, e.weight, w.date
+            FROM exercises_catalog c
+            LEFT JOIN exercises e ON e.catalog_id = c.id
+            LEFT JOIN workouts w ON w.id = e.workout_id
+            ORDER BY c.name COLLATE NOCASE, c.id, w.day
+        """
+        return [row[:-1] for row in self._fill_missing_days(self.conn.execute(query), 6, 3)]
+
+    #Parse the text date of rows whose epoch day SQLite could not compute, e.g. compact 20240105 dates
+    @staticmethod
+    def _fill_missing_days(rows, date_column, day_column):
+        for row in rows:
+            if row[day_column] is None and row[date_column] is not None:
+                row = row[:day_column] + (to_epoch_day(row[date_column]),) + row[day_column + 1:]
+            yield row
+
+    #Get this device's ID and the current logical clock
+    def get_sync_clock(self):
+        c = self.conn.cursor()
+        c.execute("SELECT key, value FROM sync_state WHERE key IN ('device_id', 'clock')")
+        state = dict(c.fetchall())
+        return state["device_id"], state["clock"]
+
+    #Get the highest logged clock for every device, including changes pulled from other devices
+    def get_device_clocks(self):
+        c = self.conn.cursor()
+        c.execute("SELECT device_id, MAX(clock) FROM change_log GROUP BY device_id")
+        return dict(c.fetchall())
+
+    #Get the last clock this device pushed to the sync store
+    def get_pushed_clock(self):
+        device_id, _clock = self.get_sync_clock()
+        c = self.conn.cursor()
+        c.execute("SELECT value FROM sync_state WHERE key = ?", (f"pushed:{device_id}",))
+        row = c.fetchone()
+        return row[0] if row else 0
+
+    def set_pushed_clock(self, clock):
+        device_id, _clock = self.get_sync_clock()
+        self.conn.execute(
+            "INSERT OR REPLACE INTO sync_state (key, value) VALUES (?, ?)", (f"pushed:{device_id}", clock)
+        )
+        self.conn.commit()
+
+    #Get this device's change log entries after a clock, oldest first
+    def get_local_changes(self, after_clock=0):
+        device_id, _clock = self.get_sync_clock()
+        c = self.conn.cursor()
+        c.execute(
+            """
+            SELECT device_id, clock, entity, entity_key, op, payload
+            FROM change_log WHERE device_id = ? AND clock > ?
+            ORDER BY clock
+            """,
+            (device_id, after_clock),
+        )
+        return c.fetchall()
+
+    #Apply change log entries from other devices in one transaction, the newest write to each entity wins
+    @invalidates("workouts", "exercises", "exercises_catalog", "workout_notes")
+    def apply_changes(self, changes):
+        c = self.conn.cursor()
+        applied = 0
+        touched_keys = set()
+        try:
+            c.execute("UPDATE sync_state SET value = 1 WHERE key = 'applying'")
+            for change in sorted(changes, key=lambda change: (change[1], change[0])):
+                device_id, clock, entity, entity_key, op, payload = change
+                c.execute(
+                    """
+                    INSERT OR IGNORE INTO change_log (device_id, clock, entity, entity_key, op, payload)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    """,
+                    change,
+                )
+                if c.rowcount == 0:
+                    continue
+
+                #Skip entries already superseded by a later edit from any device
+                c.execute(
+                    """
+                    SELECT device_id, clock FROM change_log WHERE entity = ? AND entity_key = ?
+                    ORDER BY clock DESC, device_id DESC LIMIT 1
+                    """,
+                    (entity, entity_key),
+                )
+                if c.fetchone() != (device_id, clock):
+                    continue
+
+                data = json.loads(payload) if payload else None
+                self._apply_change(c, entity, entity_key, op, data, touched_keys, clock)
+                applied += 1
+
+            #Keep the logical clock ahead of everything seen so far
+            if changes:
+                c.execute(
+                    "UPDATE sync_state SET value = MAX(value, ?) WHERE key = 'clock'",
+                    (max(change[1] for change in changes),),
+                )
+            c.execute("UPDATE sync_state SET value = 0 WHERE key = 'applying'")
+            self._refresh_rollups_for_keys(touched_keys)
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        return applied
+
+    #Append one entry to the change log from Python, for changes the table triggers do not describe
+    def _log_change(self, c, entity, entity_key, op, data):
+        c.execute("UPDATE sync_state SET value = value + 1 WHERE key = 'clock'")
+        c.execute(
+            """
+            INSERT INTO change_log (device_id, clock, entity, entity_key, op, payload)
+            SELECT d.value, k.value, ?, ?, ?, ?
+            FROM sync_state d, sync_state k WHERE d.key = 'device_id' AND k.key = 'clock'
+            """,
+            (entity, entity_key, op, json.dumps(data) if data is not None else None),
+        )
+
+    #Follow catalog renames logged after a change, so an older exercise edit arriving late keeps the new name
+    def _renamed_exercise_name(self, c, name, clock):
+        seen = set()
+        while normalize_name(name) not in seen:
+            seen.add(normalize_name(name))
+            c.execute(
+                """
+                SELECT clock, payload FROM change_log
+                WHERE entity = 'catalog_rename' AND entity_key = ? AND clock > ?
+                ORDER BY clock DESC, device_id DESC LIMIT 1
+                """,
+                (normalize_name(name), clock),
+            )
+            row = c.fetchone()
+            if not row:
+                break
+            clock, name = row[0], json.loads(row[1])["name"]
+        return name
+
+    #Write one change to its source table, collecting the exercise keys whose rollups need refreshing
+    def _apply_change(self, c, entity, entity_key, op, data, touched_keys, clock=0):
+        if entity == "workout":
+            c.execute(
+                """
+                SELECT DISTINCT e.name_key FROM exercises e JOIN workouts w ON w.id = e.workout_id
+                WHERE w.uid = ?
+                """,
+                (entity_key,),
+            )
+            touched_keys.update(row[0] for row in c.fetchall())
+            if op == "delete":
+                c.execute("DELETE FROM workouts WHERE uid = ?", (entity_key,))
+            else:
+                c.execute(
+                    """
+                    INSERT INTO workouts (uid, name, date) VALUES (?, ?, ?)
+                    ON CONFLICT(uid) DO UPDATE SET name = excluded.name, date = excluded.date
+                    """,
+                    (entity_key, data["name"], data["date"]),
+                )
+
+        elif entity == "exercise":
+            c.execute("SELECT name_key FROM exercises WHERE uid = ?", (entity_key,))
+            touched_keys.update(row[0] for row in c.fetchall())
+            if op == "delete":
+                c.execute("DELETE FROM exercises WHERE uid = ?", (entity_key,))
+                return
+
+            c.execute("SELECT id FROM workouts WHERE uid = ?", (data["workout"],))
+            workout = c.fetchone()
+            if not workout:
+                #The workout was deleted by a later change
+                return
+            name = self._renamed_exercise_name(c, data["name"], clock)
+            key = normalize_name(name)
+            touched_keys.add(key)
+            c.execute(
+                """
+                INSERT INTO exercises (uid, workout_id, name, sets, reps, weight, name_key, catalog_id)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(uid) DO UPDATE SET
+                    workout_id = excluded.workout_id, name = excluded.name, sets = excluded.sets,
+                    reps = excluded.reps, weight = excluded.weight, name_key = excluded.name_key,
+                    catalog_id = excluded.catalog_id
+                """,
+                (
+                    entity_key, workout[0], name, data["sets"], data["reps"], data["weight"],
+                    key, self.get_or_create_catalog_id(name),
+                ),
+            )
+
+        elif entity == "catalog":
+            if op == "delete":
+                #Exercises still pointing at the entry keep it until a later change moves them
+                c.execute(
+                    """
+                    DELETE FROM exercises_catalog WHERE name_key = ?
+                      AND NOT EXISTS (SELECT 1 FROM exercises e WHERE e.catalog_id = exercises_catalog.id)
+                    """,
+                    (entity_key,),
+                )
+                return
+            c.execute(
+                "UPDATE exercises_catalog SET name = ?, goal = ?, note = ? WHERE name_key = ?",
+                (data["name"], data["goal"], data["note"], entity_key),
+            )
+            if c.rowcount == 0:
+                c.execute(
+                    "INSERT INTO exercises_catalog (name, name_key, goal, note) VALUES (?, ?, ?, ?)",
+                    (data["name"], entity_key, data["goal"], data["note"]),
+                )
+
+        elif entity == "catalog_rename":
+            new_key = normalize_name(data["name"])
+            c.execute("SELECT DISTINCT name_key FROM exercises WHERE name_key IN (?, ?)", (entity_key, new_key))
+            touched_keys.update(row[0] for row in c.fetchall())
+            touched_keys.add(new_key)
+            c.execute(
+                "UPDATE exercises SET name = ?, name_key = ?, catalog_id = ? WHERE name_key = ?",
+                (data["name"], new_key, self.get_or_create_catalog_id(data["name"]), entity_key),
+            )
+
+        elif entity == "workout_note":
+            if op == "delete":
+                c.execute("DELETE FROM workout_notes WHERE workout_name_key = ?", (entity_key,))
+                return
+            c.execute(
+                "UPDATE workout_notes SET workout_name = ?, note = ? WHERE workout_name_key = ?",
+                (data["workout_name"], data["note"], entity_key),
+            )
+            if c.rowcount == 0:
+                c.execute(
+                    "INSERT INTO workout_notes (workout_name, workout_name_key, note) VALUES (?, ?, ?)",
+                    (data["workout_name"], entity_key, data["note"]),
+                )
 
     #Close the active database connection
     def close(self):
@@ -0,0 +1,147 @@
+"""Compact columnar storage for one exercise's set history."""
+
+from array import array
+from datetime import date
+
+
+#Epoch days count from 1970-01-01, matching LocalDate.toEpochDay() in the Android app
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def parse_sets(reps_str, weights_str):
+    """Split comma-separated reps and weights into (reps, weight) pairs, skipping unreadable sets.
+
+    A single set may come back from SQLite as a number, including a bodyweight set of 0.0:
+
+    >>> parse_sets("10", 0.0)
+    [(10, 0.0)]
+    >>> parse_sets("5,5", "100,102.5")
+    [(5, 100.0), (5, 102.5)]
+    """
+    reps_text = "" if reps_str is None else str(reps_str)
+    weights_text = "" if weights_str is None else str(weights_str)
+    sets = []
+    for reps_text, weight_text in zip(reps_text.split(","), weights_text.split(",")):
+        try:
+            sets.append((int(reps_text.strip()), float(weight_text.strip())))
+        except ValueError:
+            continue
+    return sets
+
+
+def to_epoch_day(date_str):
+    """Convert a yyyy-MM-dd string to an epoch day, or None when it cannot be read."""
+    try:
+        return date.fromisoformat(str(date_str).strip()).toordinal() - EPOCH_ORDINAL
+    except ValueError:
+        return None
+
+
+def from_epoch_day(day):
+    """Convert an epoch day back to a yyyy-MM-dd string."""
+    return date.fromordinal(int(day) + EPOCH_ORDINAL).isoformat()
+
+
+class HistorySession:
+    """Lightweight view of one session (one logged exercise row) inside an ExerciseHistory."""
+
+    __slots__ = ("history", "index")
+
+    def __init__(self, history, index):
+        self.history = history
+        self.index = index
+
+    @property
+    def day(self):
+        return self.history.days[self.index]
+
+    @property
+    def date(self):
+        return from_epoch_day(self.day)
+
+    @property
+    def reps(self):
+        return self.history.reps[self.history.offsets[self.index]:self.history.offsets[self.index + 1]]
+
+    @property
+    def weights(self):
+        return self.history.weights[self.history.offsets[self.index]:self.history.offsets[self.index + 1]]
+
+    def sets(self):
+        return list(zip(self.reps, self.weights))
+
+    def __repr__(self):
+        return f"HistorySession({self.date!r}, sets={self.sets()!r})"
+
+
+class ExerciseHistory:
+    """Sessions in date order stored as typed columns instead of per-row strings.
+
+    ``days`` holds each session's epoch day. ``reps`` and ``weights`` hold every set back to back,
+    and the sets of session ``i`` are ``offsets[i]:offsets[i + 1]``.
+    """
+
+    __slots__ = ("days", "offsets", "reps", "weights")
+
+    def __init__(self, days=None, offsets=None, reps=None, weights=None):
+        self.days = days if days is not None else array("i")
+        self.offsets = offsets if offsets is not None else array("i", [0])
+        self.reps = reps if reps is not None else array("i")
+        self.weights = weights if weights is not None else array("d")
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Build from (date, reps, weights) rows, dropping rows with no date or no readable sets.
+
+        Rows may carry a fourth epoch day column, as read from ``workouts.day``, which is used
+        instead of parsing the date when it is not None.
+        """
+        history = cls()
+        for date_str, reps_str, weights_str, *epoch_day in rows:
+            day = epoch_day[0] if epoch_day and epoch_day[0] is not None else to_epoch_day(date_str)
+            sets = parse_sets(reps_str, weights_str)
+            if day is None or not sets:
+                continue
+            history.days.append(day)
+            for reps, weight in sets:
+                history.reps.append(reps)
+                history.weights.append(weight)
+            history.offsets.append(len(history.reps))
+        return history
+
+    def __len__(self):
+        return len(self.days)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("session index out of range")
+        return HistorySession(self, index)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield HistorySession(self, index)
+
+    @property
+    def set_count(self):
+        return len(self.reps)
+
+    def set_counts(self):
+        """Return the number of sets in each session."""
+        return array("i", (self.offsets[i + 1] - self.offsets[i] for i in range(len(self))))
+
+    def top_set(self):
+        """Return the (weight, reps) of the heaviest set, more reps breaking ties, or (0.0, 0) when empty."""
+        return max(zip(self.weights, self.reps), default=(0.0, 0))
+
+    def nbytes(self):
+        """Return the memory held by the column buffers."""
+        return sum(column.itemsize * len(column) for column in (self.days, self.offsets, self.reps, self.weights))
+
+    def to_rows(self):
+        """Convert back to (date, reps, weights) string rows, for exports and older callers."""
+        return [
+            (session.date, ",".join(str(r) for r in session.reps), ",".join(f"{w:g}" for w in session.weights))
+            for session in self
+        ]
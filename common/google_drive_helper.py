@@ -211,6 +211,36 @@ class GoogleDriveHelper:
         ).execute()
         return created.get("id")
 
+    def create_in_folder(self, file_path, file_name, folder_name="Workout Tracker Backups",
+                         mime_type="application/octet-stream"):
+        """Upload a new file into a folder without looking for an existing file to replace."""
+        self._ensure_service()
+        _build, media_upload_cls, _media_download, _installed_app_flow, _request_cls = get_google_client_modules()
+        folder_id = self.get_or_create_folder(folder_name)
+        created = self.service.files().create(
+            body={"name": file_name, "parents": [folder_id]},
+            media_body=media_upload_cls(file_path, mimetype=mime_type),
+            fields="id",
+        ).execute()
+        return created.get("id")
+
+    def delete_files(self, file_ids):
+        """Delete many Drive files using batch requests of up to 100 calls each."""
+        self._ensure_service()
+        errors = []
+
+        def collect(_request_id, _response, exception):
+            if exception is not None:
+                errors.append(exception)
+
+        for start in range(0, len(file_ids), 100):
+            batch = self.service.new_batch_http_request(callback=collect)
+            for file_id in file_ids[start:start + 100]:
+                batch.add(self.service.files().delete(fileId=file_id))
+            batch.execute()
+        if errors:
+            raise RuntimeError(f"Could not delete {len(errors)} of {len(file_ids)} Drive files: {errors[0]}")
+
     def download_from_folder(self, folder_name="Workout Tracker Backups", local_dir=".", files=None):
         """Download selected files from the backup folder in newest-first order."""
         self._ensure_service()
@@ -236,6 +266,38 @@ class GoogleDriveHelper:
             raise FileNotFoundError(f"No matching files found in folder '{folder_name}'")
         return downloaded
 
+    def list_folder(self, folder_name="Workout Tracker Backups", name_prefix=None):
+        """List the files in a Drive folder, optionally only those whose names start with a prefix."""
+        self._ensure_service()
+        folder_id = self.get_or_create_folder(folder_name)
+        query = f"'{folder_id}' in parents and trashed=false"
+        if name_prefix:
+            query += f" and name contains '{name_prefix}'"
+
+        items = []
+        page_token = None
+        while True:
+            results = self.service.files().list(
+                q=query,
+                spaces="drive",
+                fields="nextPageToken, files(id, name, modifiedTime)",
+                pageToken=page_token,
+            ).execute()
+            items.extend(
+                item for item in results.get("files", [])
+                if not name_prefix or item["name"].startswith(name_prefix)
+            )
+            page_token = results.get("nextPageToken")
+            if not page_token:
+                return items
+
+    def download_file(self, file_id, destination_path):
+        """Download one Drive file by ID."""
+        self._ensure_service()
+        _build, _media_upload, media_download_cls, _installed_app_flow, _request_cls = get_google_client_modules()
+        self._download_file(file_id, destination_path, media_download_cls)
+        return destination_path
+
     def _download_file(self, file_id, destination_path, media_download_cls):
         """Stream one Drive file into a local destination."""
         request = self.service.files().get_media(fileId=file_id)
@@ -0,0 +1,231 @@
+"""Athlete profiles, each with its own workout database, and a bounded cache of open connections."""
+
+import json
+import os
+import re
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from common.db_helper import DBHelper, normalize_name
+from common.google_drive_helper import get_app_data_dir
+
+
+DEFAULT_PROFILE_ID = "default"
+DEFAULT_DB_PATH = "data/workouts.db"
+PROFILE_DB_DIR = "data/profiles"
+MAX_OPEN_PROFILES = 4
+
+#SQLite allows ten attached databases by default
+MAX_ATTACHED_PROFILES = 10
+
+PROFILE_ID_PATTERN = re.compile(r"^[a-z0-9][a-z0-9_-]{0,39}$")
+
+
+def registry_path():
+    """Return the per-user file that lists the profiles."""
+    return os.path.join(get_app_data_dir(), "WorkoutTracker", "profiles.json")
+
+
+class ProfileRegistry:
+    """Map profile IDs to a display name and database file, stored as JSON.
+
+    The existing ``data/workouts.db`` is always available as the default profile, so installs from
+    before profiles existed keep working unchanged.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or registry_path()
+        self.profiles = {DEFAULT_PROFILE_ID: {"name": "Default", "db_path": DEFAULT_DB_PATH}}
+        self.active_id = DEFAULT_PROFILE_ID
+        try:
+            with open(self.path, encoding="utf-8") as handle:
+                data = json.load(handle)
+            self.profiles.update(data.get("profiles", {}))
+            if data.get("active") in self.profiles:
+                self.active_id = data["active"]
+        except FileNotFoundError:
+            pass
+
+    def save(self):
+        """Write the registry atomically."""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path + ".tmp", "w", encoding="utf-8") as handle:
+            json.dump({"active": self.active_id, "profiles": self.profiles}, handle, indent=2)
+        os.replace(self.path + ".tmp", self.path)
+
+    def list_profiles(self):
+        """Return (profile_id, name) pairs sorted by name."""
+        return sorted(
+            ((profile_id, profile["name"]) for profile_id, profile in self.profiles.items()),
+            key=lambda item: normalize_name(item[1]),
+        )
+
+    def db_path(self, profile_id):
+        """Return the database file of a profile."""
+        if profile_id not in self.profiles:
+            raise KeyError(f"Unknown profile {profile_id!r}.")
+        return self.profiles[profile_id]["db_path"]
+
+    def name(self, profile_id):
+        """Return the display name of a profile."""
+        return self.profiles[profile_id]["name"]
+
+    def add_profile(self, name, db_path=None, profile_id=None):
+        """Register a profile and return its ID, deriving the ID and file name from ``name`` if not given."""
+        name = (name or "").strip()
+        if not name:
+            raise ValueError("A profile needs a name.")
+        if profile_id is None:
+            base = re.sub(r"[^a-z0-9]+", "-", normalize_name(name)).strip("-")[:32] or "profile"
+            profile_id, suffix = base, 2
+            while profile_id in self.profiles:
+                profile_id, suffix = f"{base}-{suffix}", suffix + 1
+        if not PROFILE_ID_PATTERN.match(profile_id):
+            raise ValueError(f"Invalid profile ID {profile_id!r}.")
+        if profile_id in self.profiles:
+            raise ValueError(f"Profile {profile_id!r} already exists.")
+
+        self.profiles[profile_id] = {
+            "name": name,
+            "db_path": db_path or os.path.join(PROFILE_DB_DIR, f"{profile_id}.db"),
+        }
+        self.save()
+        return profile_id
+
+    def remove_profile(self, profile_id):
+        """Forget a profile, its database file is left on disk."""
+        if profile_id == DEFAULT_PROFILE_ID:
+            raise ValueError("The default profile cannot be removed.")
+        del self.profiles[profile_id]
+        if self.active_id == profile_id:
+            self.active_id = DEFAULT_PROFILE_ID
+        self.save()
+
+    def set_active(self, profile_id):
+        """Remember the profile to open on the next start."""
+        self.db_path(profile_id)
+        self.active_id = profile_id
+        self.save()
+
+
+class ProfileConnections:
+    """Keep at most ``max_open`` profile databases open, closing the least recently used one.
+
+    Opening a DBHelper runs its schema checks, so switching back to a recently used profile reuses
+    the open connection instead of paying for that again.
+    """
+
+    def __init__(self, registry, max_open=MAX_OPEN_PROFILES):
+        self.registry = registry
+        self.max_open = max_open
+        self.open = OrderedDict()
+
+    def get(self, profile_id):
+        """Return the open DBHelper for a profile, opening it if needed."""
+        db = self.open.get(profile_id)
+        if db is not None:
+            self.open.move_to_end(profile_id)
+            return db
+
+        path = self.registry.db_path(profile_id)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        #Every profile but the default syncs in its own scope, so athletes never receive each other's edits
+        scope = None if profile_id == DEFAULT_PROFILE_ID else profile_id
+        db = self.open[profile_id] = DBHelper(path, sync_scope=scope)
+        db.enable_query_cache()
+        while len(self.open) > self.max_open:
+            _profile_id, evicted = self.open.popitem(last=False)
+            evicted.close()
+        return db
+
+    def close(self, profile_id):
+        """Close one profile's connection if it is open."""
+        db = self.open.pop(profile_id, None)
+        if db is not None:
+            db.close()
+
+    def close_all(self):
+        while self.open:
+            self.open.popitem(last=False)[1].close()
+
+
+@contextmanager
+def attached_profiles(db, registry, profile_ids):
+    """Attach other profiles' databases to ``db`` as ``p0``, ``p1``... and yield (alias, profile_id) pairs.
+
+    The profile that ``db`` itself belongs to can be listed too, it is read through ``main``.
+    """
+    own_path = os.path.abspath(db.db_path)
+    aliases, attached = [], []
+    db.conn.commit()
+    try:
+        for profile_id in profile_ids:
+            path = registry.db_path(profile_id)
+            if os.path.abspath(path) == own_path:
+                aliases.append(("main", profile_id))
+                continue
+            if not os.path.exists(path):
+                continue
+            if len(attached) >= MAX_ATTACHED_PROFILES:
+                raise ValueError(f"At most {MAX_ATTACHED_PROFILES} other profiles can be compared at once.")
+            alias = f"p{len(attached)}"
+            db.conn.execute("ATTACH DATABASE ? AS " + alias, (path,))
+            attached.append(alias)
+            aliases.append((alias, profile_id))
+        yield aliases
+    finally:
+        for alias in attached:
+            db.conn.execute("DETACH DATABASE " + alias)
+
+
+def _union_per_profile(aliases, select):
+    """Repeat one SELECT over every attached profile, tagging rows with the profile ID."""
+    return " UNION ALL ".join(
+        select.format(schema=alias, profile="'" + profile_id.replace("'", "''") + "'")
+        for alias, profile_id in aliases
+    )
+
+
+def compare_exercise(db, registry, exercise_name, profile_ids=None):
+    """Return each profile's sessions, best top set, best estimated 1RM and total tonnage for an exercise.
+
+    Reads the daily rollups of every profile in one query. Rows are (profile_id, name, sessions,
+    top_weight, best_e1rm, tonnage, last_day), strongest first.
+    """
+    profile_ids = profile_ids or [profile_id for profile_id, _name in registry.list_profiles()]
+    with attached_profiles(db, registry, profile_ids) as aliases:
+        if not aliases:
+            return []
+        query = _union_per_profile(
+            aliases,
+            """
+            SELECT {profile} AS profile_id, COUNT(*) AS sessions, MAX(top_weight) AS top_weight,
+                   MAX(best_e1rm) AS best_e1rm, SUM(tonnage) AS tonnage, MAX(day) AS last_day
+            FROM {schema}.daily_exercise_rollups WHERE name_key = :key
+            """,
+        )
+        rows = db.conn.execute(
+            f"SELECT * FROM ({query}) WHERE sessions > 0 ORDER BY best_e1rm DESC",
+            {"key": normalize_name(exercise_name)},
+        ).fetchall()
+    return [(row[0], registry.name(row[0])) + tuple(row[1:]) for row in rows]
+
+
+def weekly_tonnage(db, registry, start_day, end_day, profile_ids=None):
+    """Return (profile_id, week_start, tonnage, sets) rows for every profile between two ISO dates."""
+    profile_ids = profile_ids or [profile_id for profile_id, _name in registry.list_profiles()]
+    with attached_profiles(db, registry, profile_ids) as aliases:
+        if not aliases:
+            return []
+        query = _union_per_profile(
+            aliases,
+            """
+            SELECT {profile} AS profile_id, date(day, '-' || ((strftime('%w', day) + 6) % 7) || ' days') AS week,
+                   SUM(tonnage) AS tonnage, SUM(set_count) AS sets
+            FROM {schema}.daily_exercise_rollups WHERE day BETWEEN :start AND :end
+            GROUP BY week
+            """,
+        )
+        return db.conn.execute(
+            f"SELECT * FROM ({query}) ORDER BY week, profile_id", {"start": start_day, "end": end_day}
+        ).fetchall()
@@ -0,0 +1,138 @@
+"""Read-through cache of DBHelper query results, invalidated by per-table generation counters."""
+
+import functools
+import sys
+from collections import OrderedDict
+
+
+DEFAULT_MAX_BYTES = 8 * 1024 * 1024
+
+
+def estimate_size(value):
+    """Roughly measure the memory held by a query result of rows, tuples, strings and numbers."""
+    size = sys.getsizeof(value)
+    if isinstance(value, (list, tuple)):
+        size += sum(estimate_size(item) for item in value)
+    elif isinstance(value, dict):
+        size += sum(estimate_size(key) + estimate_size(item) for key, item in value.items())
+    return size
+
+
+class QueryCache:
+    """Keep recent query results while the tables they read have not been written.
+
+    Each table has a generation counter that write methods bump. An entry remembers the generations
+    of its tables when it was loaded and is only served while they are unchanged. Writes that do
+    not go through those methods, on this connection or from another process, are caught by
+    ``change_token`` and drop every entry, so a missing bump costs hit rate but never correctness.
+    """
+
+    def __init__(self, change_token, max_bytes=DEFAULT_MAX_BYTES):
+        self.change_token = change_token
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.generations = {}
+        self.epoch = 0
+        self.token = change_token()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def check_writes(self):
+        """Drop every entry if anything wrote to the database since the last check."""
+        token = self.change_token()
+        if token != self.token:
+            self.epoch += 1
+            self.clear()
+            self.token = token
+
+    def _stamp(self, tables):
+        return self.epoch, tuple(self.generations.get(table, 0) for table in tables)
+
+    def get(self, tables, key, load):
+        """Return the cached result for ``key``, calling ``load`` and storing its result on a miss."""
+        self.check_writes()
+        stamp = self._stamp(tables)
+        entry = self.entries.get(key)
+        if entry is not None:
+            if entry[0] == stamp:
+                self.hits += 1
+                self.entries.move_to_end(key)
+                return list(entry[1]) if isinstance(entry[1], list) else entry[1]
+            self._discard(key)
+
+        self.misses += 1
+        value = load()
+        size = estimate_size(value)
+        if size <= self.max_bytes // 4:
+            self.entries[key] = (stamp, value, size)
+            self.size += size
+            while self.size > self.max_bytes:
+                self._discard(next(iter(self.entries)))
+                self.evictions += 1
+        return list(value) if isinstance(value, list) else value
+
+    def _discard(self, key):
+        self.size -= self.entries.pop(key)[2]
+
+    def invalidate(self, tables):
+        """Bump the generation of tables written through this connection.
+
+        Call ``check_writes`` right before the write, so the token only moved by the write itself.
+        """
+        for table in tables:
+            self.generations[table] = self.generations.get(table, 0) + 1
+        token = self.change_token()
+        #A commit from another connection during the write still drops everything
+        if token[1] != self.token[1]:
+            self.epoch += 1
+            self.clear()
+        self.token = token
+
+    def clear(self):
+        self.entries.clear()
+        self.size = 0
+
+    def stats(self):
+        """Return hit and miss counts, entries, bytes held and evictions."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self.entries),
+            "bytes": self.size,
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions,
+        }
+
+
+def cached_query(*tables):
+    """Serve a DBHelper read method from its query cache, keyed by method name and arguments."""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            #Reads inside an open write transaction may see rows that are later rolled back
+            if self.query_cache is None or self.conn.in_transaction:
+                return method(self, *args, **kwargs)
+            key = (method.__name__, args, tuple(sorted(kwargs.items())))
+            return self.query_cache.get(tables, key, lambda: method(self, *args, **kwargs))
+        return wrapper
+    return decorator
+
+
+def invalidates(*tables):
+    """Bump the given tables' generations after a DBHelper write method succeeds."""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if self.query_cache is None:
+                return method(self, *args, **kwargs)
+            #Writes made outside the decorated methods before this one are not covered by the bump
+            self.query_cache.check_writes()
+            result = method(self, *args, **kwargs)
+            self.query_cache.invalidate(tables)
+            return result
+        return wrapper
+    return decorator
@@ -0,0 +1,155 @@
+"""Import the Android app's Room database into the desktop schema with set-based SQL."""
+
+import os
+from itertools import groupby
+
+
+ROOM_TABLES = ("workouts", "catalog_exercises", "workout_exercises", "exercise_sets", "workout_name_notes")
+
+#Room schema 1 stored dates as epoch days, schema 2 as ISO text
+ROOM_DATE = "CASE WHEN typeof(rw.date) = 'integer' THEN date('1970-01-01', rw.date || ' days') ELSE rw.date END"
+
+#Whole-number weights are written without a trailing .0, matching the desktop editor
+ROOM_WEIGHT = "CASE WHEN weightKg = CAST(weightKg AS INTEGER) THEN CAST(weightKg AS INTEGER) ELSE weightKg END"
+
+
+def import_room_database(db, room_path, source="android"):
+    """Copy workouts, exercises, goals and notes from a Room database file into a DBHelper database.
+
+    Imported workouts and exercises get stable IDs built from ``source`` and their Room row IDs, so
+    importing the same file again updates those rows instead of duplicating them. Catalog goals,
+    exercise notes and workout notes only fill in values the desktop database does not have yet.
+    Rows deleted on the phone are not deleted here. Returns the number of rows touched per table.
+    """
+    if not os.path.exists(room_path):
+        raise FileNotFoundError(f"No Room database found at {room_path}.")
+
+    conn = db.conn
+    conn.commit()
+    conn.execute("ATTACH DATABASE ? AS room", (room_path,))
+    try:
+        found = {row[0] for row in conn.execute("SELECT name FROM room.sqlite_master WHERE type = 'table'")}
+        missing = [table for table in ROOM_TABLES if table not in found]
+        if missing:
+            raise ValueError(f"Not a Workout Tracker Room database, missing tables: {', '.join(missing)}")
+
+        counts = _import_attached(db, source)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.execute("DETACH DATABASE room")
+    return counts
+
+
+def _import_attached(db, source):
+    """Run the mapping statements against the attached ``room`` schema inside one transaction."""
+    c = db.conn.cursor()
+    prefix = f"room:{source}:"
+    counts = {}
+
+    #Catalog entries by name, keeping desktop goals and notes where they are already set
+    c.execute(
+        """
+        INSERT INTO exercises_catalog (name, name_key, goal, note)
+        SELECT TRIM(rc.name), name_key(rc.name), rc.goalKg, rc.note
+        FROM room.catalog_exercises rc
+        WHERE TRIM(rc.name) <> ''
+          AND NOT EXISTS (SELECT 1 FROM exercises_catalog c WHERE c.name_key = name_key(rc.name))
+        GROUP BY name_key(rc.name)
+        """
+    )
+    counts["catalog_added"] = c.rowcount
+    c.execute(
+        """
+        UPDATE exercises_catalog
+        SET goal = COALESCE(goal, (SELECT MAX(rc.goalKg) FROM room.catalog_exercises rc
+                                   WHERE name_key(rc.name) = exercises_catalog.name_key)),
+            note = COALESCE(note, (SELECT MAX(rc.note) FROM room.catalog_exercises rc
+                                   WHERE name_key(rc.name) = exercises_catalog.name_key))
+        WHERE (goal IS NULL OR note IS NULL)
+          AND name_key IN (SELECT name_key(name) FROM room.catalog_exercises)
+        """
+    )
+
+    c.execute(
+        f"""
+        INSERT INTO workouts (uid, name, date)
+        SELECT ? || 'w' || rw.id, rw.name, {ROOM_DATE}
+        FROM room.workouts rw WHERE true
+        ON CONFLICT(uid) DO UPDATE SET name = excluded.name, date = excluded.date
+        WHERE name IS NOT excluded.name OR date IS NOT excluded.date
+        """,
+        (prefix,),
+    )
+    counts["workouts"] = c.rowcount
+
+    #Collapse each exercise's sets into the desktop's comma separated reps and weights. GROUP_CONCAT
+    #keeps no order before SQLite 3.44, so the lists are joined here from explicitly ordered rows
+    c.execute(
+        """
+        CREATE TEMP TABLE IF NOT EXISTS room_set_lists (
+            workoutExerciseId INTEGER PRIMARY KEY, set_count INTEGER, reps TEXT, weights TEXT
+        )
+        """
+    )
+    c.execute("DELETE FROM temp.room_set_lists")
+    rows = c.execute(
+        f"""
+        SELECT workoutExerciseId, CAST(reps AS TEXT), CAST({ROOM_WEIGHT} AS TEXT)
+        FROM room.exercise_sets ORDER BY workoutExerciseId, position, id
+        """
+    ).fetchall()
+    set_lists = []
+    for exercise_id, sets in groupby(rows, key=lambda row: row[0]):
+        sets = list(sets)
+        set_lists.append((
+            exercise_id,
+            len(sets),
+            ",".join(row[1] for row in sets if row[1] is not None),
+            ",".join(row[2] for row in sets if row[2] is not None),
+        ))
+    c.executemany("INSERT INTO temp.room_set_lists VALUES (?, ?, ?, ?)", set_lists)
+
+    c.execute(
+        f"""
+        INSERT INTO exercises (uid, workout_id, name, sets, reps, weight, name_key, catalog_id)
+        SELECT ? || 'e' || we.id, w.id, COALESCE(c.name, TRIM(rc.name)), COALESCE(s.set_count, 0),
+               COALESCE(s.reps, ''), COALESCE(s.weights, ''), name_key(rc.name), c.id
+        FROM room.workout_exercises we
+        JOIN room.catalog_exercises rc ON rc.id = we.catalogExerciseId
+        JOIN workouts w ON w.uid = ? || 'w' || we.workoutId
+        LEFT JOIN exercises_catalog c ON c.name_key = name_key(rc.name)
+        LEFT JOIN temp.room_set_lists s ON s.workoutExerciseId = we.id
+        ORDER BY we.workoutId, we.position
+        ON CONFLICT(uid) DO UPDATE SET
+            workout_id = excluded.workout_id, name = excluded.name, sets = excluded.sets,
+            reps = excluded.reps, weight = excluded.weight, name_key = excluded.name_key,
+            catalog_id = excluded.catalog_id
+        WHERE name IS NOT excluded.name OR sets IS NOT excluded.sets OR reps IS NOT excluded.reps
+           OR weight IS NOT excluded.weight OR workout_id IS NOT excluded.workout_id
+        """,
+        (prefix, prefix),
+    )
+    counts["exercises"] = c.rowcount
+    c.execute("DELETE FROM temp.room_set_lists")
+
+    c.execute(
+        """
+        INSERT INTO workout_notes (workout_name, workout_name_key, note)
+        SELECT TRIM(rn.workoutName), name_key(rn.workoutName), rn.note
+        FROM room.workout_name_notes rn
+        WHERE TRIM(rn.note) <> ''
+          AND NOT EXISTS (SELECT 1 FROM workout_notes n WHERE n.workout_name_key = name_key(rn.workoutName))
+        """
+    )
+    counts["workout_notes"] = c.rowcount
+
+    #Rebuild the derived rollups for every imported exercise in one pass
+    c.execute(
+        "SELECT DISTINCT name_key FROM exercises WHERE uid >= ? AND uid < ?",
+        (prefix, prefix[:-1] + ";"),
+    )
+    db._refresh_rollups_for_keys({row[0] for row in c.fetchall()})
+    return counts
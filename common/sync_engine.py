@@ -0,0 +1,189 @@
+"""Incremental sync of the change log through a shared folder or Google Drive."""
+
+import gzip
+import json
+import os
+import shutil
+import tempfile
+import uuid
+
+from common.google_drive_helper import get_app_data_dir
+
+
+SEGMENT_PREFIX = "changes-"
+SEGMENT_SUFFIX = ".json.gz"
+SCOPE_SEPARATOR = "@"
+
+
+def local_device_id():
+    """Return this machine's sync device ID, creating it on first use."""
+    device_dir = os.path.join(get_app_data_dir(), "WorkoutTracker")
+    device_path = os.path.join(device_dir, "device_id")
+    try:
+        with open(device_path, encoding="utf-8") as handle:
+            device_id = handle.read().strip()
+        if device_id:
+            return device_id
+    except FileNotFoundError:
+        pass
+
+    device_id = uuid.uuid4().hex
+    os.makedirs(device_dir, exist_ok=True)
+    with open(device_path, "w", encoding="utf-8") as handle:
+        handle.write(device_id)
+    return device_id
+
+
+def scoped_device_id(device_id, scope=None):
+    """Qualify a device ID with a sync scope, such as a profile ID, so each scope syncs on its own."""
+    return f"{device_id}{SCOPE_SEPARATOR}{scope}" if scope else device_id
+
+
+def device_scope(device_id):
+    """Return the sync scope of a device ID, an empty string for the default scope."""
+    return device_id.partition(SCOPE_SEPARATOR)[2]
+
+
+def segment_name(device_id, first_clock, last_clock):
+    """Name a segment so its device and clock range can be read without downloading it."""
+    return f"{SEGMENT_PREFIX}{device_id}-{first_clock:012d}-{last_clock:012d}{SEGMENT_SUFFIX}"
+
+
+def parse_segment_name(name):
+    """Return (device_id, first_clock, last_clock) for a segment file name, or None."""
+    if not (name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX)):
+        return None
+    parts = name[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)].rsplit("-", 2)
+    if len(parts) != 3 or not parts[1].isdigit() or not parts[2].isdigit():
+        return None
+    return parts[0], int(parts[1]), int(parts[2])
+
+
+def encode_segment(changes):
+    """Serialize change log rows into a compressed segment."""
+    return gzip.compress(json.dumps([list(change) for change in changes]).encode("utf-8"))
+
+
+def decode_segment(data):
+    """Read change log rows back from a compressed segment."""
+    return [tuple(change) for change in json.loads(gzip.decompress(data).decode("utf-8"))]
+
+
+class FolderSegmentStore:
+    """Keep change log segments in a local or network-shared folder."""
+
+    def __init__(self, folder):
+        self.folder = folder
+        os.makedirs(folder, exist_ok=True)
+
+    def list_segments(self):
+        """Return the names of every segment in the store."""
+        return [name for name in os.listdir(self.folder) if parse_segment_name(name)]
+
+    def read_segment(self, name):
+        """Return the bytes of one segment."""
+        with open(os.path.join(self.folder, name), "rb") as handle:
+            return handle.read()
+
+    def write_segment(self, name, data):
+        """Write a segment atomically so readers never see a partial file."""
+        path = os.path.join(self.folder, name)
+        with open(path + ".tmp", "wb") as handle:
+            handle.write(data)
+        os.replace(path + ".tmp", path)
+
+
+class DriveSegmentStore:
+    """Keep change log segments in a Google Drive folder."""
+
+    def __init__(self, drive_helper, folder_name="Workout Tracker Sync"):
+        self.drive_helper = drive_helper
+        self.folder_name = folder_name
+        self.file_ids = {}
+
+    def list_segments(self):
+        """Return the names of every segment in the Drive folder."""
+        items = self.drive_helper.list_folder(self.folder_name, name_prefix=SEGMENT_PREFIX)
+        self.file_ids = {item["name"]: item["id"] for item in items if parse_segment_name(item["name"])}
+        return list(self.file_ids)
+
+    def read_segment(self, name):
+        """Download one segment."""
+        temp_dir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(temp_dir, name)
+            self.drive_helper.download_file(self.file_ids[name], path)
+            with open(path, "rb") as handle:
+                return handle.read()
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    def write_segment(self, name, data):
+        """Upload one segment."""
+        temp_dir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(temp_dir, name)
+            with open(path, "wb") as handle:
+                handle.write(data)
+            self.file_ids[name] = self.drive_helper.upload_to_folder(
+                path, folder_name=self.folder_name, mime_type="application/gzip"
+            )
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+class ChangeSyncEngine:
+    """Push this device's new change log entries and apply entries pulled from other devices."""
+
+    def __init__(self, db, store):
+        self.db = db
+        self.store = store
+
+    def push(self):
+        """Upload everything logged since the last push as one segment and return the entry count."""
+        changes = self.db.get_local_changes(self.db.get_pushed_clock())
+        if not changes:
+            return 0
+
+        device_id = changes[0][0]
+        first_clock, last_clock = changes[0][1], changes[-1][1]
+        self.store.write_segment(segment_name(device_id, first_clock, last_clock), encode_segment(changes))
+        self.db.set_pushed_clock(last_clock)
+        return len(changes)
+
+    def pull(self):
+        """Apply every segment newer than what is already logged and return the number of changes applied.
+
+        Segments from this device are included so a database restored from an older copy catches up
+        with its own pushed history. Segments from another sync scope, such as another profile's
+        database, are skipped even when they share the store.
+        """
+        known_clocks = self.db.get_device_clocks()
+        own_device_id, _clock = self.db.get_sync_clock()
+        pushed_clock = self.db.get_pushed_clock()
+        pending = []
+        for name in self.store.list_segments():
+            device_id, _first_clock, last_clock = parse_segment_name(name)
+            if device_scope(device_id) != device_scope(own_device_id):
+                continue
+            if last_clock > known_clocks.get(device_id, 0):
+                pending.append(name)
+            if device_id == own_device_id:
+                pushed_clock = max(pushed_clock, last_clock)
+
+        changes = []
+        for name in pending:
+            device_id = parse_segment_name(name)[0]
+            known = known_clocks.get(device_id, 0)
+            changes.extend(change for change in decode_segment(self.store.read_segment(name)) if change[1] > known)
+
+        applied = self.db.apply_changes(changes) if changes else 0
+        if pushed_clock > self.db.get_pushed_clock():
+            self.db.set_pushed_clock(pushed_clock)
+        return applied
+
+    def sync(self):
+        """Pull before pushing so this device's clock is ahead of everything it has seen."""
+        pulled = self.pull()
+        pushed = self.push()
+        return pulled, pushed
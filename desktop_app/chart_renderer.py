@@ -0,0 +1,119 @@
+import io
+from collections import OrderedDict
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+from common.db_helper import DBHelper, normalize_name
+from desktop_app.exercise_graph import prepare_progress_series, draw_progress_series, resample_series
+
+#Size of the pre-rendered chart image, matching the progress dialog's default size
+RENDER_WIDTH = 900
+RENDER_HEIGHT = 560
+RENDER_DPI = 100
+
+
+#A prepared chart: its cache key, the plot-ready series and the rendered PNG
+class RenderedChart:
+    __slots__ = ("key", "series", "png")
+
+    def __init__(self, key, series, png):
+        self.key = key
+        self.series = series
+        self.png = png
+
+
+#Least-recently-used cache of rendered charts
+class RenderedChartCache:
+    def __init__(self, max_entries=32):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+
+    def get(self, key):
+        chart = self.entries.get(key)
+        if chart is not None:
+            self.entries.move_to_end(key)
+        return chart
+
+    def put(self, chart):
+        self.entries[chart.key] = chart
+        self.entries.move_to_end(chart.key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+
+#Shared by every progress dialog in the process
+CHART_CACHE = RenderedChartCache()
+
+
+#Charts are cached by database, exercise, goal and the exercise's data version
+def chart_key(db_path, exercise_name, goal, version):
+    return (db_path, normalize_name(exercise_name), goal, version)
+
+
+#Rasterize prepared series with the Agg backend, safe to call off the UI thread
+def render_chart_png(series, goal):
+    figure = Figure(figsize=(RENDER_WIDTH / RENDER_DPI, RENDER_HEIGHT / RENDER_DPI), dpi=RENDER_DPI, constrained_layout=True)
+    canvas = FigureCanvasAgg(figure)
+    ax = figure.add_subplot(111)
+    _lines, _labels, line_data = draw_progress_series(ax, series, goal)
+    resample_series(ax, line_data)
+
+    buffer = io.BytesIO()
+    canvas.print_png(buffer)
+    return buffer.getvalue()
+
+
+class ChartRenderSignals(QObject):
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+
+#Load history, prepare series and render the chart on a worker thread
+class ChartRenderTask(QRunnable):
+    def __init__(self, db_path, exercise_name, goal):
+        super().__init__()
+        self.db_path = db_path
+        self.exercise_name = exercise_name
+        self.goal = goal
+        self.signals = ChartRenderSignals()
+
+    def run(self):
+        try:
+            #Read the version and history in one transaction so they match
+            db = DBHelper(self.db_path, read_only=True)
+            try:
+                db.conn.execute("BEGIN")
+                version = db.get_exercise_data_version(self.exercise_name)
+                history = db.get_exercise_history(self.exercise_name)
+                db.conn.execute("COMMIT")
+            finally:
+                db.close()
+
+            series = prepare_progress_series(history)
+            png = render_chart_png(series, self.goal) if series else None
+            key = chart_key(self.db_path, self.exercise_name, self.goal, version)
+            self.signals.finished.emit(RenderedChart(key, series, png))
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+
+
+#Deliver a chart from the cache, or render it in the background and cache the result
+def request_chart(db, exercise_name, goal, on_ready, on_failed):
+    key = chart_key(db.db_path, exercise_name, goal, db.get_exercise_data_version(exercise_name))
+    cached = CHART_CACHE.get(key)
+    if cached is not None:
+        on_ready(cached)
+        return None
+
+    def store(chart):
+        if chart.series:
+            CHART_CACHE.put(chart)
+        on_ready(chart)
+
+    task = ChartRenderTask(db.db_path, exercise_name, goal)
+    task.signals.finished.connect(store)
+    task.signals.failed.connect(on_failed)
+    QThreadPool.globalInstance().start(task)
+    return task
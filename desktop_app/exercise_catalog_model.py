@@ -0,0 +1,145 @@
+import os
+from bisect import bisect_left
+
+from PyQt5.QtCore import Qt, QStringListModel, QSortFilterProxyModel
+from PyQt5.QtWidgets import QCompleter
+
+from common.db_helper import normalize_name
+
+#One catalog model per database file, shared by every exercise dropdown
+_shared_models = {}
+
+
+#Get the process-wide catalog model for a database, loading it on first use
+def shared_catalog_model(db):
+    path = os.path.abspath(db.db_path)
+    model = _shared_models.get(path)
+    if model is None:
+        model = _shared_models[path] = ExerciseCatalogModel(db)
+    elif model.db is not db:
+        #The profile was closed and reopened, read through the new connection
+        model.db = db
+        model.refresh()
+    else:
+        model.refresh_if_changed()
+    return model
+
+
+#Sorted list of catalog exercise names with their normalized keys, row for row
+class ExerciseCatalogModel(QStringListModel):
+    def __init__(self, db, parent=None):
+        super().__init__(parent)
+        self.db = db
+        self.keys = []
+        self.refresh()
+
+    #Reload every name from the catalog, inserting and removing rows so open dropdowns keep their selection
+    def refresh(self):
+        names = {}
+        for name in self.db.get_all_exercise_names():
+            names.setdefault(normalize_name(name), name)
+        keys = sorted(names)
+        if not self.keys:
+            self.keys = keys
+            self.setStringList([names[key] for key in keys])
+        else:
+            self.merge_names(keys, names)
+        self.change_token = self.db.get_change_token()
+
+    #Walk the old and new sorted keys together, touching only the rows that differ
+    def merge_names(self, keys, names):
+        row = 0
+        position = 0
+        while row < len(self.keys) or position < len(keys):
+            if position < len(keys) and (row >= len(self.keys) or keys[position] < self.keys[row]):
+                self.keys.insert(row, keys[position])
+                self.insertRows(row, 1)
+                self.setData(self.index(row), names[keys[position]])
+                row += 1
+                position += 1
+            elif position >= len(keys) or self.keys[row] < keys[position]:
+                self.removeRows(row, 1)
+                del self.keys[row]
+            else:
+                if self.index(row).data() != names[keys[position]]:
+                    self.setData(self.index(row), names[keys[position]])
+                row += 1
+                position += 1
+
+    #Reload only if the database has been written since the last load
+    def refresh_if_changed(self):
+        if self.db.get_change_token() != self.change_token:
+            self.refresh()
+
+    def contains(self, name):
+        key = normalize_name(name)
+        position = bisect_left(self.keys, key)
+        return position < len(self.keys) and self.keys[position] == key
+
+    #Insert a newly added exercise at its sorted position, updating every dropdown at once
+    def add_name(self, name):
+        if not self.contains(name):
+            key = normalize_name(name)
+            row = bisect_left(self.keys, key)
+            self.keys.insert(row, key)
+            self.insertRows(row, 1)
+            self.setData(self.index(row), name)
+        #The catalog write behind this name is already shown, so the next check does not reload
+        self.change_token = self.db.get_change_token()
+
+
+#Score how well a typed pattern matches a name: prefix, then substring, then in-order letters
+def match_score(pattern, key):
+    if not pattern:
+        return 0
+    if key.startswith(pattern):
+        return 0
+    if pattern in key:
+        return 1
+
+    position = 0
+    for char in pattern:
+        position = key.find(char, position) + 1
+        if position == 0:
+            return None
+    return 2
+
+
+#Filters and ranks the shared catalog for one dropdown's typed text
+class CatalogMatchProxy(QSortFilterProxyModel):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.pattern = ""
+
+    def set_pattern(self, text):
+        self.pattern = normalize_name(text)
+        self.invalidate()
+        self.sort(0)
+
+    #Rows match the catalog's normalized key index, so no name is normalized again per keystroke
+    def filterAcceptsRow(self, source_row, source_parent):
+        return match_score(self.pattern, self.sourceModel().keys[source_row]) is not None
+
+    def lessThan(self, left, right):
+        keys = self.sourceModel().keys
+        left_key = keys[left.row()]
+        right_key = keys[right.row()]
+        return (match_score(self.pattern, left_key), left_key) < (match_score(self.pattern, right_key), right_key)
+
+
+#Attach case-insensitive substring and fuzzy completion over the shared catalog to a line edit
+def catalog_completer(catalog_model, line_edit):
+    proxy = CatalogMatchProxy(line_edit)
+    proxy.setSourceModel(catalog_model)
+
+    completer = QCompleter(proxy, line_edit)
+    completer.setCaseSensitivity(Qt.CaseInsensitive)
+    completer.setCompletionMode(QCompleter.UnfilteredPopupCompletion)
+
+    def on_text_edited(text):
+        proxy.set_pattern(text)
+        if text.strip():
+            completer.complete()
+
+    line_edit.textEdited.connect(on_text_edited)
+    return completer
@@ -0,0 +1,153 @@
+import numpy as np
+import matplotlib.dates as mdates
+from matplotlib.figure import Figure
+from matplotlib.ticker import MaxNLocator
+from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+from PyQt5.QtWidgets import QDialog, QVBoxLayout, QScrollArea
+
+from common.exercise_history import parse_sets
+from desktop_app.exercise_graph import EPOCH_DATENUM, minmax_downsample
+
+#Small multiples layout
+DASHBOARD_COLUMNS = 4
+SUBPLOT_HEIGHT_PX = 220
+SUBPLOT_POINTS = 200
+
+
+#Summarize every exercise from get_all_exercise_histories rows in one vectorized pass
+def compute_exercise_dashboard(rows):
+    exercises = []
+    index_of = {}
+    set_exercise = []
+    set_day = []
+    set_reps = []
+    set_weight = []
+
+    #Flatten the comma-separated sets of every session into parallel columns
+    for catalog_id, name, goal, epoch_day, reps_str, weights_str in rows:
+        idx = index_of.get(catalog_id)
+        if idx is None:
+            idx = index_of[catalog_id] = len(exercises)
+            exercises.append({"id": catalog_id, "name": name, "goal": goal})
+
+        if epoch_day is None:
+            continue
+        day = epoch_day + EPOCH_DATENUM
+
+        sets = parse_sets(reps_str, weights_str)
+        set_exercise.extend([idx] * len(sets))
+        set_day.extend([day] * len(sets))
+        for reps, weight in sets:
+            set_reps.append(reps)
+            set_weight.append(weight)
+
+    set_exercise = np.asarray(set_exercise, dtype=np.int64)
+    set_day = np.asarray(set_day, dtype=float)
+    reps = np.asarray(set_reps, dtype=float)
+    weights = np.asarray(set_weight, dtype=float)
+
+    for exercise in exercises:
+        exercise.update(days=np.empty(0), e1rm=np.empty(0), volume=np.empty(0), best_weight=0.0, goal_percent=None)
+    if len(set_exercise) == 0:
+        return exercises
+
+    #Group sets into sessions of (exercise, day) and reduce each group
+    order = np.lexsort((set_day, set_exercise))
+    set_exercise, set_day, reps, weights = set_exercise[order], set_day[order], reps[order], weights[order]
+    boundary = np.r_[True, (set_exercise[1:] != set_exercise[:-1]) | (set_day[1:] != set_day[:-1])]
+    starts = np.flatnonzero(boundary)
+
+    session_exercise = set_exercise[starts]
+    session_day = set_day[starts]
+    session_e1rm = np.maximum.reduceat(weights * (1 + reps / 30), starts)
+    session_volume = np.add.reduceat(weights * reps, starts)
+    session_best = np.maximum.reduceat(weights, starts)
+
+    #Split the session columns back out per exercise
+    exercise_starts = np.flatnonzero(np.r_[True, session_exercise[1:] != session_exercise[:-1]])
+    exercise_ends = np.r_[exercise_starts[1:], len(session_exercise)]
+    for start, end in zip(exercise_starts, exercise_ends):
+        exercise = exercises[session_exercise[start]]
+        best_weight = float(session_best[start:end].max())
+        goal = exercise["goal"]
+        exercise.update(
+            days=session_day[start:end],
+            e1rm=session_e1rm[start:end],
+            volume=session_volume[start:end],
+            best_weight=best_weight,
+            goal_percent=(best_weight / goal) * 100 if goal else None,
+        )
+    return exercises
+
+
+#Dialog comparing e1RM trend, volume and goal progress for every catalog exercise
+class ExerciseDashboard(QDialog):
+    def __init__(self, db, parent=None):
+        super().__init__(parent)
+        self.db = db
+        self.setWindowTitle("All Exercises – Progress Comparison")
+        self.resize(1200, 800)
+
+        self.layout = QVBoxLayout(self)
+        self.setLayout(self.layout)
+
+        #Canvas grows with the number of exercises, so it scrolls
+        self.scroll = QScrollArea()
+        self.scroll.setWidgetResizable(True)
+        self.layout.addWidget(self.scroll)
+
+        #Fixed spacing instead of constrained layout, which is slow with this many axes
+        self.figure = Figure()
+        self.canvas = FigureCanvas(self.figure)
+        self.scroll.setWidget(self.canvas)
+
+        self.plot(compute_exercise_dashboard(self.db.get_all_exercise_histories()))
+
+    def plot(self, exercises):
+        self.figure.clear()
+        if not exercises:
+            return
+
+        rows = (len(exercises) + DASHBOARD_COLUMNS - 1) // DASHBOARD_COLUMNS
+        self.canvas.setMinimumHeight(rows * SUBPLOT_HEIGHT_PX)
+        axes = self.figure.subplots(
+            rows, DASHBOARD_COLUMNS, squeeze=False,
+            gridspec_kw={"left": 0.04, "right": 0.98, "top": 1 - 0.3 / rows, "bottom": 0.4 / rows,
+                         "wspace": 0.25, "hspace": 0.6},
+        ).ravel()
+
+        for ax, exercise in zip(axes, exercises):
+            title = exercise["name"]
+            if exercise["goal_percent"] is not None:
+                title += f" – {exercise['goal_percent']:.0f}% of goal"
+            ax.set_title(title, fontsize=9)
+            ax.tick_params(labelsize=7)
+
+            if len(exercise["days"]) == 0:
+                ax.text(0.5, 0.5, "No history", ha="center", va="center", transform=ax.transAxes)
+                ax.set_xticks([])
+                ax.set_yticks([])
+                continue
+
+            #Volume shaded on an unlabelled secondary axis behind the e1RM trend
+            volume_ax = ax.twinx()
+            volume_ax.fill_between(
+                *minmax_downsample(exercise["days"], exercise["volume"], SUBPLOT_POINTS / 2),
+                color="grey", alpha=0.25, linewidth=0,
+            )
+            volume_ax.set_yticks([])
+
+            ax.plot(*minmax_downsample(exercise["days"], exercise["e1rm"], SUBPLOT_POINTS / 2), color="purple")
+            if exercise["goal"] is not None:
+                ax.axhline(y=exercise["goal"], color="red", linestyle="--", linewidth=1)
+            ax.set_zorder(volume_ax.get_zorder() + 1)
+            ax.patch.set_visible(False)
+            ax.yaxis.set_major_locator(MaxNLocator(4))
+            locator = mdates.AutoDateLocator(maxticks=4)
+            ax.xaxis.set_major_locator(locator)
+            ax.xaxis.set_major_formatter(mdates.ConciseDateFormatter(locator))
+
+        for ax in axes[len(exercises):]:
+            ax.set_visible(False)
+
+        self.canvas.draw_idle()
@@ -3,6 +3,8 @@ from PyQt5.QtWidgets import (
     QLabel, QLineEdit, QSpinBox, QComboBox, QPushButton
 )
 
+from desktop_app.exercise_catalog_model import shared_catalog_model, catalog_completer
+
 #Class to add a new exercise entry
 class ExerciseEntry(QWidget):
     def __init__(self, db_helper, parent=None):
@@ -22,8 +24,10 @@ class ExerciseEntry(QWidget):
         self.exercise_dropdown.setEditable(True)
         self.exercise_dropdown.setInsertPolicy(QComboBox.NoInsert)
 
-        #Load current exercise options from DB
-        self.exercise_dropdown.addItems(self.db.get_all_exercise_names())
+        #Use the catalog shared by every dropdown, with substring and fuzzy completion
+        self.catalog = shared_catalog_model(self.db)
+        self.exercise_dropdown.setModel(self.catalog)
+        self.exercise_dropdown.setCompleter(catalog_completer(self.catalog, self.exercise_dropdown.lineEdit()))
 
         #Add the dropdown to the layout
         top_layout.addWidget(self.exercise_dropdown)
@@ -49,6 +53,8 @@ class ExerciseEntry(QWidget):
         self.sets_inputs_container = QVBoxLayout()
         self.main_layout.addLayout(self.sets_inputs_container)
 
+        #Pool of (row widget, reps input, weight input), reused as the set count changes
+        self.set_rows = []
         self.reps_inputs = []
         self.weight_inputs = []
 
@@ -56,85 +62,69 @@ class ExerciseEntry(QWidget):
         self.sets.valueChanged.connect(self.update_set_inputs)
         self.update_set_inputs()
 
-    #Update the set inputs based on the number of sets
+    #Show as many set rows as the sets spinbox asks for, creating only missing rows
     def update_set_inputs(self):
-        #While there are existing inputs
-        while self.sets_inputs_container.count():
-            #Remove the first input set
-            item = self.sets_inputs_container.takeAt(0)
-            widget = item.widget()
-            #If there's a widget, delete it
-            if widget:
-                widget.deleteLater()
-            #If the item has a layout, remove all widgets in it
-            elif item.layout():
-                layout = item.layout()
-                #If there's a layout, remove all widgets in it
-                while layout.count():
-                    sub_item = layout.takeAt(0)
-                    sub_widget = sub_item.widget()
-                    #If there's a sub-widget, delete it
-                    if sub_widget is not None:
-                        sub_widget.deleteLater()
-
-        self.reps_inputs = []
-        self.weight_inputs = []
-
-        #For each set
-        for i in range(self.sets.value()):
-            #Create a horizontal layout for the set inputs
-            row_layout = QHBoxLayout()
-
-            #Show the set number, reps, and weight input boxes
-            set_label = QLabel(f"Set {i + 1}:")
-            set_label.setFixedWidth(50)
-            row_layout.addWidget(set_label)
-
-            reps_label = QLabel("Reps:")
-            reps_label.setFixedWidth(40)
-            row_layout.addWidget(reps_label)
-
-            reps_input = QLineEdit()
-            reps_input.setPlaceholderText(f"Reps for set {i + 1}")
-            reps_input.setFixedWidth(80)
-            row_layout.addWidget(reps_input)
-
-            weight_label = QLabel("Weight:")
-            weight_label.setFixedWidth(50)
-            row_layout.addWidget(weight_label)
-
-            weight_input = QLineEdit()
-            weight_input.setPlaceholderText(f"Weight for set {i + 1}")
-            weight_input.setFixedWidth(80)
-            row_layout.addWidget(weight_input)
-
-            #Add the row layout to the sets inputs container
-            self.sets_inputs_container.addLayout(row_layout)
-
-            #Store the inputs for later retrieval
-            self.reps_inputs.append(reps_input)
-            self.weight_inputs.append(weight_input)
+        count = self.sets.value()
+
+        #Create rows the pool does not have yet
+        while len(self.set_rows) < count:
+            row_widget, reps_input, weight_input = self.create_set_row(len(self.set_rows))
+            self.sets_inputs_container.addWidget(row_widget)
+            self.set_rows.append((row_widget, reps_input, weight_input))
+
+        #Hide surplus rows rather than deleting them, so typed values survive a change back
+        for i, (row_widget, _reps_input, _weight_input) in enumerate(self.set_rows):
+            row_widget.setVisible(i < count)
+
+        #Store the visible inputs for later retrieval
+        self.reps_inputs = [reps_input for _row, reps_input, _weight in self.set_rows[:count]]
+        self.weight_inputs = [weight_input for _row, _reps, weight_input in self.set_rows[:count]]
+
+    #Create the widgets for one set row
+    def create_set_row(self, i):
+        #Create a horizontal layout for the set inputs
+        row_widget = QWidget()
+        row_layout = QHBoxLayout(row_widget)
+        row_layout.setContentsMargins(0, 0, 0, 0)
+
+        #Show the set number, reps, and weight input boxes
+        set_label = QLabel(f"Set {i + 1}:")
+        set_label.setFixedWidth(50)
+        row_layout.addWidget(set_label)
+
+        reps_label = QLabel("Reps:")
+        reps_label.setFixedWidth(40)
+        row_layout.addWidget(reps_label)
+
+        reps_input = QLineEdit()
+        reps_input.setPlaceholderText(f"Reps for set {i + 1}")
+        reps_input.setFixedWidth(80)
+        row_layout.addWidget(reps_input)
+
+        weight_label = QLabel("Weight:")
+        weight_label.setFixedWidth(50)
+        row_layout.addWidget(weight_label)
+
+        weight_input = QLineEdit()
+        weight_input.setPlaceholderText(f"Weight for set {i + 1}")
+        weight_input.setFixedWidth(80)
+        row_layout.addWidget(weight_input)
+
+        return row_widget, reps_input, weight_input
 
     #Add a new exercise to the catalog
     def add_new_exercise(self):
         #Get the new exercise name from the dropdown
         new_exercise = self.exercise_dropdown.currentText().strip()
 
-        #If the new exercise name is not empty
-        if new_exercise:
-            #Check if the exercise already exists in the dropdown
-            existing = [self.exercise_dropdown.itemText(i) for i in range(self.exercise_dropdown.count())]
-
-            #If the new exercise is not already in the dropdown
-            if new_exercise not in existing:
-                #Add the new exercise to the dropdown
-                self.exercise_dropdown.addItem(new_exercise)
-
-                #Set the current text to the new exercise
-                self.exercise_dropdown.setCurrentText(new_exercise)
-
-            #Update the database with the new exercise
+        #If the new exercise name is not empty and not already in the catalog
+        if new_exercise and not self.catalog.contains(new_exercise):
+            #Update the database, then every dropdown sharing the catalog
             self.db.add_exercise_to_catalog(new_exercise)
+            self.catalog.add_name(new_exercise)
+
+            #Set the current text to the new exercise
+            self.exercise_dropdown.setCurrentText(new_exercise)
 
     #Get the data from the exercise entry
     def get_data(self):
@@ -149,24 +139,24 @@ class ExerciseEntry(QWidget):
     
     #Set the data for the exercise entry
     def set_data(self, name, sets, reps, weights):
-        #Set exercise name in combo box
+        #Set exercise name in combo box, names outside the catalog are kept as typed text
         index = self.exercise_dropdown.findText(name)
         if index == -1:
-            self.exercise_dropdown.addItem(name)
-            index = self.exercise_dropdown.count() - 1
-        self.exercise_dropdown.setCurrentIndex(index)
+            self.exercise_dropdown.setCurrentText(name)
+        else:
+            self.exercise_dropdown.setCurrentIndex(index)
 
         #Set sets count - triggers updating reps/weight inputs
         self.sets.setValue(int(sets))
 
-        #Convert reps and weights to lists if they are strings
-        if isinstance(reps, str):
-            reps = reps.split(',')
-        if isinstance(weights, str):
-            weights = weights.split(',')
+        #Convert reps and weights to lists if they are strings or a single stored number
+        if not isinstance(reps, (list, tuple)):
+            reps = str(reps).split(',')
+        if not isinstance(weights, (list, tuple)):
+            weights = str(weights).split(',')
 
-        #Fill in reps and weights inputs
-        for i, (r_input, w_input) in enumerate(zip(self.reps_inputs, self.weight_inputs)):
+        #Fill in reps and weights inputs, clearing hidden pooled rows so a reused entry shows no old values
+        for i, (_row, r_input, w_input) in enumerate(self.set_rows):
             r_input.setText(reps[i].strip() if i < len(reps) else "")
             w_input.setText(weights[i].strip() if i < len(weights) else "")
 
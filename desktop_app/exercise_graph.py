@@ -1,67 +1,155 @@
+from datetime import datetime
+
+import numpy as np
+import matplotlib.dates as mdates
 import matplotlib.pyplot as plt
 from matplotlib.widgets import CheckButtons
 from PyQt5.QtWidgets import QMessageBox
 
+from common.exercise_history import ExerciseHistory
+
+#Matplotlib date number of epoch day 0 (1970-01-01)
+EPOCH_DATENUM = mdates.date2num(datetime(1970, 1, 1))
+
+#Most points drawn per pixel column, and the point count above which markers are hidden
+POINTS_PER_PIXEL = 2
+MARKER_POINT_LIMIT = 120
+
+
+#Convert epoch days (or date strings) and values to sorted numeric arrays, skipping unparseable dates
+def to_plot_arrays(dates, values):
+    if isinstance(dates, np.ndarray) and dates.dtype.kind in "iuf":
+        x = dates.astype(float) + EPOCH_DATENUM
+        y = np.asarray(values, dtype=float)
+    else:
+        x = []
+        y = []
+        for date_str, value in zip(dates, values):
+            try:
+                x.append(mdates.date2num(datetime.strptime(str(date_str).strip(), "%Y-%m-%d")))
+            except ValueError:
+                continue
+            y.append(value)
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+
+    order = np.argsort(x, kind="stable")
+    return x[order], y[order]
+
+
+#View an ExerciseHistory (or legacy (date, reps, weights) rows) as NumPy columns without copying
+def history_columns(history):
+    if not isinstance(history, ExerciseHistory):
+        history = ExerciseHistory.from_rows(history)
+
+    days = np.frombuffer(history.days, dtype=np.intc)
+    starts = np.frombuffer(history.offsets, dtype=np.intc)[:-1]
+    reps = np.frombuffer(history.reps, dtype=np.intc).astype(float)
+    weights = np.frombuffer(history.weights, dtype=np.float64)
+    return days, starts, reps, weights
+
+
+#Keep the lowest and highest point in each bucket so the drawn envelope matches the full data
+def minmax_downsample(x, y, buckets):
+    buckets = max(int(buckets), 1)
+    if len(x) <= 2 * buckets:
+        return x, y
+
+    span = (x[-1] - x[0]) or 1.0
+    bucket = np.minimum(((x - x[0]) / span * buckets).astype(int), buckets - 1)
+
+    #Sort by bucket then value, so each bucket's first and last entries are its min and max
+    order = np.lexsort((y, bucket))
+    sorted_buckets = bucket[order]
+    starts = np.flatnonzero(np.r_[True, sorted_buckets[1:] != sorted_buckets[:-1]])
+    ends = np.r_[starts[1:], len(order)] - 1
+    keep = np.unique(np.concatenate([order[starts], order[ends], [0, len(x) - 1]]))
+    return x[keep], y[keep]
+
+
+#Use readable date ticks on a numeric date axis
+def format_date_axis(ax):
+    locator = mdates.AutoDateLocator()
+    ax.xaxis.set_major_locator(locator)
+    ax.xaxis.set_major_formatter(mdates.ConciseDateFormatter(locator))
+
+
+#Compute every progress series once, as (label, dates, values, style) with numeric dates
+def prepare_progress_series(history):
+    dates_avg, avg_weights, max_weights = ExerciseGraph.compute_avg_weight_per_rep(history)
+    dates_1rm, e1rm = ExerciseGraph.compute_1rm_potential(history)
+    dates_perf, perf = ExerciseGraph.compute_performance(history)
+
+    candidates = [
+        ('Avg Weight per Rep', dates_avg, avg_weights, {'marker': 'o', 'color': 'blue'}),
+        ('Max Weight per Day', dates_avg, max_weights, {'marker': 's', 'linestyle': '--', 'color': 'green'}),
+        ('Estimated 1RM Potential', dates_1rm, e1rm, {'marker': 'o', 'color': 'purple'}),
+        ('Performance', dates_perf, perf, {'marker': 'o', 'color': 'orange'}),
+    ]
+
+    series = []
+    for label, dates, values, style in candidates:
+        x, y = to_plot_arrays(dates, values)
+        if len(x):
+            series.append((label, x, y, style))
+    return series
+
+
+#Plot prepared series and the goal line onto an axes, returning the lines, labels and line data
+def draw_progress_series(ax, series, goal, animated=False):
+    lines = []
+    labels = []
+    line_data = {}
+
+    for label, x, y, style in series:
+        line, = ax.plot(x, y, label=label, animated=animated, **style)
+        line_data[line] = (x, y, style.get('marker'))
+        lines.append(line)
+        labels.append(label)
+
+        if label == 'Estimated 1RM Potential' and goal is not None:
+            goal_line = ax.axhline(y=goal, color='red', linestyle='--', label=f'Goal: {goal} kg', animated=animated)
+            lines.append(goal_line)
+            labels.append('Goal')
+
+    ax.set_xlabel("Date")
+    ax.set_ylabel("Value")
+    format_date_axis(ax)
+    ax.grid(True)
+    ax.legend(lines, labels, loc='upper left')
+    return lines, labels, line_data
+
+
+#Downsample each line to the pixel width of the axes' visible date range
+def resample_series(ax, line_data):
+    lo, hi = ax.get_xlim()
+    buckets = max(ax.bbox.width, 1) * POINTS_PER_PIXEL / 2
+    for line, (x, y, marker) in line_data.items():
+        #Keep one point either side of the view so lines run off the edges
+        start = max(np.searchsorted(x, lo) - 1, 0)
+        end = min(np.searchsorted(x, hi, side='right') + 1, len(x))
+        shown_x, shown_y = minmax_downsample(x[start:end], y[start:end], buckets)
+        line.set_data(shown_x, shown_y)
+        line.set_marker(marker if marker and len(shown_x) <= MARKER_POINT_LIMIT else 'None')
+
+
 #Class to show graphs of exercise data
 class ExerciseGraph:
     @staticmethod
     #Get the average weight per rep for an exercise
     def compute_avg_weight_per_rep(history):
-        dates = []
-        avg_weights = []
-        max_weights = []
+        days, starts, reps, weights = history_columns(history)
+        if len(days) == 0:
+            return days, np.empty(0), np.empty(0)
 
-        #For each entry in the history
-        for date_str, reps_str, weights_str in history:
-            try:
-                #Get the reps and weights as lists
-                reps_list = [int(r.strip()) for r in reps_str.split(",") if r.strip().isdigit()]
-                weights_list = [float(w.strip()) for w in weights_str.split(",") if w.strip()]
-                num_sets = min(len(reps_list), len(weights_list))
-
-                #If there are no sets, skip this entry
-                if num_sets == 0:
-                    continue
-
-                total_weight = 0
-                total_reps = 0
-                max_weight = 0
-
-                #For each set
-                for i in range(num_sets):
-                    #Get the weight and reps for this set
-                    weight = weights_list[i]
-                    reps = reps_list[i]
-
-                    #Calculate the total weight across all sets
-                    total_weight += weight * reps
-
-                    #Update the total reps
-                    total_reps += reps
-
-                    #Update the max weight
-                    if weight > max_weight:
-                        max_weight = weight
-
-                #If there are no reps, skip this entry
-                if total_reps == 0:
-                    continue
-
-                #Calculate the average weight per rep
-                avg = total_weight / total_reps
-
-                #Add the date, average weight, and max weight to the lists
-                dates.append(date_str)
-                avg_weights.append(avg)
-                max_weights.append(max_weight)
-
-            #If there's an error parsing the history entry, skip it
-            except Exception as e:
-                print(f"Error parsing history entry: {e}")
-                continue
+        #Reduce every session's sets at once
+        total_weight = np.add.reduceat(weights * reps, starts)
+        total_reps = np.add.reduceat(reps, starts)
+        max_weights = np.maximum.reduceat(weights, starts)
 
-        #Return the dates, average weights, and max weights
-        return dates, avg_weights, max_weights
+        #Skip sessions with no reps
+        keep = total_reps > 0
+        return days[keep], total_weight[keep] / total_reps[keep], max_weights[keep]
 
     @staticmethod
     #Plot the average weight per rep for an exercise
@@ -70,11 +158,11 @@ class ExerciseGraph:
         fig, ax = plt.subplots()
 
         #Plot the average weight per rep
-        ax.plot(dates, avg_weights, marker='o', label='Avg Weight per Rep', color='blue')
+        ax.plot(*to_plot_arrays(dates, avg_weights), marker='o', label='Avg Weight per Rep', color='blue')
 
         #Plot the max weight
-        if max_weights:
-            ax.plot(dates, max_weights, marker='s', linestyle='--', label='Max Weight per Day', color='green')
+        if max_weights is not None and len(max_weights):
+            ax.plot(*to_plot_arrays(dates, max_weights), marker='s', linestyle='--', label='Max Weight per Day', color='green')
 
         #Show the goal line if set
         if goal is not None:
@@ -84,82 +172,37 @@ class ExerciseGraph:
         ax.set_title(f"{exercise_name} – Avg & Max Weight per Day")
         ax.set_xlabel("Date")
         ax.set_ylabel("Weight (kg)")
+        format_date_axis(ax)
         ax.grid(True)
         ax.legend()
-        plt.xticks(rotation=45)
         plt.tight_layout()
         plt.show(block=False)
 
     @staticmethod
     def compute_1rm_potential(history):
-        dates = []
-        e1rm_values = []
+        days, starts, reps, weights = history_columns(history)
+        if len(days) == 0:
+            return days, np.empty(0)
 
-        for date_str, reps_str, weights_str in history:
-            try:
-                reps_list = [int(r.strip()) for r in reps_str.split(",") if r.strip().isdigit()]
-                weights_list = [float(w.strip()) for w in weights_str.split(",") if w.strip()]
-                num_sets = min(len(reps_list), len(weights_list))
-
-                if num_sets == 0:
-                    continue
-
-                max_e1rm = 0
-                for i in range(num_sets):
-                    weight = weights_list[i]
-                    reps = reps_list[i]
-                    e1rm = weight * (1 + reps / 30)
-                    max_e1rm = max(max_e1rm, e1rm)
-
-                dates.append(date_str)
-                e1rm_values.append(max_e1rm)
-
-            except Exception as e:
-                print(f"Error parsing history entry: {e}")
-                continue
-
-        return dates, e1rm_values
+        e1rm = np.maximum.reduceat(weights * (1 + reps / 30), starts)
+        return days, np.maximum(e1rm, 0)
 
     @staticmethod
     def compute_performance(history):
-        dates = []
-        perf_values = []
+        days, starts, reps, weights = history_columns(history)
+        if len(days) == 0:
+            return days, np.empty(0)
 
-        for date_str, reps_str, weights_str in history:
-            try:
-                reps_list = [int(r.strip()) for r in reps_str.split(",") if r.strip().isdigit()]
-                weights_list = [float(w.strip()) for w in weights_str.split(",") if w.strip()]
-                num_sets = min(len(reps_list), len(weights_list))
-
-                if num_sets == 0:
-                    continue
-
-                total_weighted_e1rm = 0
-                total_reps = 0
-
-                for i in range(num_sets):
-                    weight = weights_list[i]
-                    reps = reps_list[i]
-                    if reps == 0:
-                        continue
-                    e1rm = weight * (1 + reps / 30)
-                    total_weighted_e1rm += e1rm * reps
-                    total_reps += reps
-
-                perf = total_weighted_e1rm / total_reps if total_reps > 0 else 0
-                dates.append(date_str)
-                perf_values.append(perf)
-
-            except Exception as e:
-                print(f"Error parsing history entry: {e}")
-                continue
-
-        return dates, perf_values
+        #Rep-weighted average e1RM, sets with no reps carry no weight
+        total_weighted_e1rm = np.add.reduceat(weights * (1 + reps / 30) * reps, starts)
+        total_reps = np.add.reduceat(reps, starts)
+        perf = np.divide(total_weighted_e1rm, total_reps, out=np.zeros_like(total_weighted_e1rm), where=total_reps > 0)
+        return days, perf
 
     @staticmethod
     def plot_1rm_potential(dates, e1rm_values, exercise_name, goal=None):
         fig, ax = plt.subplots()
-        ax.plot(dates, e1rm_values, marker='o', label='Estimated 1RM Potential', color='purple')
+        ax.plot(*to_plot_arrays(dates, e1rm_values), marker='o', label='Estimated 1RM Potential', color='purple')
 
         if goal is not None:
             ax.axhline(y=goal, color='red', linestyle='--', label=f'Goal: {goal} kg')
@@ -167,50 +210,76 @@ class ExerciseGraph:
         ax.set_title(f"{exercise_name} – Estimated 1RM Potential")
         ax.set_xlabel("Date")
         ax.set_ylabel("Weight (kg)")
+        format_date_axis(ax)
         ax.grid(True)
         ax.legend()
-        plt.xticks(rotation=45)
         plt.tight_layout()
         plt.show(block=False)
 
     @staticmethod
     def plot_performance(dates, perf_values, exercise_name):
         fig, ax = plt.subplots()
-        ax.plot(dates, perf_values, marker='o', label='Performance', color='orange')
+        ax.plot(*to_plot_arrays(dates, perf_values), marker='o', label='Performance', color='orange')
         ax.set_title(f"{exercise_name} – Performance")
         ax.set_xlabel("Date")
         ax.set_ylabel("Performance Score")
+        format_date_axis(ax)
         ax.grid(True)
         ax.legend()
-        plt.xticks(rotation=45)
         plt.tight_layout()
         plt.show(block=False)
 
 
-from PyQt5.QtWidgets import QDialog, QVBoxLayout, QSizePolicy, QPushButton
-from PyQt5.QtCore import Qt
+from PyQt5.QtWidgets import QDialog, QVBoxLayout, QSizePolicy, QPushButton, QStackedWidget, QLabel
+from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtGui import QPixmap
 from matplotlib.figure import Figure
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+from matplotlib.backends.backend_qt5agg import NavigationToolbar2QT as NavigationToolbar
 from matplotlib.widgets import CheckButtons
 
 class ExerciseProgressGraph(QDialog):
-    def __init__(self, exercise_name, goal, history, parent=None, show_checkbuttons=True):
+    # Without history the dialog shows a placeholder until show_rendered() supplies the chart
+    def __init__(self, exercise_name, goal, history=None, parent=None, show_checkbuttons=True):
         super().__init__(parent)
         self.setWindowTitle(f"{exercise_name} – Progress Overview")
         self.resize(900, 600)
 
         self.show_checkbuttons_flag = show_checkbuttons
+        self.goal = goal
+        self.lines = []
+        self.labels = []
+        self.series = {}
+        self.checkbox_ax = None
+        self.preview_pixmap = None
 
         # Layout
         self.layout = QVBoxLayout(self)
         self.setLayout(self.layout)
 
+        # Placeholder, then a pre-rendered image, until the interactive canvas is ready
+        self.stack = QStackedWidget(self)
+        self.preview_label = QLabel("Loading chart…", self)
+        self.preview_label.setAlignment(Qt.AlignCenter)
+        self.preview_label.setMinimumSize(1, 1)
+        self.stack.addWidget(self.preview_label)
+        self.layout.addWidget(self.stack)
+
         # Figure and canvas
         self.figure = Figure(constrained_layout=True)
         self.canvas = FigureCanvas(self.figure)
         self.canvas.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
         self.canvas.updateGeometry()
-        self.layout.addWidget(self.canvas)
+        self.stack.addWidget(self.canvas)
+
+        # Zoom and pan toolbar, plotted lines are re-sampled for the visible range
+        self.toolbar = NavigationToolbar(self.canvas, self)
+        self.layout.addWidget(self.toolbar)
+
+        # Series lines are animated and blitted over a cached background
+        self.background = None
+        self.canvas.mpl_connect('draw_event', self.on_draw)
+        self.canvas.mpl_connect('resize_event', lambda _event: self.resample_lines())
 
         # Toggle Buttons
         self.toggle_buttons_btn = QPushButton("Toggle Buttons", self)
@@ -226,14 +295,35 @@ class ExerciseProgressGraph(QDialog):
         self.toggle_fullscreen_btn.raise_()
 
         # Plot data
-        self.plot(exercise_name, goal, history)
+        if history is not None:
+            self.plot(exercise_name, goal, history)
+            self.stack.setCurrentWidget(self.canvas)
 
         # Initial button placement
         self.update_button_positions()
 
+    # Show a rendered chart image at once, then swap in the interactive canvas once the dialog has painted
+    def show_rendered(self, series, png_bytes=None):
+        if png_bytes:
+            self.preview_pixmap = QPixmap()
+            self.preview_pixmap.loadFromData(png_bytes, "PNG")
+            self.update_preview()
+        QTimer.singleShot(0, lambda: self.show_interactive(series))
+
+    def show_interactive(self, series):
+        self.plot_series(series, self.goal)
+        self.stack.setCurrentWidget(self.canvas)
+
+    def update_preview(self):
+        if self.preview_pixmap is not None:
+            self.preview_label.setPixmap(self.preview_pixmap.scaled(
+                self.preview_label.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation
+            ))
+
     # Reposition buttons on resize
     def resizeEvent(self, event):
         self.update_button_positions()
+        self.update_preview()
         super().resizeEvent(event)
 
     def update_button_positions(self):
@@ -262,58 +352,31 @@ class ExerciseProgressGraph(QDialog):
             super().keyPressEvent(event)
 
     def plot(self, exercise_name, goal, history):
+        self.plot_series(prepare_progress_series(history), goal)
+
+    # Plot series already prepared by prepare_progress_series
+    def plot_series(self, series, goal):
         self.figure.clear()
         ax = self.figure.add_subplot(111)
+        self.ax = ax
 
-        self.lines = []
-        self.labels = []
-
-        # Compute data series
-        dates_avg, avg_weights, max_weights = ExerciseGraph.compute_avg_weight_per_rep(history)
-        dates_1rm, e1rm = ExerciseGraph.compute_1rm_potential(history)
-        dates_perf, perf = ExerciseGraph.compute_performance(history)
+        self.lines, self.labels, self.series = draw_progress_series(ax, series, goal, animated=True)
 
-        if dates_avg:
-            l_avg, = ax.plot(dates_avg, avg_weights, marker='o', color='blue', label='Avg Weight per Rep')
-            self.lines.append(l_avg)
-            self.labels.append('Avg Weight per Rep')
-
-        if dates_avg and max_weights:
-            l_max, = ax.plot(dates_avg, max_weights, marker='s', linestyle='--', color='green', label='Max Weight per Day')
-            self.lines.append(l_max)
-            self.labels.append('Max Weight per Day')
-
-        if dates_1rm:
-            l_1rm, = ax.plot(dates_1rm, e1rm, marker='o', color='purple', label='Estimated 1RM Potential')
-            self.lines.append(l_1rm)
-            self.labels.append('Estimated 1RM Potential')
-
-            if goal is not None:
-                goal_line = ax.axhline(y=goal, color='red', linestyle='--', label=f'Goal: {goal} kg')
-                self.lines.append(goal_line)
-                self.labels.append('Goal')
-
-        if dates_perf:
-            l_perf, = ax.plot(dates_perf, perf, marker='o', color='orange', label='Performance')
-            self.lines.append(l_perf)
-            self.labels.append('Performance')
-
-        ax.set_xlabel("Date")
-        ax.set_ylabel("Value")
-        ax.grid(True)
-        ax.legend(self.lines, self.labels, loc='upper left')
-        ax.tick_params(axis='x', rotation=45)
+        # Draw only as many points as the axes has pixels, re-sampling after zoom or pan
+        self.resample_lines()
+        ax.callbacks.connect('xlim_changed', lambda _ax: self.resample_lines())
 
         # CheckButtons
         if self.show_checkbuttons_flag:
             self.checkbox_ax = self.figure.add_axes([0.01, 0.1, 0.15, 0.3])
             visibility = [line.get_visible() for line in self.lines]
             self.check = CheckButtons(self.checkbox_ax, self.labels, visibility)
+            self.check.drawon = False
 
             def toggle_visibility(label):
                 idx = self.labels.index(label)
                 self.lines[idx].set_visible(not self.lines[idx].get_visible())
-                self.canvas.draw_idle()
+                self.blit_lines()
 
             self.check.on_clicked(toggle_visibility)
         else:
@@ -322,6 +385,33 @@ class ExerciseProgressGraph(QDialog):
 
         self.canvas.draw_idle()
 
+    # Downsample each series to the pixel width of the visible date range
+    def resample_lines(self):
+        if self.series:
+            resample_series(self.ax, self.series)
+
+    # Cache the static background after a full draw, then draw the animated lines over it
+    def on_draw(self, event):
+        self.background = self.canvas.copy_from_bbox(self.figure.bbox)
+        self.draw_lines()
+
+    def draw_lines(self):
+        for line in self.lines:
+            if line.get_visible():
+                self.ax.draw_artist(line)
+
+    # Redraw only the series lines and check boxes after a visibility toggle
+    def blit_lines(self):
+        if self.background is None:
+            self.canvas.draw_idle()
+            return
+
+        self.canvas.restore_region(self.background)
+        self.draw_lines()
+        if self.checkbox_ax is not None and self.checkbox_ax.get_visible():
+            self.checkbox_ax.draw(self.canvas.get_renderer())
+        self.canvas.blit(self.figure.bbox)
+
     # Toggle CheckButtons visibility
     def toggle_checkbuttons(self):
         if self.checkbox_ax is None:
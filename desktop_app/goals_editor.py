@@ -4,6 +4,8 @@ from PyQt5.QtWidgets import (
 )
 from PyQt5.QtCore import Qt
 from desktop_app.exercise_graph import ExerciseProgressGraph
+from desktop_app.chart_renderer import request_chart
+from desktop_app.exercise_dashboard import ExerciseDashboard
 
 class GoalsEditor(QDialog):
     def __init__(self, db, parent=None):
@@ -31,18 +33,30 @@ class GoalsEditor(QDialog):
         self.table.setEditTriggers(QAbstractItemView.DoubleClicked | QAbstractItemView.SelectedClicked)
         self.layout.addWidget(self.table)
 
+        #Rows whose goal cell was edited since the last save
+        self.dirty_rows = set()
+        self.loading = False
+        self.table.itemChanged.connect(self.mark_dirty)
+
         #Create Save Button
         self.save_btn = QPushButton("Save Goals")
         self.save_btn.clicked.connect(self.save_goals)
         self.layout.addWidget(self.save_btn)
 
+        #Compare progress across every exercise at once
+        self.dashboard_btn = QPushButton("Compare All Exercises")
+        self.dashboard_btn.clicked.connect(self.show_dashboard)
+        self.layout.addWidget(self.dashboard_btn)
+
         #Load initial data
         self.load_goals()
 
     #Load goals
     def load_goals(self):
-        #Clear table
+        #Clear table, edits made while filling it are not user edits
+        self.loading = True
         self.table.setRowCount(0)
+        self.dirty_rows.clear()
 
         #Get current goals from db
         goals = self.db.get_all_goals()
@@ -50,6 +64,12 @@ class GoalsEditor(QDialog):
         #Add a row for each exercise
         for exercise in goals:
             self.add_goal_row(exercise)
+        self.loading = False
+
+    #Remember which goal cells the user changed
+    def mark_dirty(self, item):
+        if not self.loading and item.column() == 1:
+            self.dirty_rows.add(item.row())
 
     #Add a new row
     def add_goal_row(self, exercise):
@@ -60,9 +80,8 @@ class GoalsEditor(QDialog):
         #Seperate exercise data
         exercise_id, name, goal = exercise
 
-        #Get highest weight and percentange of goal reached
-        highest_weight = self.db.get_highest_weight_for_exercise(name)
-        highest_weight = highest_weight if highest_weight is not None else 0
+        #Get highest weight from the exercise's history columns and percentange of goal reached
+        highest_weight, _reps = self.db.get_exercise_history(name).top_set()
         percent_reached = self.calculate_percentage(highest_weight, goal)
 
         #Fill out the row with data
@@ -77,8 +96,10 @@ class GoalsEditor(QDialog):
         percent_item.setFlags(percent_item.flags() & ~Qt.ItemIsEditable)
         goal_item.setFlags(goal_item.flags() | Qt.ItemIsEditable)
 
-        #Store exercise ID
+        #Store exercise ID, the saved goal and the highest weight for recomputing the percentage
         name_item.setData(Qt.UserRole, exercise_id)
+        goal_item.setData(Qt.UserRole, goal)
+        high_item.setData(Qt.UserRole, highest_weight)
 
         #Add data to row
         self.table.setItem(row, 0, name_item)
@@ -100,22 +121,19 @@ class GoalsEditor(QDialog):
         percent = (highest_weight / goal) * 100
         return f"{percent:.1f}%"
 
-    #Save any updated data
+    #Save the edited goals in one batch and refresh only their percentages
     def save_goals(self):
-        #Go through each row 
-        for row in range(self.table.rowCount()):
+        changed = {}
+        for row in sorted(self.dirty_rows):
             name_item = self.table.item(row, 0)
             goal_item = self.table.item(row, 1)
 
             #If it is empty, skip
             if not name_item or not goal_item:
                 continue
-            
-            #Get the exercise ID and goal value
-            exercise_id = name_item.data(Qt.UserRole)
-            goal_text = goal_item.text().strip().lower()
 
-            #Skip if still no goal
+            #Get the goal value, 'none' clears it
+            goal_text = goal_item.text().strip().lower()
             if goal_text == "none":
                 new_goal = None
             else:
@@ -130,13 +148,32 @@ class GoalsEditor(QDialog):
                     )
                     return
 
-            #Update the goal in the database
-            self.db.update_goal(exercise_id, new_goal)
+            #Only send goals that differ from the saved value
+            if new_goal != goal_item.data(Qt.UserRole):
+                changed[row] = new_goal
+
+        if not changed:
+            self.dirty_rows.clear()
+            QMessageBox.information(self, "Goals", "No goal changes to save.")
+            return
+
+        #Update the changed goals in the database
+        self.db.update_goals({self.table.item(row, 0).data(Qt.UserRole): goal for row, goal in changed.items()})
+
+        #Recompute the affected rows without reloading the table
+        self.loading = True
+        for row, goal in changed.items():
+            goal_item = self.table.item(row, 1)
+            goal_item.setText("none" if goal is None else str(goal))
+            goal_item.setData(Qt.UserRole, goal)
+            highest_weight = self.table.item(row, 2).data(Qt.UserRole)
+            self.table.item(row, 3).setText(self.calculate_percentage(highest_weight, goal))
+        self.loading = False
+        self.dirty_rows.clear()
+
+        #Show success
+        QMessageBox.information(self, "Success", f"Saved {len(changed)} goal(s).")
 
-        #Show success, and close
-        QMessageBox.information(self, "Success", "Goals saved successfully.")
-        self.accept()
-            
     def show_exercise_progress(self, button):
         for row in range(self.table.rowCount()):
             if self.table.cellWidget(row, 4) == button:
@@ -150,11 +187,24 @@ class GoalsEditor(QDialog):
             QMessageBox.warning(self, "Error", "Could not determine which exercise to plot.")
             return
 
-        history = self.db.get_exercise_history(exercise_name)
-        if not history:
-            QMessageBox.information(self, "No Data", f"No history for '{exercise_name}'.")
-            return
+        # Show the progress window straight away, the chart is prepared in the background
+        progress_window = ExerciseProgressGraph(exercise_name, goal, parent=self)
+        self.progress_window = progress_window
+        progress_window.show()
+
+        def on_ready(chart):
+            if not chart.series:
+                progress_window.close()
+                QMessageBox.information(self, "No Data", f"No history for '{exercise_name}'.")
+                return
+            progress_window.show_rendered(chart.series, chart.png)
+
+        def on_failed(message):
+            progress_window.close()
+            QMessageBox.critical(self, "Error", f"Could not load the chart: {message}")
+
+        request_chart(self.db, exercise_name, goal, on_ready, on_failed)
 
-        # Create and show the progress window
-        self.progress_window = ExerciseProgressGraph(exercise_name, goal, history, parent=self)
-        self.progress_window.show()
+    def show_dashboard(self):
+        self.dashboard_window = ExerciseDashboard(self.db, parent=self)
+        self.dashboard_window.show()
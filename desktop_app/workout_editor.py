@@ -1,7 +1,7 @@
 from PyQt5.QtWidgets import QDialog, QVBoxLayout, QLabel, QLineEdit, QPushButton, QScrollArea, QWidget, QMessageBox, QDateEdit
 from PyQt5.QtCore import QDate
 
-from common.db_helper import DBHelper
+from desktop_app.exercise_catalog_model import shared_catalog_model
 from desktop_app.exercise_entry import ExerciseEntry
 
 #Class to create a new workout or edit an existing one
@@ -54,18 +54,26 @@ class WorkoutEditor(QDialog):
         self.save_btn.clicked.connect(self.save_workout)
         self.layout.addWidget(self.save_btn)
 
-        #Set all exercise entries to empty, and create the first one
+        #Pool of every entry created, the shown ones are the exercise entries, and create the first one
+        self.entry_pool = []
         self.exercise_entries = []
         self.add_exercise_entry()
 
-    #Add a new exercise entry to the workout
-    def add_exercise_entry(self):
-        #Get the database helper and create a new exercise entry
-        helper = DBHelper()
-        entry = ExerciseEntry(helper)
+    #Return the pooled entry at an index, creating it only if the pool is not that large yet
+    def pooled_entry(self, index):
+        if index == len(self.entry_pool):
+            #Create a new exercise entry sharing the editor's database connection
+            entry = ExerciseEntry(self.db)
+            self.exercises_container_layout.addWidget(entry)
+            self.entry_pool.append(entry)
+        return self.entry_pool[index]
 
-        #Add the entry to the layout and the list of entries
-        self.exercises_container_layout.addWidget(entry)
+    #Add a new exercise entry to the workout, reusing a hidden one when there is one
+    def add_exercise_entry(self):
+        entry = self.pooled_entry(len(self.exercise_entries))
+        if entry.isHidden():
+            entry.set_data("", 3, [], [])
+            entry.setVisible(True)
         self.exercise_entries.append(entry)
 
     #Save the workout to the database
@@ -107,27 +115,28 @@ class WorkoutEditor(QDialog):
             #Add to the database
             workout_id = self.db.add_workout(name, date)
         else:
-            #Update the existing entry of the database
+            #Update the existing entry of the database if the name or date changed
             workout_id = self.workout_id
-            self.db.update_workout(workout_id, name, date)
-
-            # Delete old exercises for this workout
-            self.db.delete_exercises_for_workout(workout_id)
-
-        #For each exercise
-        for ex in exercises_data:
-
-            #Convert the reps and weights to strings
-            reps_str = ",".join(ex["reps"])
-            weights_str = ",".join(ex["weight"])
+            if self.db.get_workout_by_id(workout_id)[1:] != (name, date):
+                self.db.update_workout(workout_id, name, date)
 
-            #Add the exercise to the database
-            self.db.add_exercise(workout_id, ex["name"], ex["sets"], reps_str, weights_str)
+        #Write only the exercises that were added, changed or removed
+        self.db.update_workout_exercises(workout_id, [
+            (ex["name"], ex["sets"], ",".join(ex["reps"]), ",".join(ex["weight"]))
+            for ex in exercises_data
+        ])
 
         #Confirm the save
         QMessageBox.information(self, "Success", "Workout saved successfully!")
         self.accept()
 
+    #Prepare the dialog for another workout, a new one starts with a single blank exercise
+    def open_workout(self, workout_id=None, name="", date=None, exercises=None):
+        self.workout_id = workout_id
+        #Reused entries were built against the catalog as it was then, pick up any later additions
+        shared_catalog_model(self.db)
+        self.set_workout_data(name, date, [("", 3, "", "")] if exercises is None else exercises)
+
     #Set the workout data in the editor
     def set_workout_data(self, name, date, exercises):
         #Set the workout name
@@ -139,20 +148,18 @@ class WorkoutEditor(QDialog):
         else:
             self.workout_date_input.setDate(QDate.currentDate())
 
-        #Clear old entries from layout and list
-        for entry in self.exercise_entries:
-            entry.setParent(None)
-        self.exercise_entries.clear()
-
-        #For each exercise in the workout
-        for ex in exercises:
-            #Seperate the exercise data
-            ex_name, sets, reps, weights = ex
-
-            # Create a new exercise entry
-            entry = ExerciseEntry(self.db)
-
-            #Set the data in the entry and add it to the layout and list
-            entry.set_data(ex_name, sets, reps, weights)
-            self.exercises_container_layout.addWidget(entry)
-            self.exercise_entries.append(entry)
+        #Hold repaints and layout passes until every entry is filled
+        self.scroll_content.setUpdatesEnabled(False)
+        try:
+            #Fill pooled entries in order, creating only the ones the pool is missing
+            for i, (ex_name, sets, reps, weights) in enumerate(exercises):
+                entry = self.pooled_entry(i)
+                entry.set_data(ex_name, sets, reps, weights)
+                entry.setVisible(True)
+
+            #Hide the entries this workout does not need rather than deleting them
+            for entry in self.entry_pool[len(exercises):]:
+                entry.setVisible(False)
+            self.exercise_entries = self.entry_pool[:len(exercises)]
+        finally:
+            self.scroll_content.setUpdatesEnabled(True)
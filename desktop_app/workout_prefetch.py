@@ -0,0 +1,49 @@
+from collections import OrderedDict
+
+
+#Bounded cache of each workout's exercises, filled in bulk and emptied by any database write
+class WorkoutExerciseCache:
+    def __init__(self, db, max_workouts=512):
+        self.db = db
+        self.max_workouts = max_workouts
+        self.entries = OrderedDict()
+        self.change_token = db.get_change_token()
+
+    #Drop everything if the database has been written since the cache was filled
+    def check_writes(self):
+        token = self.db.get_change_token()
+        if token != self.change_token:
+            self.entries.clear()
+            self.change_token = token
+
+    def invalidate(self, workout_ids=None):
+        if workout_ids is None:
+            self.entries.clear()
+        else:
+            for workout_id in workout_ids:
+                self.entries.pop(workout_id, None)
+
+    def get(self, workout_id):
+        self.check_writes()
+        exercises = self.entries.get(workout_id)
+        if exercises is not None:
+            self.entries.move_to_end(workout_id)
+        return exercises
+
+    #Load every missing workout in one query
+    def prefetch(self, workout_ids):
+        self.check_writes()
+        missing = [workout_id for workout_id in workout_ids if workout_id not in self.entries]
+        if missing:
+            for workout_id, exercises in self.db.get_exercises_for_workouts(missing).items():
+                self.entries[workout_id] = exercises
+            while len(self.entries) > self.max_workouts:
+                self.entries.popitem(last=False)
+
+    #Return cached exercises, loading them now only if the idle prefetch has not reached them yet
+    def get_or_load(self, workout_id):
+        exercises = self.get(workout_id)
+        if exercises is None:
+            self.prefetch([workout_id])
+            exercises = self.entries.get(workout_id, [])
+        return exercises
@@ -1,17 +1,24 @@
 from PyQt5.QtWidgets import (
-    QWidget, QVBoxLayout, QPushButton, QTableWidget, QTableWidgetItem,
-    QHeaderView, QAbstractItemView, QMessageBox, QHBoxLayout, QMenu
+    QWidget, QVBoxLayout, QPushButton, QTreeView,
+    QHeaderView, QAbstractItemView, QMessageBox, QHBoxLayout, QMenu, QLineEdit,
+    QComboBox, QInputDialog, QLabel
 )
-from PyQt5.QtCore import Qt, QDate
+from PyQt5.QtCore import Qt, QDate, QTimer, QPoint
 from desktop_app.workout_editor import WorkoutEditor
 from desktop_app.goals_editor import GoalsEditor
+from desktop_app.workout_prefetch import WorkoutExerciseCache
+from desktop_app.workout_tree_model import WorkoutTreeModel
 from common.google_drive_helper import GoogleDriveHelper
+from common.sync_engine import ChangeSyncEngine, DriveSegmentStore
 
 class WorkoutTracker(QWidget):
-    def __init__(self, db_helper):
-        #Construct and get database
+    def __init__(self, db_helper, profiles=None):
+        #Construct and get database, profiles is the cache of open profile databases when there are several
         super().__init__()
         self.db = db_helper
+        self.profiles = profiles
+        self.drive_helper = None
+        self.workout_editor = None
 
         #Setup the main window
         self.setWindowTitle("Workout Tracker")
@@ -29,12 +36,12 @@ class WorkoutTracker(QWidget):
         self.top_menu_buttons_layout.addWidget(self.login_btn)
 
         #Add Google Drive save button
-        self.save_btn = QPushButton("Save DB to Google Drive")
+        self.save_btn = QPushButton("Push Changes to Google Drive")
         self.save_btn.clicked.connect(self.save_to_drive)
         self.top_menu_buttons_layout.addWidget(self.save_btn)
 
         #Add Google Drive pull button
-        self.pull_btn = QPushButton("Pull DBs from Google Drive")
+        self.pull_btn = QPushButton("Pull Changes from Google Drive")
         self.pull_btn.clicked.connect(self.pull_from_drive)
         self.top_menu_buttons_layout.addWidget(self.pull_btn)
 
@@ -51,23 +58,57 @@ class WorkoutTracker(QWidget):
         #Add top menu buttons to the main layout
         self.layout.addLayout(self.top_menu_buttons_layout)
 
-        #Table to display workouts
-        self.table = QTableWidget()
-        self.table.setColumnCount(3)
-        self.table.setHorizontalHeaderLabels(["Exercise / Workout", "Reps", "Weight (Kg)"])
-        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
-        self.table.cellClicked.connect(self.toggle_workout_details)
-        self.table.verticalHeader().setVisible(False)
-        self.layout.addWidget(self.table)
-
-        #Add a right-click menu for the table
-        self.table.setContextMenuPolicy(Qt.CustomContextMenu)
-        self.table.customContextMenuRequested.connect(self.show_context_menu)
-
-        #Expanded row tracking — initialize to -1 (no row expanded)
-        self.expanded_row = -1
-        self.expanded_workout_id = None
+        #Profile picker, switching opens the athlete's own database without restarting
+        if self.profiles:
+            self.profile_layout = QHBoxLayout()
+            self.profile_layout.addWidget(QLabel("Profile:"))
+            self.profile_combo = QComboBox()
+            self.profile_combo.activated.connect(self.on_profile_selected)
+            self.profile_layout.addWidget(self.profile_combo, 1)
+            self.new_profile_btn = QPushButton("New Profile")
+            self.new_profile_btn.clicked.connect(self.add_profile)
+            self.profile_layout.addWidget(self.new_profile_btn)
+            self.layout.addLayout(self.profile_layout)
+            self.fill_profile_combo()
+
+        #Search box for workout names, exercises and notes
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("Search workouts, exercises and notes")
+        self.search_input.setClearButtonEnabled(True)
+        self.layout.addWidget(self.search_input)
+
+        #Wait for typing to pause before running the search
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(200)
+        self.search_timer.timeout.connect(self.load_workouts)
+        self.search_input.textChanged.connect(self.search_timer.start)
+
+        #Exercises for visible workouts are loaded in bulk when the UI is idle
+        self.exercise_cache = WorkoutExerciseCache(self.db)
+
+        #Tree of workouts, their exercises and sets, with children loaded when first expanded
+        self.model = WorkoutTreeModel(self.exercise_cache, self)
+        self.tree = QTreeView()
+        self.tree.setModel(self.model)
+        self.tree.setUniformRowHeights(True)
+        self.tree.setExpandsOnDoubleClick(False)
+        self.tree.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.tree.header().setSectionResizeMode(QHeaderView.Stretch)
+        self.tree.clicked.connect(self.toggle_details)
+        self.model.modelReset.connect(self.span_workout_rows)
+        self.model.rowsInserted.connect(self.span_workout_rows)
+        self.layout.addWidget(self.tree)
+
+        #Add a right-click menu for the tree
+        self.tree.setContextMenuPolicy(Qt.CustomContextMenu)
+        self.tree.customContextMenuRequested.connect(self.show_context_menu)
+
+        self.prefetch_timer = QTimer(self)
+        self.prefetch_timer.setSingleShot(True)
+        self.prefetch_timer.setInterval(0)
+        self.prefetch_timer.timeout.connect(self.prefetch_visible_exercises)
+        self.tree.verticalScrollBar().valueChanged.connect(self.prefetch_timer.start)
 
         #Show the workouts
         self.load_workouts()
@@ -79,151 +120,121 @@ class WorkoutTracker(QWidget):
 
     #Get the workouts from the database and display them
     def load_workouts(self):
-        self.table.setRowCount(0)
-
-        #Get all workouts from the database
-        workouts = self.db.get_all_workouts()
-
-        #Add a row for each workout
-        for workout in workouts:
-            self.add_workout_row(workout)
-
-    #Add a row for the workout in the table
-    def add_workout_row(self, workout):
-        #Add a new row to the table
-        row = self.table.rowCount()
-        self.table.insertRow(row)
-
-        #Seperate the workout data, then show name and date
-        workout_id, name, date = workout
-        label = f"{name} ({date})"
-
-        #Add the workout name as the first item in the row
-        item = QTableWidgetItem(label)
-        item.setData(Qt.UserRole, workout_id)
-
-        #Set row data
-        self.table.setItem(row, 0, item)
-        self.table.setSpan(row, 0, 1, 3)
-        self.table.setRowHeight(row, 30)
+        #Get the workouts matching the search, or all workouts when it is empty
+        query = self.search_input.text().strip()
+        if query:
+            workouts = self.db.get_workouts_by_ids(self.db.search(query, limit=200))
+        else:
+            workouts = self.db.get_all_workouts()
+
+        self.model.set_workouts(workouts)
+        self.prefetch_timer.start()
+
+    #List the registered profiles with the active one selected
+    def fill_profile_combo(self):
+        registry = self.profiles.registry
+        self.profile_combo.clear()
+        for profile_id, name in registry.list_profiles():
+            self.profile_combo.addItem(name, profile_id)
+        self.profile_combo.setCurrentIndex(self.profile_combo.findData(registry.active_id))
+        self.setWindowTitle(f"Workout Tracker – {registry.name(registry.active_id)}")
+
+    def on_profile_selected(self, index):
+        self.switch_profile(self.profile_combo.itemData(index))
+
+    #Point the window at another profile's database, reusing its connection if it is still open
+    def switch_profile(self, profile_id):
+        registry = self.profiles.registry
+        if profile_id == registry.active_id:
+            return
+        try:
+            self.db = self.profiles.get(profile_id)
+        except Exception as e:
+            QMessageBox.critical(self, "Profile Error", str(e))
+            self.fill_profile_combo()
+            return
 
-    #Show or hide the details of the workout when clicked
-    def toggle_workout_details(self, row, column):
-        #Get the clicked item
-        clicked_item = self.table.item(row, 0)
+        registry.set_active(profile_id)
+        self.exercise_cache = WorkoutExerciseCache(self.db)
+        self.model.exercise_cache = self.exercise_cache
+        self.search_input.clear()
+        self.fill_profile_combo()
+        self.load_workouts()
 
-        #If no item is clicked or it's not a workout row, do nothing
-        if not clicked_item:
+    #Ask for a name, register a profile with its own new database and switch to it
+    def add_profile(self):
+        name, ok = QInputDialog.getText(self, "New Profile", "Athlete name:")
+        if not ok or not name.strip():
             return
-
-        #Get the workout ID from the clicked item
-        workout_id = clicked_item.data(Qt.UserRole)
-        #If no workout ID is found, do nothing
-        if workout_id is None:
+        try:
+            profile_id = self.profiles.registry.add_profile(name)
+        except ValueError as e:
+            QMessageBox.warning(self, "New Profile", str(e))
             return
+        self.switch_profile(profile_id)
 
-        #If clicking the same workout that's already expanded — collapse it
-        if self.expanded_workout_id == workout_id:
-            self.collapse_details()
+    #Let workout labels use the full row width
+    def span_workout_rows(self, parent=None, first=None, last=None):
+        if parent is not None and parent.isValid():
             return
-
-        #Collapse previous workout if any
-        if self.expanded_row != -1:
-            self.collapse_details()
-
-            # Adjust row index if needed after collapsing previous rows
-            if row > self.expanded_row:
-                row -= self.details_count
-
-        #Get the exercises for the clicked workout from the database
-        exercises = self.db.get_exercises_for_workout(workout_id)
-
-        #If there are no exercises, show a message and return
-        if not exercises:
+        rows = range(self.model.rowCount()) if first is None else range(first, last + 1)
+        for row in rows:
+            self.tree.setFirstColumnSpanned(row, self.tree.rootIndex(), True)
+
+    #Load exercises for the workouts on screen and the next page in one query
+    def prefetch_visible_exercises(self):
+        index = self.tree.indexAt(QPoint(1, 1))
+        row_height = max(self.tree.sizeHintForRow(0), 1)
+        rows_to_scan = 2 * (self.tree.viewport().height() // row_height + 1)
+
+        workout_ids = []
+        while index.isValid() and rows_to_scan > 0:
+            if self.model.is_workout(index):
+                workout_ids.append(self.model.workout_id_for(index))
+            index = self.tree.indexBelow(index)
+            rows_to_scan -= 1
+        self.exercise_cache.prefetch(workout_ids)
+
+    #Show or hide a workout's exercises, or an exercise's sets, when its row is clicked
+    def toggle_details(self, index):
+        index = index.sibling(index.row(), 0)
+        if self.model.canFetchMore(index):
+            self.model.fetchMore(index)
+
+        #If a workout has no exercises, show a message
+        if self.model.is_workout(index) and self.model.rowCount(index) == 0:
             QMessageBox.information(self, "No Exercises", "This workout has no exercises.")
             return
 
-        
-        self.expanded_row = row
-        self.expanded_workout_id = workout_id
-        self.details_count = 0
-        self.exercise_set_rows = {}
-
-        #For each exercise in the workout
-        for exercise_index, (exercise_name, sets, reps_str, weight_str) in enumerate(exercises):
-            #Create a new row for the exercise
-            insert_row = self.expanded_row + 1 + self.details_count
-
-            #Split the reps and weights strings into lists
-            #Assuming reps_str and weight_str are comma-separated strings
-            reps_list = [r.strip() for r in reps_str.split(",")]
-            weight_list = [w.strip() for w in weight_str.split(",")]
-
-            #Create a dictionary to hold the exercise data
-            exercise_data = {
-                "name": exercise_name,
-                "sets": sets,
-                "reps": reps_list,
-                "weights": weight_list
-            }
-
-            #Add a new row for the exercise
-            self.table.insertRow(insert_row)
-
-            #Create a button to expand/collapse the sets
-            expand_btn = QPushButton(f"▶ {exercise_name}")
-            expand_btn.setFlat(True)
-            expand_btn.setStyleSheet("text-align: left;")
-            expand_btn.clicked.connect(lambda checked, b=expand_btn, d=exercise_data: self.toggle_exercise_sets(b, d))
-            self.table.setCellWidget(insert_row, 0, expand_btn)
-
-            self.table.setItem(insert_row, 1, QTableWidgetItem(""))
-            self.table.setItem(insert_row, 2, QTableWidgetItem(""))
-
-            self.exercise_set_rows[insert_row] = 0
-            self.details_count += 1
-
-    #When the details are expanded, collapse them
-    def collapse_details(self):
-
-        #If collapsing
-        if self.expanded_row != -1:
-            #For each of the exercises in workout being collapsed
-            for _ in range(self.details_count):
-                #Remove it
-                self.table.removeRow(self.expanded_row + 1)
-
-        #Reset variables
-        self.expanded_row = -1
-        self.expanded_workout_id = None
-        self.details_count = 0
-        self.exercise_set_rows = {}
+        self.tree.setExpanded(index, not self.tree.isExpanded(index))
+
+    #Reuse one editor dialog per database, so its exercise entries are pooled across opens
+    def get_workout_editor(self):
+        if self.workout_editor is None or self.workout_editor.db is not self.db:
+            if self.workout_editor is not None:
+                self.workout_editor.deleteLater()
+            self.workout_editor = WorkoutEditor(self.db, self)
+        return self.workout_editor
 
     #View or edit a workout
     def open_workout_editor(self, workout_id=None, template_from_id=None):
+        editor = self.get_workout_editor()
 
         #If editing an existing workout
         if workout_id is not None:
-
-            #Open the workout editor with the existing workout data
-            editor = WorkoutEditor(self.db, self, workout_id)
-
             #Fill the editor with the workout data
             workout = self.db.get_workout_by_id(workout_id)
             exercises = self.db.get_exercises_for_workout(workout_id)
-            editor.set_workout_data(workout[1], workout[2], exercises)
+            editor.open_workout(workout_id, workout[1], workout[2], exercises)
         elif template_from_id is not None:
-            #Open the workout editor with a template from an existing workout
-            editor = WorkoutEditor(self.db, self)
-
             #Use today's date and fill the editor with the template workout data
             workout = self.db.get_workout_by_id(template_from_id)
             exercises = self.db.get_exercises_for_workout(template_from_id)
             today_str = QDate.currentDate().toString("yyyy-MM-dd")
-            editor.set_workout_data(workout[1], today_str, exercises)
+            editor.open_workout(None, workout[1], today_str, exercises)
         else:
             #Open the workout editor for a new workout
-            editor = WorkoutEditor(self.db, self)
+            editor.open_workout()
 
         #Connect the editor's finished signal to reload workouts
         if editor.exec_():
@@ -231,29 +242,21 @@ class WorkoutTracker(QWidget):
 
     #Delete the selected workout from the database
     def delete_selected_workout(self):
-        selected_row = self.table.currentRow()
+        selected = self.tree.currentIndex()
 
         #If no row is selected, show a warning
-        if selected_row == -1:
+        if not selected.isValid():
             QMessageBox.warning(self, "No Selection", "Please select a workout to delete.")
             return
 
-        #Get the workout item from the selected row
-        workout_item = self.table.item(selected_row, 0)
-
-        #If no workout item is found, show a warning
-        if not workout_item:
-            QMessageBox.warning(self, "Invalid Selection", "Please select a valid workout row.")
-            return
-
-        #Get the workout ID from the item
-        workout_id = workout_item.data(Qt.UserRole)
-
-        #If no workout ID is found, show a warning
-        if workout_id is None:
+        #If an exercise or set row is selected, show a warning
+        if not self.model.is_workout(selected):
             QMessageBox.warning(self, "Invalid Selection", "You must select a workout row (not an exercise row).")
             return
 
+        #Get the workout ID from the selected row
+        workout_id = self.model.workout_id_for(selected)
+
         #Confirm deletion with the user
         reply = QMessageBox.question(
             self,
@@ -265,77 +268,26 @@ class WorkoutTracker(QWidget):
         #If the user confirms, delete the workout
         if reply == QMessageBox.Yes:
             self.db.delete_workout(workout_id)
-            self.expanded_row = -1
-            self.expanded_workout_id = None
             self.load_workouts()
 
-    #Show or hide the sets of an exercise when the button is clicked
-    def toggle_exercise_sets(self, button, exercise_data):
-        #Find the row of this button
-        row = self.table.indexAt(button.pos()).row()
-
-        #If the row is invalid, do nothing
-        if row == -1:
-            return
-
-        #Check if the sets are currently expanded or collapsed
-        is_expanded = self.exercise_set_rows.get(row, 0) > 0
-
-        #If collapsing
-        if is_expanded:
-            #For each set in the exercise
-            for _ in range(self.exercise_set_rows[row]):
-                #Remove the set row
-                self.table.removeRow(row + 1)
-
-            #Update the button text and reset the count
-            button.setText(f"▶ {exercise_data['name']}")
-            self.details_count -= self.exercise_set_rows[row]
-            self.exercise_set_rows[row] = 0
-        else:
-            #Get each set of the exercise
-            sets = exercise_data["sets"]
-            reps_list = exercise_data["reps"]
-            weights_list = exercise_data["weights"]
-
-            #For each set
-            for i in range(sets):
-                #Create a new row for the set
-                insert_row = row + 1 + i
-
-                #Fill set row with reps and weights
-                reps = reps_list[i] if i < len(reps_list) else ""
-                weight = weights_list[i] if i < len(weights_list) else ""
-
-                #Insert the new row and set the data
-                self.table.insertRow(insert_row)
-                self.table.setItem(insert_row, 0, QTableWidgetItem(f"Set {i + 1}"))
-                self.table.setItem(insert_row, 1, QTableWidgetItem(reps))
-                self.table.setItem(insert_row, 2, QTableWidgetItem(weight))
-
-            #Update the button text and count
-            button.setText(f"▼ {exercise_data['name']}")
-            self.exercise_set_rows[row] = sets
-            self.details_count += sets
-
     #Open the goals editor
     def open_goals_editor(self):
         self.editor = GoalsEditor(self.db, self)
         self.editor.finished.connect(lambda: self.load_workouts())
         self.editor.show()
 
+    #Upload the edits made since the last push, pulling first so this device's clock stays ahead
     def save_to_drive(self):
         if not self.drive_helper:
             QMessageBox.warning(self, "Google Drive", "Please log in first.")
             return
         try:
-            db_files = ["workouts.db", "your_database_file.db"]
-            for db_file in db_files:
-                file_id = self.drive_helper.upload_to_folder(
-                    db_file, folder_name="Workout Tracker Backups", mime_type="application/x-sqlite3"
-                )
-                print(f"Uploaded {db_file} → Drive File ID: {file_id}")
-            QMessageBox.information(self, "Google Drive", "All databases saved successfully to Workout Tracker Backups folder.")
+            pulled, pushed = ChangeSyncEngine(self.db, DriveSegmentStore(self.drive_helper)).sync()
+            if pulled:
+                self.load_workouts()
+            QMessageBox.information(
+                self, "Google Drive", f"Pushed {pushed} change(s) and applied {pulled} from other devices."
+            )
         except Exception as e:
             QMessageBox.critical(self, "Google Drive Error", str(e))
 
@@ -343,7 +295,7 @@ class WorkoutTracker(QWidget):
         self.drive_helper = GoogleDriveHelper()
         QMessageBox.information(self, "Google Drive", "Logged in successfully!")
 
-    #Show a context menu for the workout table
+    #Show a context menu for the workout tree
     def show_context_menu(self, pos):
         menu = QMenu()
 
@@ -351,49 +303,32 @@ class WorkoutTracker(QWidget):
         duplicate_action = menu.addAction("Use as Template")
         edit_action = menu.addAction("Edit Workout")
 
+        #Get the workout for the clicked row, whichever level it is on
+        workout_id = self.model.workout_id_for(self.tree.indexAt(pos))
+        if workout_id is None:
+            return
+
         #Execute the menu at the clicked position
-        action = menu.exec_(self.table.viewport().mapToGlobal(pos))
+        action = menu.exec_(self.tree.viewport().mapToGlobal(pos))
 
         #If duplicating workout
         if action == duplicate_action:
-            #Get the selected row
-            selected_row = self.table.currentRow()
-
-            #Get the workout ID from the selected row
-            workout_id = self.table.item(selected_row, 0).data(Qt.UserRole)
-
             #Open the workout editor with the data from the selected workout
             self.open_workout_editor(template_from_id=workout_id)
         #If editing workout
         elif action == edit_action:
-            #Get the selected row
-            selected_row = self.table.currentRow()
-
-            #Get the workout ID from the selected row
-            workout_id = self.table.item(selected_row, 0).data(Qt.UserRole)
-
             #Open the workout editor with the selected workout 
             self.open_workout_editor(workout_id=workout_id)
 
+    #Apply edits pushed by other devices, the workout list reloads without restarting
     def pull_from_drive(self):
         if not self.drive_helper:
             QMessageBox.warning(self, "Google Drive", "Please log in first.")
             return
 
         try:
-            downloaded = self.drive_helper.download_from_folder(
-                folder_name="Workout Tracker Backups",
-                local_dir=".",  # save to current working directory
-                files=["workouts.db", "your_database_file.db"]  # specific files
-            )
-            QMessageBox.information(
-                self,
-                "Google Drive",
-                "Downloaded successfully:\n" + "\n".join(downloaded) +
-                "\n\nRestart the app to reload updated databases."
-            )
-        except FileNotFoundError:
-            QMessageBox.warning(self, "Google Drive", "No backups found in Drive folder.")
+            pulled = ChangeSyncEngine(self.db, DriveSegmentStore(self.drive_helper)).pull()
+            self.load_workouts()
+            QMessageBox.information(self, "Google Drive", f"Applied {pulled} change(s) from other devices.")
         except Exception as e:
             QMessageBox.critical(self, "Google Drive Error", str(e))
-
@@ -0,0 +1,171 @@
+from PyQt5.QtCore import Qt, QAbstractItemModel, QModelIndex
+from PyQt5.QtGui import QFont
+
+#Node kinds in the workout → exercise → set hierarchy
+ROOT, WORKOUT, EXERCISE, SET = range(4)
+
+#Top-level workouts are handed to the view in batches as it scrolls
+WORKOUT_BATCH_SIZE = 256
+
+
+#One row in the tree, children stay None until the view first asks for them
+class TreeNode:
+    __slots__ = ("kind", "parent", "row", "values", "children")
+
+    def __init__(self, kind, parent, row, values):
+        self.kind = kind
+        self.parent = parent
+        self.row = row
+        self.values = values
+        self.children = None
+
+
+#Hierarchical model of workouts, their exercises and each exercise's sets, loaded lazily
+class WorkoutTreeModel(QAbstractItemModel):
+    HEADERS = ["Exercise / Workout", "Reps", "Weight (Kg)"]
+
+    def __init__(self, exercise_cache, parent=None):
+        super().__init__(parent)
+        self.exercise_cache = exercise_cache
+        self.root = TreeNode(ROOT, None, 0, None)
+        self.root.children = []
+        self.pending_workouts = []
+        self.fetching = False
+
+    #Replace the workouts shown, as (id, name, date) rows
+    def set_workouts(self, workouts):
+        self.beginResetModel()
+        self.root.children = []
+        self.pending_workouts = list(workouts)
+        self.endResetModel()
+
+    def node(self, index):
+        return index.internalPointer() if index.isValid() else self.root
+
+    def index(self, row, column, parent=QModelIndex()):
+        parent_node = self.node(parent)
+        if parent_node.children is None or not 0 <= row < len(parent_node.children):
+            return QModelIndex()
+        return self.createIndex(row, column, parent_node.children[row])
+
+    def parent(self, index):
+        if not index.isValid():
+            return QModelIndex()
+        parent_node = index.internalPointer().parent
+        if parent_node is None or parent_node is self.root:
+            return QModelIndex()
+        return self.createIndex(parent_node.row, 0, parent_node)
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.column() > 0:
+            return 0
+        children = self.node(parent).children
+        return len(children) if children is not None else 0
+
+    def columnCount(self, parent=QModelIndex()):
+        return len(self.HEADERS)
+
+    def hasChildren(self, parent=QModelIndex()):
+        node = self.node(parent)
+        if node.kind == ROOT:
+            return bool(node.children) or bool(self.pending_workouts)
+        if node.kind == SET or parent.column() > 0:
+            return False
+        return node.children is None or len(node.children) > 0
+
+    def canFetchMore(self, parent):
+        if self.fetching:
+            return False
+        node = self.node(parent)
+        if node.kind == ROOT:
+            return bool(self.pending_workouts)
+        return node.kind in (WORKOUT, EXERCISE) and node.children is None
+
+    #Load the next batch of workouts, or one node's children, inserting only those rows
+    def fetchMore(self, parent):
+        if self.fetching:
+            return
+        node = self.node(parent)
+        if node.kind == ROOT:
+            batch = self.pending_workouts[:WORKOUT_BATCH_SIZE]
+            del self.pending_workouts[:WORKOUT_BATCH_SIZE]
+            first = len(node.children)
+            children = [TreeNode(WORKOUT, node, first + i, workout) for i, workout in enumerate(batch)]
+        elif node.kind == WORKOUT:
+            first = 0
+            exercises = self.exercise_cache.get_or_load(node.values[0])
+            children = [TreeNode(EXERCISE, node, i, exercise) for i, exercise in enumerate(exercises)]
+        elif node.kind == EXERCISE:
+            first = 0
+            _name, sets, reps_str, weight_str = node.values
+            reps_list = [r.strip() for r in str(reps_str).split(",")]
+            weight_list = [w.strip() for w in str(weight_str).split(",")]
+            children = [
+                TreeNode(SET, node, i, (
+                    i + 1,
+                    reps_list[i] if i < len(reps_list) else "",
+                    weight_list[i] if i < len(weight_list) else "",
+                ))
+                for i in range(int(sets or 0))
+            ]
+        else:
+            return
+
+        if node.children is None:
+            node.children = []
+        if not children:
+            return
+
+        #Views may ask for more rows while these are being inserted, so hold them off until done
+        self.fetching = True
+        try:
+            self.beginInsertRows(parent, first, first + len(children) - 1)
+            node.children.extend(children)
+            self.endInsertRows()
+        finally:
+            self.fetching = False
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        node = index.internalPointer()
+        column = index.column()
+
+        if role == Qt.DisplayRole:
+            if node.kind == WORKOUT:
+                _workout_id, name, date = node.values
+                return f"{name} ({date})" if column == 0 else None
+            if node.kind == EXERCISE:
+                return node.values[0] if column == 0 else None
+            set_number, reps, weight = node.values
+            return (f"Set {set_number}", reps, weight)[column]
+
+        if role == Qt.UserRole and node.kind == WORKOUT:
+            return node.values[0]
+
+        if role == Qt.FontRole and node.kind == WORKOUT:
+            font = QFont()
+            font.setBold(True)
+            return font
+
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.HEADERS[section]
+        return None
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable
+
+    #Get the workout ID for any row, walking up from exercise and set rows
+    def workout_id_for(self, index):
+        node = self.node(index)
+        while node is not None and node.kind not in (WORKOUT, ROOT):
+            node = node.parent
+        return node.values[0] if node is not None and node.kind == WORKOUT else None
+
+    def is_workout(self, index):
+        return index.isValid() and index.internalPointer().kind == WORKOUT
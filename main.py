@@ -4,14 +4,17 @@ import sys
 def run_desktop_app():
     from PyQt5.QtWidgets import QApplication
 
-    from common.db_helper import DBHelper
+    from common.profiles import ProfileConnections, ProfileRegistry
     from desktop_app.workout_tracker import WorkoutTracker
 
     app = QApplication(sys.argv)
-    db = DBHelper()
-    window = WorkoutTracker(db)
+    profiles = ProfileConnections(ProfileRegistry())
+    db = profiles.get(profiles.registry.active_id)
+    window = WorkoutTracker(db, profiles)
     window.show()
-    sys.exit(app.exec_())
+    exit_code = app.exec_()
+    profiles.close_all()
+    sys.exit(exit_code)
 def main():
     run_desktop_app()
 
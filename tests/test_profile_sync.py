@@ -0,0 +1,71 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from common.profiles import ProfileConnections, ProfileRegistry
+from common.sync_engine import ChangeSyncEngine, FolderSegmentStore
+
+
+#Two athletes' profiles on one machine share a sync folder but must never receive each other's edits
+class ProfileSyncIsolationTest(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.store = FolderSegmentStore(os.path.join(self.root, "sync"))
+        self.devices = []
+
+    def tearDown(self):
+        for connections in self.devices:
+            connections.close_all()
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    #Open a device with its own app data folder, registry and alice and bob profiles
+    def open_device(self, name):
+        home = os.path.join(self.root, name)
+        with mock.patch.dict(os.environ, {"APPDATA": home}):
+            registry = ProfileRegistry(os.path.join(home, "profiles.json"))
+            for profile_id in ("alice", "bob"):
+                registry.add_profile(profile_id.title(), os.path.join(home, f"{profile_id}.db"), profile_id)
+            connections = ProfileConnections(registry)
+            databases = {profile_id: connections.get(profile_id) for profile_id in ("alice", "bob")}
+        self.devices.append(connections)
+        return databases
+
+    def sync(self, db):
+        return ChangeSyncEngine(db, self.store).sync()
+
+    def workout_names(self, db):
+        return sorted(row[0] for row in db.conn.execute("SELECT name FROM workouts"))
+
+    def test_profiles_on_one_device_stay_isolated(self):
+        laptop = self.open_device("laptop")
+        laptop["alice"].add_workout("Alice Squats", "2026-03-01")
+        #Bob's log runs ahead of Alice's, so a shared device ID would make his segments look new to her
+        for day in ("2026-03-02", "2026-03-03", "2026-03-04"):
+            laptop["bob"].add_workout("Bob Deadlifts", day)
+
+        self.sync(laptop["alice"])
+        self.sync(laptop["bob"])
+        self.sync(laptop["alice"])
+
+        self.assertEqual(self.workout_names(laptop["alice"]), ["Alice Squats"])
+        self.assertEqual(self.workout_names(laptop["bob"]), ["Bob Deadlifts"] * 3)
+
+    def test_same_profile_syncs_across_devices(self):
+        laptop = self.open_device("laptop")
+        desktop = self.open_device("desktop")
+        laptop["alice"].add_workout("Alice Squats", "2026-03-01")
+        laptop["bob"].add_workout("Bob Deadlifts", "2026-03-02")
+        self.sync(laptop["alice"])
+        self.sync(laptop["bob"])
+
+        self.sync(desktop["alice"])
+        self.sync(desktop["bob"])
+
+        self.assertEqual(self.workout_names(desktop["alice"]), ["Alice Squats"])
+        self.assertEqual(self.workout_names(desktop["bob"]), ["Bob Deadlifts"])
+
+
+if __name__ == "__main__":
+    unittest.main()
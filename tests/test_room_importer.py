@@ -0,0 +1,60 @@
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+
+from common.db_helper import DBHelper
+from common.room_importer import import_room_database
+
+
+ROOM_SCHEMA = os.path.join(
+    os.path.dirname(__file__), "..", "WorkoutTracker", "app", "schemas",
+    "com.example.workouttracker.data.local.WorkoutDatabase", "2.json",
+)
+
+
+#Sets must come out in position order with reps and weights aligned, whatever order Room stored them in
+class RoomImportSetOrderTest(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.env = mock.patch.dict(os.environ, {"APPDATA": self.root})
+        self.env.start()
+        self.room_path = os.path.join(self.root, "room.db")
+        with open(ROOM_SCHEMA, encoding="utf-8") as handle:
+            entities = json.load(handle)["database"]["entities"]
+        room = sqlite3.connect(self.room_path)
+        for entity in entities:
+            room.execute(entity["createSql"].replace("${TABLE_NAME}", entity["tableName"]))
+        room.execute("INSERT INTO catalog_exercises VALUES (1, 'Bench Press', NULL, NULL)")
+        room.execute("INSERT INTO workouts VALUES (1, 'Push Day', '2026-03-01')")
+        room.execute("INSERT INTO workout_exercises VALUES (1, 1, 1, 0)")
+        #Row IDs run against the positions, and the rows are inserted in neither order
+        for set_id, position, reps, weight in ((7, 2, 10, 50.0), (9, 0, 5, 80.0), (8, 1, 8, 62.5)):
+            room.execute("INSERT INTO exercise_sets VALUES (?, 1, ?, ?, ?)", (set_id, position, reps, weight))
+        room.commit()
+        room.close()
+        self.db = DBHelper(os.path.join(self.root, "workouts.db"))
+
+    def tearDown(self):
+        self.db.close()
+        self.env.stop()
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def test_sets_follow_position_order(self):
+        import_room_database(self.db, self.room_path)
+        rows = self.db.conn.execute("SELECT name, sets, reps, weight FROM exercises").fetchall()
+        self.assertEqual(rows, [("Bench Press", 3, "5,8,10", "80,62.5,50")])
+
+    def test_reimport_keeps_sets_aligned(self):
+        import_room_database(self.db, self.room_path)
+        counts = import_room_database(self.db, self.room_path)
+        self.assertEqual(counts["exercises"], 0)
+        rows = self.db.conn.execute("SELECT reps, weight FROM exercises").fetchall()
+        self.assertEqual(rows, [("5,8,10", "80,62.5,50")])
+
+
+if __name__ == "__main__":
+    unittest.main()
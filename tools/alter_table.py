@@ -1,10 +1,9 @@
 from common.db_helper import DBHelper
+from tools.maintenance import clean_orphans
 
 #Clean up exercises not linked to any workout
 def cleanup_orphaned_exercises(db):
-    db.conn.execute("DELETE FROM exercises WHERE workout_id NOT IN (SELECT id FROM workouts)")
-    db.conn.commit()
-    print("✅ Orphaned exercises removed.\n")
+    clean_orphans(db)
 
 #Show all tables in the database
 def print_all_tables(db):
@@ -0,0 +1,68 @@
+import argparse
+import os
+import sys
+from datetime import datetime, timezone
+
+from common.backup_retention import BackupManager, DriveBackupStore, FolderBackupStore
+
+#Pick a shared folder when one is given, Google Drive otherwise
+def open_store(args):
+    if args.folder:
+        return FolderBackupStore(args.folder)
+    from common.google_drive_helper import GoogleDriveHelper
+    return DriveBackupStore(GoogleDriveHelper(), args.drive_folder)
+
+#Read a point in time like 2026-03-01 or 2026-03-01T18:30, in UTC
+def parse_time(text):
+    moment = datetime.fromisoformat(text)
+    return moment.replace(tzinfo=timezone.utc) if moment.tzinfo is None else moment
+
+def backup(manager, args):
+    result = manager.backup(args.db)
+    if result["version"] is None:
+        print(f"✅ No changes since the last backup ({result['digest'][:12]}).\n")
+    elif result["uploaded"]:
+        print(f"✅ Uploaded new snapshot {result['digest'][:12]} as {result['version']}.\n")
+    else:
+        print(f"✅ Snapshot {result['digest'][:12]} was already stored, recorded {result['version']}.\n")
+    if not args.no_prune:
+        prune(manager, args)
+
+def list_versions(manager, args):
+    versions, blobs = manager.list_versions()
+    for created, digest in versions:
+        missing = "" if f"blob-{digest}.db.gz" in blobs else "  (snapshot missing)"
+        print(f"   {created:%Y-%m-%d %H:%M:%S} UTC  {digest[:12]}{missing}")
+    print(f"✅ {len(versions)} versions sharing {len(blobs)} snapshots.\n")
+
+def restore(manager, args):
+    target = args.to or args.db
+    if os.path.exists(target) and not args.yes:
+        print(f"❌ {target} exists, pass --yes to overwrite it or --to to restore elsewhere.\n")
+        sys.exit(1)
+    created, digest = manager.restore(target, parse_time(args.at) if args.at else None)
+    print(f"✅ Restored {digest[:12]} from {created:%Y-%m-%d %H:%M:%S} UTC to {target}.\n")
+
+def prune(manager, args):
+    result = manager.prune()
+    print(
+        f"✅ Kept {result['versions_kept']} versions, deleted {result['versions_deleted']} versions "
+        f"and {result['blobs_deleted']} unused snapshots.\n"
+    )
+
+COMMANDS = {"backup": backup, "list": list_versions, "restore": restore, "prune": prune}
+
+#Main function to back up, list, restore or prune database snapshots
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Versioned Workout Tracker backups")
+    parser.add_argument("command", choices=list(COMMANDS))
+    parser.add_argument("--db", default="data/workouts.db", help="database file")
+    parser.add_argument("--folder", help="back up to this local or shared folder instead of Google Drive")
+    parser.add_argument("--drive-folder", default="Workout Tracker Backups", help="Google Drive folder name")
+    parser.add_argument("--at", help="restore the newest version at or before this UTC time")
+    parser.add_argument("--to", help="restore into this file instead of --db")
+    parser.add_argument("--yes", action="store_true", help="overwrite the restore target")
+    parser.add_argument("--no-prune", action="store_true", help="skip pruning after a backup")
+    args = parser.parse_args()
+
+    COMMANDS[args.command](BackupManager(open_store(args)), args)
@@ -0,0 +1,18 @@
+import sys
+import time
+
+from common.db_helper import DBHelper
+from common.room_importer import import_room_database
+
+#Import workouts from the Android app's workout-tracker.db, optionally tagged with a source name
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python -m tools.import_room_db <workout-tracker.db> [source]")
+        sys.exit(1)
+
+    db = DBHelper()
+    start = time.perf_counter()
+    counts = import_room_database(db, sys.argv[1], *sys.argv[2:3])
+    db.close()
+    summary = ", ".join(f"{count} {name.replace('_', ' ')}" for name, count in counts.items())
+    print(f"✅ Imported {summary} in {time.perf_counter() - start:.2f}s.\n")
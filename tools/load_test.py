@@ -0,0 +1,223 @@
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+
+from common.db_helper import DBHelper
+from common.room_importer import import_room_database
+
+EXERCISE_NAMES = [
+    "Bench Press", "Squats", "Deadlift", "Overhead Press", "Barbell Row", "Pull Ups", "Leg Press",
+    "Lat Pulldown", "Incline DB Press", "Leg Curls", "Calf Raises", "Bicep Curls", "Tricep Extensions",
+    "Lateral Raises", "Face Pulls", "Hip Thrust", "Romanian Deadlift", "Cable Fly", "Dips", "Lunges",
+]
+WORKOUT_NAMES = ["Push", "Pull", "Legs", "Upper", "Lower", "Full Body", "Arms & Shoulders"]
+SEARCH_TERMS = ["press", "squat", "legs", "curl", "pull", "row", "fly"]
+ROOM_SCHEMA = "WorkoutTracker/app/schemas/com.example.workouttracker.data.local.WorkoutDatabase/2.json"
+
+#Random reps and weights strings for one exercise
+def random_sets(rng, sets):
+    reps = ",".join(str(rng.randint(4, 12)) for _ in range(sets))
+    weights = ",".join(str(rng.choice(range(20, 160, 5))) for _ in range(sets))
+    return reps, weights
+
+#Build a synthetic database with years of history
+def seed_database(path, workouts, journal_mode):
+    rng = random.Random(42)
+    db = DBHelper(path)
+    db.conn.execute(f"PRAGMA journal_mode = {journal_mode}")
+    start = date.today() - timedelta(days=workouts)
+    for i in range(workouts):
+        workout_id = db.conn.execute(
+            "INSERT INTO workouts (name, date) VALUES (?, ?)",
+            (rng.choice(WORKOUT_NAMES), (start + timedelta(days=i)).isoformat()),
+        ).lastrowid
+        for name in rng.sample(EXERCISE_NAMES, rng.randint(4, 7)):
+            sets = rng.randint(3, 5)
+            reps, weights = random_sets(rng, sets)
+            db.conn.execute(
+                "INSERT INTO exercises (workout_id, name, sets, reps, weight, name_key) VALUES (?, ?, ?, ?, ?, ?)",
+                (workout_id, name, sets, reps, weights, name.casefold()),
+            )
+    db.conn.commit()
+    db.rebuild_daily_rollups()
+    db.close()
+
+#Build a small Room database for the import profile
+def seed_room_database(path, workouts=20):
+    with open(ROOM_SCHEMA, encoding="utf-8") as handle:
+        entities = json.load(handle)["database"]["entities"]
+    rng = random.Random(7)
+    conn = sqlite3.connect(path)
+    for entity in entities:
+        conn.execute(entity["createSql"].replace("${TABLE_NAME}", entity["tableName"]))
+    conn.executemany("INSERT INTO catalog_exercises (name) VALUES (?)", [(name,) for name in EXERCISE_NAMES])
+    for workout_id in range(1, workouts + 1):
+        conn.execute(
+            "INSERT INTO workouts (id, name, date) VALUES (?, ?, ?)",
+            (workout_id, rng.choice(WORKOUT_NAMES), (date.today() - timedelta(days=workout_id)).isoformat()),
+        )
+        for position in range(5):
+            exercise_id = conn.execute(
+                "INSERT INTO workout_exercises (workoutId, catalogExerciseId, position) VALUES (?, ?, ?)",
+                (workout_id, rng.randint(1, len(EXERCISE_NAMES)), position),
+            ).lastrowid
+            conn.executemany(
+                "INSERT INTO exercise_sets (workoutExerciseId, position, reps, weightKg) VALUES (?, ?, ?, ?)",
+                [(exercise_id, s, rng.randint(4, 12), rng.choice(range(20, 160, 5))) for s in range(4)],
+            )
+    conn.commit()
+    conn.close()
+
+#Workload profiles, each one operation as the app or a background job would run it
+def browse(db, rng, context):
+    if rng.random() < 0.3:
+        db.get_workouts_by_ids(db.search(rng.choice(SEARCH_TERMS), limit=50))
+        return
+    total = context["workouts"]
+    rows, _total = db.get_workouts_page(50, rng.randrange(0, max(total - 50, 1)))
+    db.get_exercises_for_workouts([row[0] for row in rows])
+
+def edit(db, rng, context):
+    workout = db.conn.execute("SELECT id FROM workouts ORDER BY RANDOM() LIMIT 1").fetchone()
+    if not workout:
+        return
+    exercises = [list(row) for row in db.get_exercises_for_workout(workout[0])]
+    if exercises:
+        exercise = rng.choice(exercises)
+        exercise[2], exercise[3] = random_sets(rng, exercise[1])
+    db.update_workout_exercises(workout[0], exercises)
+
+def chart(db, rng, context):
+    name = rng.choice(EXERCISE_NAMES)
+    db.get_exercise_history(name)
+    db.get_weekly_rollups(name)
+    db.get_rolling_metrics(name)
+
+def export(db, rng, context):
+    db.get_all_exercise_histories()
+
+def import_room(db, rng, context):
+    import_room_database(db, context["room_path"], source=f"load-{os.getpid()}-{rng.random():.12f}")
+
+PROFILES = {"browse": browse, "edit": edit, "chart": chart, "export": export, "import": import_room}
+
+#Run a weighted mix of profiles on one connection until the deadline
+def run_worker(args):
+    db_path, mix, duration, busy_timeout, seed, context = args
+    rng = random.Random(seed)
+    db = DBHelper(db_path)
+    db.conn.execute(f"PRAGMA busy_timeout = {busy_timeout}")
+    names, weights = zip(*mix.items())
+    results = {name: {"latencies": [], "locked": 0, "errors": 0} for name in names}
+
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        name = rng.choices(names, weights)[0]
+        start = time.perf_counter()
+        try:
+            PROFILES[name](db, rng, context)
+            results[name]["latencies"].append(time.perf_counter() - start)
+        except sqlite3.OperationalError as exc:
+            db.conn.rollback()
+            results[name]["locked" if "locked" in str(exc) or "busy" in str(exc) else "errors"] += 1
+        except Exception:
+            db.conn.rollback()
+            results[name]["errors"] += 1
+    db.close()
+    return results
+
+#Nearest-rank percentile of sorted values
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+#Print throughput, latency percentiles and lock errors per profile
+def report(all_results, elapsed):
+    print(f"\n{'profile':<8} {'ops':>7} {'ops/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'locked':>7} {'errors':>7}")
+    totals = [0, 0, 0]
+    for name in PROFILES:
+        latencies = sorted(value for results in all_results for value in results.get(name, {}).get("latencies", []))
+        locked = sum(results.get(name, {}).get("locked", 0) for results in all_results)
+        errors = sum(results.get(name, {}).get("errors", 0) for results in all_results)
+        if not latencies and not locked and not errors:
+            continue
+        totals = [totals[0] + len(latencies), totals[1] + locked, totals[2] + errors]
+        print(
+            f"{name:<8} {len(latencies):>7} {len(latencies) / elapsed:>8.1f} "
+            f"{percentile(latencies, 0.50) * 1000:>8.2f} {percentile(latencies, 0.95) * 1000:>8.2f} "
+            f"{percentile(latencies, 0.99) * 1000:>8.2f} {locked:>7} {errors:>7}"
+        )
+    print(f"{'total':<8} {totals[0]:>7} {totals[0] / elapsed:>8.1f} {'':>26} {totals[1]:>7} {totals[2]:>7}\n")
+
+#Read a mix like "browse=6,edit=1,chart=2"
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in PROFILES:
+            raise argparse.ArgumentTypeError(f"unknown profile {name!r}, choose from {', '.join(PROFILES)}")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+#Main function to seed a database and run the workload
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test the Workout Tracker data layer")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix("browse=6,edit=1,chart=2,export=0.5,import=0.2"))
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--processes", action="store_true", help="run workers as processes instead of threads")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds to run")
+    parser.add_argument("--workouts", type=int, default=2000, help="workouts in the seeded database")
+    parser.add_argument("--journal", default="delete", help="journal mode, e.g. delete or wal")
+    parser.add_argument("--busy-timeout", type=int, default=5000, help="milliseconds to wait on a locked database")
+    parser.add_argument("--db", help="run against a copy of this database instead of a synthetic one")
+    parser.add_argument("--keep", action="store_true", help="keep the seeded database afterwards")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="workout-load-")
+    db_path = os.path.join(work_dir, "load.db")
+    room_path = os.path.join(work_dir, "room.db")
+    start = time.perf_counter()
+    if args.db:
+        source = sqlite3.connect(args.db)
+        target = sqlite3.connect(db_path)
+        source.backup(target)
+        target.execute(f"PRAGMA journal_mode = {args.journal}")
+        source.close()
+        target.close()
+    else:
+        seed_database(db_path, args.workouts, args.journal)
+    seed_room_database(room_path)
+    workouts = sqlite3.connect(db_path).execute("SELECT COUNT(*) FROM workouts").fetchone()[0]
+    print(f"Seeded {workouts} workouts in {time.perf_counter() - start:.1f}s at {db_path}")
+    print(f"Running {args.workers} {'processes' if args.processes else 'threads'} for {args.duration:.0f}s, "
+          f"journal={args.journal}, busy_timeout={args.busy_timeout}ms, mix={args.mix}")
+
+    context = {"workouts": workouts, "room_path": room_path}
+    jobs = [(db_path, args.mix, args.duration, args.busy_timeout, seed, context) for seed in range(args.workers)]
+    start = time.perf_counter()
+    if args.processes:
+        with multiprocessing.Pool(args.workers) as pool:
+            all_results = pool.map(run_worker, jobs)
+    else:
+        all_results = [None] * args.workers
+
+        def run(index):
+            all_results[index] = run_worker(jobs[index])
+
+        threads = [threading.Thread(target=run, args=(index,)) for index in range(args.workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    report(all_results, time.perf_counter() - start)
+    if not args.keep:
+        shutil.rmtree(work_dir, ignore_errors=True)
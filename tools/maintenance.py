@@ -0,0 +1,278 @@
+import argparse
+import sqlite3
+import sys
+import time
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+from common.db_helper import DBHelper
+
+#Pages released per incremental vacuum step, small enough to keep each write lock short
+VACUUM_STEP_PAGES = 256
+
+#Report elapsed time while a long statement runs
+@contextmanager
+def progress(conn, label):
+    start = time.perf_counter()
+    last = [start]
+
+    def tick():
+        now = time.perf_counter()
+        if now - last[0] >= 0.5:
+            last[0] = now
+            print(f"\r   {label}... {now - start:.1f}s", end="", flush=True)
+        return 0
+
+    print(f"   {label}...", end="", flush=True)
+    conn.set_progress_handler(tick, 10000)
+    try:
+        yield
+    finally:
+        conn.set_progress_handler(None, 0)
+        print(f"\r   {label}... done in {time.perf_counter() - start:.2f}s")
+
+#Delete exercises whose workout is gone, and derived rows whose exercise is gone, using anti-joins
+def clean_orphans(db):
+    c = db.conn.cursor()
+    c.execute(
+        """
+        SELECT e.id, e.name_key FROM exercises e
+        LEFT JOIN workouts w ON w.id = e.workout_id
+        WHERE w.id IS NULL
+        """
+    )
+    orphans = c.fetchall()
+    c.executemany("DELETE FROM exercises WHERE id = ?", [(row[0],) for row in orphans])
+
+    c.execute(
+        """
+        DELETE FROM daily_exercise_rollups WHERE name_key IN (
+            SELECT r.name_key FROM daily_exercise_rollups r
+            LEFT JOIN exercises e ON e.name_key = r.name_key
+            WHERE e.id IS NULL
+        )
+        """
+    )
+    rollups = c.rowcount
+    c.execute(
+        """
+        DELETE FROM exercise_stats WHERE name_key IN (
+            SELECT s.name_key FROM exercise_stats s
+            LEFT JOIN exercises e ON e.name_key = s.name_key
+            WHERE e.id IS NULL
+        )
+        """
+    )
+    stats = c.rowcount
+    db._refresh_rollups_for_keys({row[1] for row in orphans if row[1]})
+    db.conn.commit()
+    print(f"✅ Removed {len(orphans)} orphaned exercises, {rollups} stale rollups and {stats} stale stats.\n")
+
+#Rescan every exercise for catalog entries and links, normally kept up to date by triggers
+def repair_catalog(db):
+    before = db.conn.execute("SELECT COUNT(*) FROM exercises_catalog").fetchone()[0]
+    with progress(db.conn, "Rescanning exercises"):
+        db.sync_exercise_catalog()
+    added = db.conn.execute("SELECT COUNT(*) FROM exercises_catalog").fetchone()[0] - before
+    print(f"✅ Catalog repaired, {added} missing exercises added.\n")
+
+#Refresh the query planner statistics
+def analyze(db):
+    with progress(db.conn, "Analyzing"):
+        db.conn.execute("PRAGMA analysis_limit = 1000")
+        db.conn.execute("ANALYZE")
+        db.conn.execute("PRAGMA optimize")
+    print("✅ Planner statistics updated.\n")
+
+#Return free pages to the file system a few at a time
+def vacuum(db):
+    c = db.conn.cursor()
+    if c.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+        #Switching to incremental mode needs one full vacuum, which waits for other connections to finish
+        with progress(db.conn, "Enabling incremental vacuum (one-time full vacuum)"):
+            db.conn.commit()
+            c.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            c.execute("VACUUM")
+
+    free_pages = c.execute("PRAGMA freelist_count").fetchone()[0]
+    released = 0
+    while free_pages:
+        c.execute(f"PRAGMA incremental_vacuum({VACUUM_STEP_PAGES})").fetchall()
+        db.conn.commit()
+        remaining = c.execute("PRAGMA freelist_count").fetchone()[0]
+        if remaining >= free_pages:
+            break
+        released += free_pages - remaining
+        free_pages = remaining
+        print(f"\r   Released {released} pages, {free_pages} left", end="", flush=True)
+    print(f"\r✅ Released {released} free pages.                    \n")
+
+#Check the file structure and foreign keys, a full check reads every page
+def check_integrity(db, full=False):
+    pragma = "integrity_check" if full else "quick_check"
+    with progress(db.conn, f"Running {pragma}"):
+        problems = [row[0] for row in db.conn.execute(f"PRAGMA {pragma}") if row[0] != "ok"]
+        foreign_keys = db.conn.execute("PRAGMA foreign_key_check").fetchall()
+
+    for problem in problems:
+        print(f"   ❌ {problem}")
+    for table, rowid, parent, _fk in foreign_keys:
+        print(f"   ❌ {table} row {rowid} points at a missing {parent} row")
+    if problems or foreign_keys:
+        print(f"❌ Found {len(problems)} integrity problems and {len(foreign_keys)} broken foreign keys.\n")
+        return False
+    print("✅ Database integrity is ok.\n")
+    return True
+
+#Check that weekly and monthly rollups report a top set that really happened on one day of the period
+def check_rollups(db):
+    c = db.conn.cursor()
+    daily = {}
+    for name_key, day, top_weight, top_reps in c.execute(
+        "SELECT name_key, day, top_weight, top_reps FROM daily_exercise_rollups"
+    ):
+        daily.setdefault(name_key, []).append((day, top_weight, top_reps))
+
+    period_start = {
+        "week": lambda day: day - timedelta(days=day.weekday()),
+        "month": lambda day: day.replace(day=1),
+    }
+    mismatches = []
+    unreadable = []
+    with progress(db.conn, "Comparing period top sets with daily rollups"):
+        for name_key, days in daily.items():
+            #A day that is not yyyy-MM-dd has no week or month, report it and check the rest
+            readable = []
+            for day, top_weight, top_reps in days:
+                try:
+                    readable.append((date.fromisoformat(day), top_weight, top_reps))
+                except (TypeError, ValueError):
+                    unreadable.append((name_key, day))
+            for period, start_of in period_start.items():
+                expected = {}
+                for day, top_weight, top_reps in readable:
+                    start = start_of(day).isoformat()
+                    expected[start] = max(expected.get(start, (top_weight, top_reps)), (top_weight, top_reps))
+                for row in db.get_rollups(name_key, period):
+                    if row[0] is None:
+                        continue
+                    if (row[5], row[6]) != expected.get(row[0]):
+                        mismatches.append((name_key, period, row, expected.get(row[0])))
+
+    for name_key, day in unreadable[:20]:
+        print(f"   ❌ {name_key} has a daily rollup for the unreadable day {day!r}")
+    for name_key, period, row, expected_set in mismatches[:20]:
+        print(f"   ❌ {name_key} {period} of {row[0]}: {row[5]} x {row[6]}, daily rollups say {expected_set}")
+    if unreadable or mismatches:
+        print(
+            f"❌ {len(unreadable)} daily rollups have unreadable days and "
+            f"{len(mismatches)} period top sets do not match the daily rollups.\n"
+        )
+        return False
+    print("✅ Weekly and monthly top sets match the daily rollups.\n")
+    return True
+
+#Report foreign keys without an index, redundant indexes and indexes that barely narrow a lookup
+def check_indexes(db):
+    c = db.conn.cursor()
+    tables = [row[0] for row in c.execute(
+        """
+        SELECT name FROM sqlite_master
+        WHERE type = 'table' AND name NOT LIKE 'sqlite_%' AND sql NOT LIKE 'CREATE VIRTUAL%'
+        """
+    )]
+    has_stats = c.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'").fetchone() is not None
+    warnings = 0
+
+    for table in tables:
+        indexes = {}
+        for _seq, index, _unique, _origin, _partial in c.execute(f"PRAGMA index_list('{table}')").fetchall():
+            indexes[index] = [row[2] for row in c.execute(f"PRAGMA index_info('{index}')")]
+        primary_key = [row[1] for row in c.execute(f"PRAGMA table_info('{table}')") if row[5]]
+
+        for fk in c.execute(f"PRAGMA foreign_key_list('{table}')").fetchall():
+            column = fk[3]
+            if primary_key[:1] != [column] and not any(columns[:1] == [column] for columns in indexes.values()):
+                print(f"   ⚠️ {table}.{column} references {fk[2]} but has no index")
+                warnings += 1
+
+        for index, columns in indexes.items():
+            for other, other_columns in indexes.items():
+                if other != index and len(columns) < len(other_columns) and other_columns[:len(columns)] == columns:
+                    print(f"   ⚠️ {index} on {table} is covered by {other}")
+                    warnings += 1
+
+        if has_stats:
+            stats = c.execute("SELECT idx, stat FROM sqlite_stat1 WHERE tbl = ? AND idx IS NOT NULL", (table,))
+            for index, stat in stats.fetchall():
+                counts = [int(value) for value in stat.split()[:2] if value.isdigit()]
+                if len(counts) == 2 and counts[0] >= 1000 and counts[1] * 10 >= counts[0]:
+                    print(f"   ⚠️ {index} matches about {counts[1]} of {counts[0]} rows per lookup")
+                    warnings += 1
+
+    if not has_stats:
+        print("   Run the analyze job to include selectivity checks.")
+    print(f"{'✅' if not warnings else '⚠️'} Index check finished with {warnings} warnings.\n")
+
+#Print the space used by every table and index
+def size_report(db):
+    c = db.conn.cursor()
+    page_size = c.execute("PRAGMA page_size").fetchone()[0]
+    page_count = c.execute("PRAGMA page_count").fetchone()[0]
+    free_pages = c.execute("PRAGMA freelist_count").fetchone()[0]
+    try:
+        rows = c.execute(
+            """
+            SELECT d.name, COALESCE(m.type, 'table'), SUM(d.pgsize), COUNT(*)
+            FROM dbstat d LEFT JOIN sqlite_master m ON m.name = d.name
+            GROUP BY d.name ORDER BY SUM(d.pgsize) DESC
+            """
+        ).fetchall()
+    except sqlite3.OperationalError:
+        rows = []
+        print("   This SQLite build has no dbstat table, only totals are shown.")
+
+    for name, kind, size, pages in rows:
+        print(f"   {name:<45} {kind:<6} {size / 1024:>10.1f} KiB {pages:>8} pages")
+    print(
+        f"✅ {page_count * page_size / 1024:.1f} KiB in {page_count} pages, "
+        f"{free_pages * page_size / 1024:.1f} KiB free.\n"
+    )
+
+JOBS = {
+    "orphans": clean_orphans,
+    "catalog": repair_catalog,
+    "analyze": analyze,
+    "vacuum": vacuum,
+    "integrity": check_integrity,
+    "rollups": check_rollups,
+    "indexes": check_indexes,
+    "sizes": size_report,
+}
+
+#Main function to run the selected maintenance jobs, all of them when none are named
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Workout Tracker database maintenance")
+    parser.add_argument("jobs", nargs="*", help=f"jobs to run ({', '.join(JOBS)}), default all")
+    parser.add_argument("--db", default="data/workouts.db", help="database file")
+    parser.add_argument("--full", action="store_true", help="run the full integrity_check instead of quick_check")
+    args = parser.parse_args()
+    unknown = [job for job in args.jobs if job not in JOBS]
+    if unknown:
+        parser.error(f"unknown jobs: {', '.join(unknown)}")
+
+    db = DBHelper(args.db)
+    #Wait for the app's writes instead of failing while it has the database open
+    db.conn.execute("PRAGMA busy_timeout = 10000")
+
+    ok = True
+    for job in args.jobs or list(JOBS):
+        print(f"▶ {job}")
+        if job == "integrity":
+            ok = check_integrity(db, args.full) and ok
+        elif job == "rollups":
+            ok = check_rollups(db) and ok
+        else:
+            JOBS[job](db)
+    db.close()
+    sys.exit(0 if ok else 1)
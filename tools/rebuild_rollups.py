@@ -0,0 +1,13 @@
+from common.db_helper import DBHelper
+
+#Recompute the per-day exercise rollups from the raw exercise rows
+def rebuild_rollups(db):
+    db.rebuild_daily_rollups()
+    count = db.conn.execute("SELECT COUNT(*) FROM daily_exercise_rollups").fetchone()[0]
+    print(f"✅ Rebuilt {count} daily exercise rollups.\n")
+
+#Main function to run the rebuild
+if __name__ == "__main__":
+    db = DBHelper()
+    rebuild_rollups(db)
+    db.close()
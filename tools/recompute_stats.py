@@ -0,0 +1,15 @@
+import argparse
+import time
+
+from common.batch_recompute import recompute_all
+
+#Recompute rollups, PRs and e1RM statistics for every exercise, optionally with a worker count
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recompute Workout Tracker rollups and exercise statistics")
+    parser.add_argument("workers", nargs="?", type=int, help="worker processes, default one per CPU")
+    parser.add_argument("--db", default="data/workouts.db", help="database file")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    count = recompute_all(args.db, workers=args.workers)
+    print(f"✅ Recomputed statistics for {count} exercises in {time.perf_counter() - start:.2f}s.\n")